@@ -0,0 +1,68 @@
+"""
+Benchmark of HDBSCANClusteringAdapter modes: time and peak memory versus N.
+
+Synthetic L2-normalized embeddings (Gaussian blobs around random centres) are
+clustered with the "precomputed" and "scalable" modes. Peak memory is the
+tracemalloc peak, which includes NumPy buffers.
+
+Usage (from the repository root):
+    PYTHONPATH=src python benchmarks/clustering_modes.py --sizes 1000 2000 5000 10000 20000
+"""
+import argparse
+import json
+import logging
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.adapters.clustering.hdbscan_adapter import HDBSCANClusteringAdapter
+from app.domain.models import EmbeddingBatch, ImageItem
+
+def synthetic_embeddings(n: int, dims: int, points_per_cluster: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(max(1, n // points_per_cluster), dims)).astype(np.float32)
+    vectors = centres[rng.integers(0, len(centres), size=n)]
+    vectors += 0.5 * rng.normal(size=(n, dims)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return EmbeddingBatch(images=[ImageItem(id=str(i)) for i in range(n)], matrix=vectors)
+
+def measure(adapter: HDBSCANClusteringAdapter, embeddings) -> dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+    clusters = adapter.cluster_embeddings(embeddings)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(elapsed, 3), "peak_mb": round(peak / 2**20, 1), "clusters": len(clusters)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 5000, 10000, 20000])
+    parser.add_argument("--dims", type=int, default=768, help="Embedding width (DINOv2 ViT-B/14: 768)")
+    parser.add_argument("--points-per-cluster", type=int, default=20)
+    parser.add_argument("--pca-components", type=int, default=50)
+    parser.add_argument("--max-precomputed", type=int, default=20000,
+                        help="Skip the precomputed mode above this N (it needs 8*N^2 bytes)")
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    results = []
+    print(f"{'N':>8} {'mode':>12} {'seconds':>10} {'peak MB':>10} {'clusters':>9}")
+    for n in args.sizes:
+        embeddings = synthetic_embeddings(n, args.dims, args.points_per_cluster)
+        for mode in ("precomputed", "scalable"):
+            if mode == "precomputed" and n > args.max_precomputed:
+                continue
+            adapter = HDBSCANClusteringAdapter(mode=mode, pca_components=args.pca_components)
+            row = {"n": n, "mode": mode, **measure(adapter, embeddings)}
+            results.append(row)
+            print(f"{n:>8} {mode:>12} {row['seconds']:>10} {row['peak_mb']:>10} {row['clusters']:>9}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Benchmark of every pipeline stage, separately and end to end, on synthetic images.
+
+Synthetic JPEGs (a few colour themes with gradients and noise, so they form
+clusters) are generated at a configurable count and resolution. The stages
+are timed one by one: decode, each embedding adapter,
+HDBSCANClusteringAdapter, the captioning adapter, JsonRendererAdapter and
+DiskStorageAdapter. After that, run_pipeline plus rendering is timed as a
+whole. Each stage runs --warmup untimed times, then --repeat timed times. The
+stage gets fresh ImageItems every time, so no decoded or resized view is
+reused.
+
+Reported per stage:
+- p50/p95 latency of one call, or of one image for decode.
+- Throughput in images/s at p50.
+- Peak RSS of the process so far, which is monotonic, so it includes earlier stages.
+
+--models stub replaces the neural networks with NumPy stand-ins. They have the
+same input and output shapes: 224x224 inputs and 768-d embeddings, and 384x384
+inputs for captioning. The suite then runs with no downloaded weights.
+--models real uses DINOv2, OpenCLIP and BLIP. With --onnx-model it also runs
+the ONNX adapter.
+
+--baseline compares the run with a saved JSON file. The command exits with
+status 1 if any stage's p50 latency or peak RSS is worse than the baseline by
+more than --threshold. --save-baseline writes the current run as the new
+baseline.
+
+Usage (from the repository root):
+    PYTHONPATH=src python benchmarks/pipeline_stages.py --count 200 --resolution 1024x768 --save-baseline benchmarks/baseline.json
+    PYTHONPATH=src python benchmarks/pipeline_stages.py --count 200 --resolution 1024x768 --baseline benchmarks/baseline.json
+"""
+import argparse
+import io
+import json
+import logging
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import numpy as np
+from PIL import Image
+
+from app.adapters.clustering.hdbscan_adapter import HDBSCANClusteringAdapter
+from app.adapters.embeddings.preprocessing import iter_preprocessed_batches
+from app.adapters.render.json_renderer_adapter import JsonRendererAdapter
+from app.adapters.storage.disk_storage_adapter import DiskStorageAdapter
+from app.config.settings import DECODE_MIN_SIDE, PREPROCESS_WORKERS
+from app.core.ingestion import ImageIngestor
+from app.core.rchestrator import run_pipeline
+from app.domain.labels import group_by_label
+from app.domain.models import Cluster, EmbeddingBatch, ImageItem
+from app.ports.captioning_port import CaptioningPort
+from app.ports.embedding_port import EmbeddingPort
+
+# -------------------------------
+# Stub models (no weights)
+# -------------------------------
+
+class StubEmbeddingAdapter(EmbeddingPort):
+    """
+    ViT-shaped stand-in: 224x224 center crop, 14x14 patches, linear patch
+    projection to 768 dims and mean pooling, all in NumPy.
+    """
+
+    model_id = "stub:vit-b-14"
+    preprocess_config = "resize224-crop224"
+
+    def __init__(self, batch_size: int = 16, side: int = 224, patch: int = 14, dim: int = 768):
+        self.batch_size = batch_size
+        self.side = side
+        self.patch = patch
+        rng = np.random.default_rng(0)
+        self.projection = rng.normal(size=(3 * patch * patch, dim)).astype(np.float32) / np.sqrt(3 * patch * patch)
+        self.executor = ThreadPoolExecutor(max_workers=PREPROCESS_WORKERS, thread_name_prefix="stub-preprocess")
+
+    def extract_embeddings(self, images: List[ImageItem]) -> EmbeddingBatch:
+        embeddings = EmbeddingBatch.empty(images, self.projection.shape[1])
+        start = 0
+        batches = iter_preprocessed_batches(images, self._preprocess, self.batch_size, self.executor, stack=np.stack)
+        for batch, pixels in batches:
+            n, grid = len(batch), self.side // self.patch
+            patches = pixels.reshape(n, 3, grid, self.patch, grid, self.patch)
+            patches = patches.transpose(0, 2, 4, 1, 3, 5).reshape(n, grid * grid, -1)
+            emb = (patches @ self.projection).mean(axis=1)
+            emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+            embeddings.matrix[start:start + n] = emb
+            start += n
+        return embeddings
+
+    def _preprocess(self, img: Image.Image) -> np.ndarray:
+        width, height = img.size
+        scale = self.side / min(width, height)
+        img = img.convert("RGB").resize((max(self.side, round(width * scale)), max(self.side, round(height * scale))),
+                                        Image.BILINEAR)
+        left, top = (img.size[0] - self.side) // 2, (img.size[1] - self.side) // 2
+        pixels = np.asarray(img.crop((left, top, left + self.side, top + self.side)), dtype=np.float32)
+        return ((pixels / 127.5) - 1.0).transpose(2, 0, 1)
+
+class StubCaptioningAdapter(CaptioningPort):
+    """
+    BLIP-shaped stand-in: resizes representative images to 384x384 (cached view,
+    like the BLIP adapter) and describes their mean colour.
+    """
+
+    def __init__(self, images_per_cluster: int = 3, side: int = 384):
+        self.images_per_cluster = images_per_cluster
+        self.side = side
+
+    def generate_descriptions(self, clusters: List[Cluster]) -> List[Cluster]:
+        for cluster in clusters:
+            if cluster.label == -1 or not cluster.images:
+                continue
+            captions = []
+            for img in cluster.images[:self.images_per_cluster]:
+                view = img.view("blip", lambda data: data.convert("RGB").resize((self.side, self.side), Image.BICUBIC))
+                r, g, b = (int(v) // 32 for v in np.asarray(view).reshape(-1, 3).mean(axis=0))
+                captions.append(f"an image in tones {r}-{g}-{b}")
+            cluster.description = " / ".join(dict.fromkeys(captions))
+        return clusters
+
+# -------------------------------
+# Synthetic data
+# -------------------------------
+
+def synthetic_uploads(count: int, width: int, height: int, themes: int = 8, seed: int = 0):
+    """JPEG (filename, bytes) pairs drawn from `themes` colour themes."""
+    rng = np.random.default_rng(seed)
+    colours = rng.integers(30, 226, size=(themes, 3))
+    ramp = np.linspace(-40, 40, width, dtype=np.float32)[None, :, None]
+    uploads = []
+    for i in range(count):
+        base = colours[i % themes].astype(np.float32)[None, None, :]
+        pixels = base + ramp + rng.normal(scale=12, size=(height, width, 3)).astype(np.float32)
+        buffer = io.BytesIO()
+        Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(buffer, format="JPEG", quality=90)
+        uploads.append((f"img_{i:05d}.jpg", buffer.getvalue()))
+    return uploads
+
+# -------------------------------
+# Measurement
+# -------------------------------
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def summarize(samples: List[float], images_per_sample: int) -> Dict[str, float]:
+    p50, p95 = np.percentile(samples, [50, 95])
+    return {
+        "p50_ms": round(1000 * float(p50), 3),
+        "p95_ms": round(1000 * float(p95), 3),
+        "throughput_ips": round(images_per_sample / float(p50), 2) if p50 > 0 else None,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+def time_stage(func: Callable[[object], object], warmup: int, repeat: int,
+               setup: Callable[[], object] = lambda: None) -> List[float]:
+    """Latencies of func(setup()); setup (e.g. building fresh ImageItems) is not timed."""
+    for _ in range(warmup):
+        func(setup())
+    samples = []
+    for _ in range(repeat):
+        arg = setup()
+        started = time.perf_counter()
+        func(arg)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def build_models(args):
+    if args.models == "stub":
+        return {"stub": StubEmbeddingAdapter()}, StubCaptioningAdapter()
+
+    from app.adapters.descriptions.blip_adapter import BLIPCaptioningAdapter
+    from app.adapters.embeddings.dinov2_adapter import DINOv2EmbeddingAdapter
+    from app.adapters.embeddings.openclip_adapter import OpenCLIPEmbeddingAdapter
+
+    embedders = {
+        "dinov2": DINOv2EmbeddingAdapter(snapshot_dir=args.snapshot_dir),
+        "openclip": OpenCLIPEmbeddingAdapter(snapshot_dir=args.snapshot_dir)
+    }
+    if args.onnx_model:
+        from app.adapters.embeddings.onnx_adapter import ONNXEmbeddingAdapter
+        embedders["onnx"] = ONNXEmbeddingAdapter(args.onnx_model)
+    return embedders, BLIPCaptioningAdapter(snapshot_dir=args.snapshot_dir)
+
+def run(args) -> Dict[str, Dict[str, float]]:
+    width, height = (int(v) for v in args.resolution.lower().split("x"))
+    uploads = synthetic_uploads(args.count, width, height)
+    ingestor = ImageIngestor(min_side=DECODE_MIN_SIDE)
+
+    def fresh() -> List[ImageItem]:
+        return ingestor.ingest(uploads)
+
+    n = len(uploads)
+
+    embedders, captioner = build_models(args)
+    clustering = HDBSCANClusteringAdapter()
+    renderer = JsonRendererAdapter()
+    results: Dict[str, Dict[str, float]] = {}
+
+    # Decode: per-image latency
+    items = fresh()
+    for item in items[:args.warmup]:
+        _ = item.data
+    decode_samples = []
+    for item in items:
+        started = time.perf_counter()
+        _ = item.data
+        decode_samples.append(time.perf_counter() - started)
+    results["decode"] = summarize(decode_samples, 1)
+
+    embeddings = None
+    for name, embedder in embedders.items():
+        samples = time_stage(embedder.extract_embeddings, args.warmup, args.repeat, setup=fresh)
+        results[f"embedding:{name}"] = summarize(samples, n)
+        if embeddings is None:
+            embeddings = embedder.extract_embeddings(fresh())
+
+    results["clustering"] = summarize(
+        time_stage(lambda _: clustering.cluster_embeddings(embeddings), args.warmup, args.repeat), n
+    )
+    label_of = {img.id: c.label for c in clustering.cluster_embeddings(embeddings) for img in c.images}
+    labels = np.array([label_of[filename] for filename, _ in uploads])
+
+    def clustered() -> List[Cluster]:
+        return group_by_label(fresh(), labels)
+
+    results["captioning"] = summarize(
+        time_stage(captioner.generate_descriptions, args.warmup, args.repeat, setup=clustered), n
+    )
+    captioned = captioner.generate_descriptions(clustered())
+    results["render"] = summarize(time_stage(lambda _: renderer.render(captioned), args.warmup, args.repeat), n)
+
+    def save_to_disk(_):
+        with tempfile.TemporaryDirectory() as folder:
+            DiskStorageAdapter(folder).save(captioned)
+    results["storage"] = summarize(time_stage(save_to_disk, args.warmup, args.repeat), n)
+
+    first_embedder = next(iter(embedders.values()))
+
+    def end_to_end(images: List[ImageItem]) -> str:
+        return renderer.render(run_pipeline(images, first_embedder, clustering, captioner))
+    results["end_to_end"] = summarize(time_stage(end_to_end, args.warmup, args.repeat, setup=fresh), n)
+    return results
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Stages whose p50 latency or peak RSS regressed by more than `threshold`."""
+    regressions = []
+    for stage, row in results.items():
+        base = baseline.get(stage)
+        if base is None:
+            continue
+        for metric in ("p50_ms", "peak_rss_mb"):
+            if base[metric] and row[metric] > base[metric] * (1 + threshold):
+                regressions.append(f"{stage} {metric}: {base[metric]} -> {row[metric]}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100, help="Synthetic images")
+    parser.add_argument("--resolution", default="1024x768", help="WIDTHxHEIGHT of the synthetic images")
+    parser.add_argument("--models", choices=("stub", "real"), default="stub")
+    parser.add_argument("--snapshot-dir", help="Local model snapshot for --models real")
+    parser.add_argument("--onnx-model", help="Also benchmark ONNXEmbeddingAdapter with this graph (--models real)")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", help="JSON baseline to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", help="Write this run as a JSON baseline")
+    args = parser.parse_args()
+
+    # Keep the pipeline's INFO logs out of the timings output
+    logging.getLogger().setLevel(logging.WARNING)
+
+    config = {"count": args.count, "resolution": args.resolution, "models": args.models}
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["config"] != config:
+            parser.error(f"Baseline was recorded with {baseline['config']}, not {config}")
+
+    results = run(args)
+
+    print(f"{args.count} images at {args.resolution}, {args.models} models")
+    print(f"{'stage':<22} {'p50 ms':>10} {'p95 ms':>10} {'img/s':>10} {'peak RSS MB':>12} {'base p50':>10}")
+    for stage, row in results.items():
+        base = baseline["results"].get(stage, {}).get("p50_ms", "") if baseline else ""
+        print(f"{stage:<22} {row['p50_ms']:>10} {row['p95_ms']:>10} {str(row['throughput_ips']):>10} "
+              f"{row['peak_rss_mb']:>12} {base:>10}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+
+    if baseline:
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%}.")
+
+if __name__ == "__main__":
+    main()
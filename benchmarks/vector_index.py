@@ -0,0 +1,89 @@
+"""
+Recall and latency of the vector index backends against the brute-force baseline.
+
+Synthetic L2-normalized embeddings (Gaussian blobs) are added to a
+BruteForceVectorIndex and an IVFVectorIndex. Held-out queries are searched in
+both; recall@k is the share of the exact top-k found by the approximate index.
+
+Usage (from the repository root):
+    PYTHONPATH=src python benchmarks/vector_index.py --n 200000 --nprobe 8 16 32
+"""
+import argparse
+import json
+import logging
+import tempfile
+import time
+
+import numpy as np
+
+from app.adapters.index.brute_force_index import BruteForceVectorIndex
+from app.adapters.index.ivf_index import IVFVectorIndex
+
+def synthetic_vectors(n: int, dims: int, centres: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    means = rng.normal(size=(centres, dims)).astype(np.float32)
+    vectors = means[rng.integers(0, centres, size=n)] + 1.2 * rng.normal(size=(n, dims)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def timed_search(index, queries: np.ndarray, k: int):
+    latencies, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append([image_id for image_id, _ in index.search(query, k)[0]])
+        latencies.append(1000.0 * (time.perf_counter() - started))
+    return results, {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3)
+    }
+
+def build(index, vectors: np.ndarray, batch: int = 10000) -> float:
+    started = time.perf_counter()
+    for start in range(0, len(vectors), batch):
+        index.add([str(i) for i in range(start, min(start + batch, len(vectors)))], vectors[start:start + batch])
+    return round(time.perf_counter() - started, 2)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=200000, help="Indexed vectors")
+    parser.add_argument("--dims", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dtype", default="float16")
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    vectors = synthetic_vectors(args.n + args.queries, args.dims, centres=max(10, args.n // 2000))
+    data, queries = vectors[:args.n], vectors[args.n:]
+
+    with tempfile.TemporaryDirectory() as folder:
+        exact = BruteForceVectorIndex(f"{folder}/exact", dtype=args.dtype)
+        build_s = build(exact, data)
+        truth, stats = timed_search(exact, queries, args.k)
+        results = [{"backend": "brute_force", "build_s": build_s, "recall": 1.0, **stats}]
+
+        # Trained explicitly (not in the background) so the build time includes k-means
+        ivf = IVFVectorIndex(f"{folder}/ivf", dtype=args.dtype, nlist=args.nlist, train_size=args.n + 1)
+        started = time.perf_counter()
+        build(ivf, data)
+        ivf.train()
+        build_s = round(time.perf_counter() - started, 2)
+        for nprobe in args.nprobe:
+            ivf.nprobe = nprobe
+            found, stats = timed_search(ivf, queries, args.k)
+            recall = np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)])
+            results.append({"backend": f"ivf(nlist={args.nlist}, nprobe={nprobe})", "build_s": build_s,
+                            "recall": round(float(recall), 4), **stats})
+
+    print(f"{'backend':<32} {'build s':>8} {f'recall@{args.k}':>10} {'p50 ms':>8} {'p95 ms':>8}")
+    for row in results:
+        print(f"{row['backend']:<32} {row['build_s']:>8} {row['recall']:>10} {row['p50_ms']:>8} {row['p95_ms']:>8}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,150 @@
 import numpy as np
 import logging
-from typing import List
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from sklearn.decomposition import PCA
 from sklearn.metrics.pairwise import cosine_distances
 import hdbscan
+# Condenses a single-linkage tree and extracts flat clusters, exactly as HDBSCAN.fit does
+from hdbscan.hdbscan_ import _tree_to_labels
 
-from app.domain.models import EmbeddingVector, Cluster
+from app.config.settings import HDBSCAN_MODE, HDBSCAN_SCALABLE_THRESHOLD, HDBSCAN_PCA_COMPONENTS
+from app.domain.labels import assign_noise_labels, group_by_label
+from app.domain.models import Cluster, EmbeddingBatch, Embeddings, embedding_matrix
 from app.ports.clustering_port import ClusteringPort
 
 logger = logging.getLogger(__name__)
 
+@dataclass
+class FittedClustering:
+    """HDBSCAN clusterer fitted on (optionally PCA-reduced) vectors, kept for prediction."""
+    clusterer: hdbscan.HDBSCAN
+    pca: Optional[PCA] = None
+    # dtype the clusterer was fitted on
+    dtype: str = "float32"
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        if self.pca is not None:
+            return self.pca.transform(np.asarray(vectors, dtype=np.float32)).astype(np.float32, copy=False)
+        return np.asarray(vectors, dtype=self.dtype)
+
+@dataclass
+class ClusterHierarchy:
+    """
+    HDBSCAN single-linkage tree of one embedding set. It depends on the vectors and
+    `min_samples` only, so flat clusterings for any `min_cluster_size` and selection
+    method are cut from it without refitting.
+    Fewer than two embeddings have no tree (no merges); `size` is their count.
+    """
+    single_linkage_tree: np.ndarray
+    min_samples: int
+    size: int
+
 class HDBSCANClusteringAdapter(ClusteringPort):
     """
     Clustering adapter using HDBSCAN on embedding vectors.
     Groups ImageItems into Cluster objects based on cosine similarity.
     Ensures no image is left out, even if considered noise by HDBSCAN.
+
+    Two modes are available:
+    - precomputed: dense float64 cosine distance matrix, O(N^2) memory and time.
+    - scalable: float32 vectors (optionally PCA-reduced) with HDBSCAN's Boruvka
+      tree algorithms, O(N*d) memory. Embeddings are L2-normalized, so euclidean
+      distance is a monotonic function of cosine distance; without PCA the leaf
+      clusters are the same as in the precomputed mode.
     """
 
-    def __init__(self, min_cluster_size: int = 2, min_samples: int = 1):
+    # Above this dimensionality kd-trees degrade, so a ball tree is used instead
+    KDTREE_MAX_DIMS = 60
+
+    def __init__(self, min_cluster_size: int = 2, min_samples: int = 1, mode: str = HDBSCAN_MODE,
+                 scalable_threshold: int = HDBSCAN_SCALABLE_THRESHOLD,
+                 pca_components: int = HDBSCAN_PCA_COMPONENTS):
         """
         min_cluster_size must be >= 2 (HDBSCAN requirement)
         Images marked as noise (-1) will get their own cluster automatically.
+        mode: "precomputed", "scalable" or "auto" (scalable from `scalable_threshold` images on).
+        pca_components: Dimensions kept by PCA in the scalable mode (0 disables it).
         """
         if min_cluster_size < 2:
             logger.warning(
                 "HDBSCAN min_cluster_size must be >= 2, automatically setting to 2"
             )
             min_cluster_size = 2
+        if mode not in ("precomputed", "scalable", "auto"):
+            raise ValueError(f"Unknown HDBSCAN mode: {mode}")
 
         self.min_cluster_size = min_cluster_size
         self.min_samples = min_samples
+        self.mode = mode
+        self.scalable_threshold = scalable_threshold
+        self.pca_components = pca_components
+
+    # Flat cluster selection methods supported by `recut`
+    SELECTION_METHODS = ("leaf", "eom")
 
-    def cluster_embeddings(self, embeddings: List[EmbeddingVector]) -> List[Cluster]:
+    def cluster_embeddings(self, embeddings: Embeddings) -> List[Cluster]:
         if not embeddings:
             return []
 
-        # Convert embeddings to 2D numpy array
-        embeddings_array = np.array([e.value for e in embeddings], dtype=np.float64)
+        labels = self._fit(embeddings).labels_
+
+        # Group images by cluster label; noise images (-1) get their own cluster
+        clusters: List[Cluster] = group_by_label(
+            EmbeddingBatch.of(embeddings).images, assign_noise_labels(labels)
+        )
+
+        logger.info(f"Total clusters (including previously noise images): {len(clusters)}")
+        return clusters
+
+    def select_mode(self, n: int) -> str:
+        """Mode used for `n` embeddings."""
+        if self.mode != "auto":
+            return self.mode
+        return "scalable" if n >= self.scalable_threshold else "precomputed"
+
+    def build_hierarchy(self, embeddings: Embeddings) -> Tuple[ClusterHierarchy, np.ndarray]:
+        """
+        Fit as cluster_embeddings does and keep the single-linkage tree.
+        Returns the hierarchy and the raw label of each embedding (-1 for noise).
+        HDBSCAN cannot fit fewer than two embeddings: they get an empty hierarchy and are noise.
+        """
+        if len(embeddings) < 2:
+            hierarchy = ClusterHierarchy(
+                single_linkage_tree=np.empty((0, 4)), min_samples=self.min_samples, size=len(embeddings)
+            )
+            return hierarchy, self.recut(hierarchy, self.min_cluster_size)
+        clusterer = self._fit(embeddings)
+        hierarchy = ClusterHierarchy(
+            single_linkage_tree=clusterer.single_linkage_tree_.to_numpy(), min_samples=self.min_samples,
+            size=len(embeddings)
+        )
+        return hierarchy, clusterer.labels_
+
+    def recut(self, hierarchy: ClusterHierarchy, min_cluster_size: int,
+              selection_method: str = "leaf") -> np.ndarray:
+        """
+        Raw labels (-1 for noise) of the flat clustering for `min_cluster_size` and
+        `selection_method`, condensed from the stored tree (linear in its size).
+        """
+        if selection_method not in self.SELECTION_METHODS:
+            raise ValueError(f"Unknown cluster selection method: {selection_method}")
+        if len(hierarchy.single_linkage_tree) == 0:
+            # Empty hierarchy of fewer than two embeddings (see build_hierarchy): all noise
+            return np.full(hierarchy.size, -1, dtype=int)
+        labels, _, _, _, _ = _tree_to_labels(
+            None, hierarchy.single_linkage_tree, max(2, min_cluster_size), selection_method
+        )
+        return labels
+
+    def _fit(self, embeddings: Embeddings) -> hdbscan.HDBSCAN:
+        if self.select_mode(len(embeddings)) == "precomputed":
+            return self._fit_precomputed(embeddings)
+        return self._fit_scalable(embeddings)
+
+    def _fit_precomputed(self, embeddings: Embeddings) -> hdbscan.HDBSCAN:
+        # One vectorized float64 copy of the embedding matrix
+        embeddings_array = embedding_matrix(embeddings).astype(np.float64)
 
         # Compute cosine distance matrix
         logger.info("Computing cosine distance matrix...")
@@ -51,24 +160,54 @@ class HDBSCANClusteringAdapter(ClusteringPort):
             prediction_data=True
         )
 
-        labels = clusterer.fit_predict(distance_matrix)
+        return clusterer.fit(distance_matrix)
 
-        # Prepare dictionary to group images by cluster label
-        clusters_dict = {}
-        next_label = max(labels) + 1 if len(labels) > 0 else 0
+    def _fit_scalable(self, embeddings: Embeddings) -> hdbscan.HDBSCAN:
+        return self._fit_vectors(embeddings, scalable=True).clusterer
 
-        for emb, label in zip(embeddings, labels):
-            # Assign noise images (-1) to their own cluster
-            if label == -1:
-                label = next_label
-                next_label += 1
-            clusters_dict.setdefault(label, []).append(emb.image)
+    def fit(self, embeddings: Embeddings) -> Tuple[FittedClustering, np.ndarray]:
+        """
+        Fit on the vectors themselves (never a precomputed matrix), so the model
+        supports `hdbscan.approximate_predict`. Small sets use HDBSCAN's generic
+        algorithm without PCA, which gives the same leaves as the precomputed mode.
+        """
+        fitted = self._fit_vectors(embeddings, scalable=self.select_mode(len(embeddings)) == "scalable")
+        return fitted, fitted.clusterer.labels_
 
-        # Convert to Cluster objects
-        clusters: List[Cluster] = [
-            Cluster(label=label, images=imgs, description=None)
-            for label, imgs in clusters_dict.items()
-        ]
+    def predict(self, model: FittedClustering, embeddings: Embeddings) -> Tuple[np.ndarray, np.ndarray]:
+        if not embeddings:
+            return np.empty(0, dtype=int), np.empty(0)
+        vectors = model.transform(embedding_matrix(embeddings))
+        labels, strengths = hdbscan.approximate_predict(model.clusterer, vectors)
+        return labels, strengths
 
-        logger.info(f"Total clusters (including previously noise images): {len(clusters)}")
-        return clusters
\ No newline at end of file
+    def _fit_vectors(self, embeddings: Embeddings, scalable: bool) -> FittedClustering:
+        # float32 batches are used as they are (no copy)
+        vectors = embedding_matrix(embeddings)
+        n, dims = vectors.shape
+        pca = None
+
+        if scalable:
+            # Optional PCA reduction keeps the space tree-friendly
+            if self.pca_components and dims > self.pca_components and n > self.pca_components:
+                logger.info(f"Reducing {dims} dimensions to {self.pca_components} with PCA...")
+                pca = PCA(n_components=self.pca_components, svd_solver="randomized", random_state=0)
+                vectors = pca.fit_transform(vectors).astype(np.float32, copy=False)
+            algorithm = "boruvka_kdtree" if vectors.shape[1] <= self.KDTREE_MAX_DIMS else "boruvka_balltree"
+        else:
+            # The generic algorithm requires float64 input
+            algorithm = "generic"
+            vectors = vectors.astype(np.float64)
+
+        logger.info(f"Clustering {n} embeddings with HDBSCAN ({algorithm})...")
+        clusterer = hdbscan.HDBSCAN(
+            min_cluster_size=self.min_cluster_size,
+            min_samples=self.min_samples,
+            metric="euclidean",
+            algorithm=algorithm,
+            cluster_selection_method="leaf",
+            prediction_data=True
+        )
+        clusterer.fit(vectors)
+
+        return FittedClustering(clusterer=clusterer, pca=pca, dtype=vectors.dtype.name)
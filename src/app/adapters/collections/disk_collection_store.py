@@ -0,0 +1,121 @@
+import json
+import os
+import pickle
+import re
+import shutil
+from typing import List, Optional
+
+import numpy as np
+
+from app.domain.models import Collection, ImageItem
+from app.ports.collection_store_port import CollectionStorePort
+
+class DiskCollectionStore(CollectionStorePort):
+    """
+    Collection store that keeps each collection in its own folder:
+    meta.json (ids, descriptions, counters), embeddings.npy, labels.npy,
+    model.pkl (fitted clusterer) and images/ (original uploaded bytes).
+    """
+
+    NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+    def __init__(self, root_folder: str):
+        """
+        root_folder: Folder holding one subfolder per collection.
+        """
+        self.root_folder = root_folder
+        os.makedirs(self.root_folder, exist_ok=True)
+
+    def load(self, name: str) -> Optional[Collection]:
+        path = self._path(name)
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(os.path.join(path, "model.pkl"), "rb") as f:
+            model = pickle.load(f)
+
+        return Collection(
+            name=name,
+            image_ids=meta["image_ids"],
+            embeddings=np.load(os.path.join(path, "embeddings.npy")),
+            labels=np.load(os.path.join(path, "labels.npy")),
+            descriptions={int(label): desc for label, desc in meta["descriptions"].items()},
+            model=model,
+            pending_total=meta["pending_total"],
+            pending_outliers=meta["pending_outliers"],
+            image_paths=[os.path.join(path, "images", filename) for filename in meta["image_files"]]
+        )
+
+    def save(self, collection: Collection) -> None:
+        self._write(self._path(collection.name), collection)
+
+    def store_images(self, name: str, images: List[ImageItem], start: int) -> List[str]:
+        return self._write_images(os.path.join(self._path(name), "images"), images, start)
+
+    def replace(self, collection: Collection, images: List[ImageItem]) -> None:
+        path = self._path(collection.name)
+        # The new version is written next to the live folder and swapped in at the end.
+        # Names never contain ".", so these folders cannot clash with a collection
+        staging, retired = f"{path}.staging", f"{path}.retired"
+        shutil.rmtree(staging, ignore_errors=True)
+        try:
+            staged = self._write_images(os.path.join(staging, "images"), images, start=0)
+            collection.image_paths = [os.path.join(path, "images", os.path.basename(p)) for p in staged]
+            self._write(staging, collection)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        shutil.rmtree(retired, ignore_errors=True)
+        if os.path.exists(path):
+            os.replace(path, retired)
+        os.replace(staging, path)
+        shutil.rmtree(retired, ignore_errors=True)
+
+    def delete(self, name: str) -> None:
+        shutil.rmtree(self._path(name), ignore_errors=True)
+
+    def _write(self, path: str, collection: Collection) -> None:
+        os.makedirs(path, exist_ok=True)
+
+        # Data files first; meta.json is replaced last and marks the new version
+        np.save(os.path.join(path, "embeddings.npy"), collection.embeddings)
+        np.save(os.path.join(path, "labels.npy"), collection.labels)
+        with open(os.path.join(path, "model.pkl"), "wb") as f:
+            pickle.dump(collection.model, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        meta_path = os.path.join(path, "meta.json")
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "image_ids": collection.image_ids,
+                "image_files": [os.path.basename(p) for p in collection.image_paths],
+                "descriptions": {str(label): desc for label, desc in collection.descriptions.items()},
+                "pending_total": collection.pending_total,
+                "pending_outliers": collection.pending_outliers
+            }, f, ensure_ascii=False)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    @staticmethod
+    def _write_images(folder: str, images: List[ImageItem], start: int) -> List[str]:
+        os.makedirs(folder, exist_ok=True)
+
+        paths = []
+        for offset, img_obj in enumerate(images):
+            extension = os.path.splitext(img_obj.id)[1] or ".png"
+            img_path = os.path.join(folder, f"{start + offset:08d}{extension}")
+            # Original bytes are written as-is; in-memory images are encoded
+            if img_obj.source is not None:
+                with open(img_path, "wb") as f:
+                    f.write(img_obj.source)
+            else:
+                img_obj.data.save(img_path)
+            paths.append(img_path)
+        return paths
+
+    def _path(self, name: str) -> str:
+        if not self.NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid collection name: {name}")
+        return os.path.join(self.root_folder, name)
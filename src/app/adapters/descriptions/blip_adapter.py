@@ -1,64 +1,129 @@
-import torch
-from typing import List
+import os
+from typing import List, Optional, Tuple
 import logging
 
+from PIL import Image
 from transformers import BlipProcessor, BlipForConditionalGeneration
 
-from app.domain.models import Cluster
+from app.adapters.inference.inference_modes import inference_context, prepare_model
+from app.adapters.inference.torch_runtime import DEVICE
+from app.domain.models import Cluster, ImageItem
 from app.ports.captioning_port import CaptioningPort
-from app.config.settings import DEVICE
+from app.config.settings import (
+    CAPTION_BATCH_SIZE,
+    CAPTION_IMAGES_PER_CLUSTER,
+    CAPTION_MAX_NEW_TOKENS,
+    CAPTION_NUM_BEAMS,
+    CAPTION_INFERENCE_MODE
+)
 
 logger = logging.getLogger(__name__)
 
 class BLIPCaptioningAdapter(CaptioningPort):
     """
     Captioning adapter using BLIP to generate descriptions for clusters.
+    Representative images of all clusters are captioned together in batched
+    `generate` calls, then captions are scattered back to their clusters.
     Updates the `description` field of each Cluster in memory.
     """
-    def __init__(self):
+
+    model_id = "Salesforce/blip-image-captioning-base"
+    # Subfolder of a model snapshot (see app.tools.materialize_models)
+    snapshot_name = "blip"
+
+    def __init__(self, batch_size: int = CAPTION_BATCH_SIZE,
+                 max_new_tokens: int = CAPTION_MAX_NEW_TOKENS,
+                 num_beams: int = CAPTION_NUM_BEAMS,
+                 images_per_cluster: int = CAPTION_IMAGES_PER_CLUSTER,
+                 snapshot_dir: Optional[str] = None,
+                 inference_mode: str = CAPTION_INFERENCE_MODE):
         """
         Load BLIP model and processor into memory.
+        batch_size: Images per batched generate call.
+        max_new_tokens / num_beams: Decoding limits passed to generate.
+        images_per_cluster: Representative images captioned per cluster.
+        snapshot_dir: Local model snapshot; when set, nothing is fetched from the network.
+        inference_mode: One of app.adapters.inference.inference_modes.INFERENCE_MODES.
         """
         logger.info("Loading BLIP model and processor...")
+        source = self.model_id
+        if snapshot_dir:
+            source = os.path.join(snapshot_dir, self.snapshot_name)
         self.processor = BlipProcessor.from_pretrained(
-            "Salesforce/blip-image-captioning-base",
-            use_fast=True
+            source,
+            use_fast=True,
+            local_files_only=bool(snapshot_dir)
         )
         self.model = BlipForConditionalGeneration.from_pretrained(
-            "Salesforce/blip-image-captioning-base"
+            source,
+            local_files_only=bool(snapshot_dir)
         ).to(DEVICE)
-        logger.info("BLIP loaded successfully.")
+        self.model.eval()
+        self.inference_mode = inference_mode
+        # The text decoder changes shape at every generated token; only the vision tower is compiled
+        self.model = prepare_model(self.model, inference_mode, compile_attr="vision_model")
+        self.batch_size = batch_size
+        self.max_new_tokens = max_new_tokens
+        self.num_beams = num_beams
+        self.images_per_cluster = images_per_cluster
+        size = self.processor.image_processor.size
+        self.input_size = (size["width"], size["height"])
+        logger.info(f"BLIP loaded successfully ({inference_mode}).")
+
+    def warmup(self) -> None:
+        """Caption one blank image (first-call allocations, kernel selection)."""
+        self._caption_images([ImageItem(id="warmup", image=Image.new("RGB", self.input_size))])
 
     def generate_descriptions(self, clusters: List[Cluster]) -> List[Cluster]:
-        # Generate descriptions for each cluster
+        # Generate descriptions for all clusters in shared batches
         logger.info("Generating descriptions with BLIP...")
 
-        for cluster in clusters:
-            imgs = cluster.images
+        # Gather (cluster index, image) pairs, keeping the per-cluster image order
+        jobs: List[Tuple[int, object]] = []
+        for index, cluster in enumerate(clusters):
             # Skip empty clusters or unlabelled (-1) clusters
-            if cluster.label != -1 and imgs:
-                # Take up to first 3 images for description
-                selected_imgs = imgs[:3]
-                descriptions = []
-
-                for img_obj in selected_imgs:
-                    # Ensure image is RGB
-                    img = img_obj.data.convert("RGB")
-                    # Prepare inputs for BLIP
-                    inputs = self.processor(
-                        images=img, return_tensors="pt"
-                    ).to(DEVICE)
-
-                    # Generate description without computing gradients
-                    with torch.no_grad():
-                        out = self.model.generate(**inputs)
-
-                    # Decode output tokens to text
-                    desc = self.processor.decode(out[0], skip_special_tokens=True)
-                    descriptions.append(desc)
-
-                # Remove duplicates and join descriptions
-                cluster.description = " / ".join(dict.fromkeys(descriptions))
-                logger.info(f"Cluster {cluster.label} description: {cluster.description}")
+            if cluster.label != -1 and cluster.images:
+                # Take up to first N images for description
+                for img_obj in cluster.images[:self.images_per_cluster]:
+                    jobs.append((index, img_obj))
+
+        captions = self._caption_images([img_obj for _, img_obj in jobs])
+
+        # Scatter captions back to their clusters
+        descriptions = {}
+        for (index, _), desc in zip(jobs, captions):
+            descriptions.setdefault(index, []).append(desc)
+
+        for index, cluster_descriptions in descriptions.items():
+            cluster = clusters[index]
+            # Remove duplicates and join descriptions
+            cluster.description = " / ".join(dict.fromkeys(cluster_descriptions))
+            logger.info(f"Cluster {cluster.label} description: {cluster.description}")
 
         return clusters
+
+    def _caption_images(self, images: List) -> List[str]:
+        """
+        Caption ImageItems in batches of `batch_size`, preserving input order.
+        """
+        captions: List[str] = []
+        for i in range(0, len(images), self.batch_size):
+            # RGB views already at the processor's input size, cached on each ImageItem
+            batch = [img_obj.view("blip", self._to_input) for img_obj in images[i:i + self.batch_size]]
+            inputs = self.processor(images=batch, return_tensors="pt").to(DEVICE)
+
+            # Generate descriptions without computing gradients
+            with inference_context(self.inference_mode):
+                out = self.model.generate(
+                    **inputs,
+                    max_new_tokens=self.max_new_tokens,
+                    num_beams=self.num_beams
+                )
+
+            # Decode output tokens to text (padding tokens are skipped)
+            captions.extend(self.processor.batch_decode(out, skip_special_tokens=True))
+        return captions
+
+    def _to_input(self, img: Image.Image) -> Image.Image:
+        # Same resize the BLIP processor applies, so its own resize becomes a no-op
+        return img.convert("RGB").resize(self.input_size, Image.BICUBIC)
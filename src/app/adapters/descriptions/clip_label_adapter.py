@@ -0,0 +1,117 @@
+import hashlib
+import logging
+import os
+from typing import List, Optional, Sequence
+
+import numpy as np
+from PIL import Image
+
+from app.domain.models import Cluster, ImageItem, embedding_matrix
+from app.ports.captioning_port import CaptioningPort
+
+logger = logging.getLogger(__name__)
+
+# Used when no label file is configured
+DEFAULT_LABELS = (
+    "person", "group of people", "child", "face", "dog", "cat", "bird", "horse", "fish", "insect",
+    "flower", "tree", "forest", "mountain", "beach", "sea", "lake", "river", "desert", "snow",
+    "sky", "sunset", "city street", "building", "house", "interior room", "kitchen", "office",
+    "car", "bicycle", "motorcycle", "bus", "train", "airplane", "boat",
+    "food", "fruit", "vegetables", "dessert", "drink",
+    "shoes", "clothing", "bag", "watch", "jewelry", "glasses",
+    "furniture", "chair", "table", "bed", "lamp",
+    "phone", "computer", "television", "camera", "book", "toy", "sports equipment",
+    "painting", "drawing", "text document", "screenshot", "logo", "chart"
+)
+
+def load_labels(path: Optional[str]) -> List[str]:
+    """Labels from a text file (one per line, blank lines and # comments ignored), or DEFAULT_LABELS."""
+    if not path:
+        return list(DEFAULT_LABELS)
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+class CLIPLabelCaptioningAdapter(CaptioningPort):
+    """
+    Zero-shot captioning adapter: labels each cluster with the vocabulary entries
+    closest to its centroid in OpenCLIP space, instead of generating text with BLIP.
+    Text embeddings of the vocabulary are computed once at startup (and kept on disk
+    when `cache_dir` is set). Representative images of all clusters are embedded in
+    shared batches; all clusters are then scored against the vocabulary with one
+    matrix product. Descriptions use the BLIP format ("label / label / label").
+    """
+
+    def __init__(self, clip, labels: Sequence[str], top_k: int = 3,
+                 images_per_cluster: int = 3, prompt: str = "a photo of {}",
+                 cache_dir: Optional[str] = None):
+        """
+        clip: OpenCLIPEmbeddingAdapter providing image and text embeddings.
+        labels: Vocabulary the descriptions are chosen from.
+        top_k: Labels per description.
+        images_per_cluster: Representative images averaged into each cluster centroid.
+        prompt: Template each label is put into before encoding.
+        cache_dir: Folder for the vocabulary embeddings. None keeps them in memory only.
+        """
+        if not labels:
+            raise ValueError("The label vocabulary is empty")
+        self.clip = clip
+        self.labels = list(labels)
+        self.top_k = min(top_k, len(self.labels))
+        self.images_per_cluster = images_per_cluster
+        self.prompt = prompt
+        texts = [prompt.format(label) for label in self.labels]
+        # Identifies the vocabulary and prompt (embedding cache file, result cache keys)
+        self.vocabulary_key = hashlib.sha256("\n".join([clip.model_id] + texts).encode("utf-8")).hexdigest()[:16]
+        self.model_id = f"{clip.model_id}:labels:{self.vocabulary_key}:top{self.top_k}"
+        self.text_embeddings = self._vocabulary_embeddings(texts, cache_dir)
+        logger.info(f"CLIP labeler ready with {len(self.labels)} labels.")
+
+    @property
+    def model(self):
+        # Reported by the model memory gauge
+        return self.clip.model
+
+    def warmup(self) -> None:
+        """Label one blank image (first-call allocations, kernel selection)."""
+        blank = ImageItem(id="warmup", image=Image.new("RGB", (224, 224)))
+        self.generate_descriptions([Cluster(label=0, images=[blank])])
+
+    def generate_descriptions(self, clusters: List[Cluster]) -> List[Cluster]:
+        # Representative images of all clusters, embedded in shared batches
+        described = [c for c in clusters if c.label != -1 and c.images]
+        if not described:
+            return clusters
+        counts = [min(len(c.images), self.images_per_cluster) for c in described]
+        images = [img for c, n in zip(described, counts) for img in c.images[:n]]
+        vectors = embedding_matrix(self.clip.extract_embeddings(images))
+
+        # Normalized centroid per cluster: (clusters, d)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        centroids = np.add.reduceat(vectors, starts, axis=0)
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+
+        # Cosine similarity of every centroid to every label, then top-k per row
+        scores = centroids @ self.text_embeddings.T
+        top = np.argpartition(-scores, self.top_k - 1, axis=1)[:, :self.top_k]
+        order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+        top = np.take_along_axis(top, order, axis=1)
+
+        for cluster, indices in zip(described, top):
+            cluster.description = " / ".join(self.labels[i] for i in indices)
+            logger.info(f"Cluster {cluster.label} description: {cluster.description}")
+        return clusters
+
+    def _vocabulary_embeddings(self, texts: List[str], cache_dir: Optional[str]) -> np.ndarray:
+        path = None
+        if cache_dir:
+            path = os.path.join(cache_dir, f"{self.vocabulary_key}.npy")
+            if os.path.exists(path):
+                return np.load(path)
+
+        logger.info(f"Encoding {len(texts)} label prompts...")
+        embeddings = np.ascontiguousarray(self.clip.encode_text(texts), dtype=np.float32)
+        if path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.save(path + ".tmp.npy", embeddings)
+            os.replace(path + ".tmp.npy", path)
+        return embeddings
@@ -0,0 +1,25 @@
+from typing import List
+
+from app.core.model_registry import ModelRegistry
+from app.domain.models import Cluster
+from app.ports.captioning_port import CaptioningPort
+
+class LazyCaptioningAdapter(CaptioningPort):
+    """
+    CaptioningPort resolved from a ModelRegistry on first use.
+    """
+
+    def __init__(self, registry: ModelRegistry, name: str):
+        self.registry = registry
+        self.name = name
+
+    @property
+    def adapter(self) -> CaptioningPort:
+        return self.registry.get(self.name)
+
+    @property
+    def model_id(self) -> str:
+        return getattr(self.adapter, "model_id", type(self.adapter).__name__)
+
+    def generate_descriptions(self, clusters: List[Cluster]) -> List[Cluster]:
+        return self.adapter.generate_descriptions(clusters)
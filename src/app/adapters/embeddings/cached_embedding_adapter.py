@@ -0,0 +1,156 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.adapters.storage.mmap_matrix import MmapMatrix
+from app.domain.models import ImageItem, EmbeddingBatch
+from app.ports.embedding_port import EmbeddingPort
+
+logger = logging.getLogger(__name__)
+
+class CachedEmbeddingAdapter(EmbeddingPort):
+    """
+    Content-addressed cache in front of another EmbeddingPort.
+    Keys are a hash of the uploaded image bytes plus the wrapped model id and
+    preprocessing config, so a model or transform change never reuses stale vectors.
+    Lookups go through a bounded in-memory LRU tier first, then an optional
+    persistent disk tier (memory-mapped float32 matrix + JSON index).
+    All misses of a call are sent to the wrapped adapter in a single batch, and
+    its output matrix goes to the disk tier (and, when every image missed, back
+    to the caller) as is; the memory tier keeps its own copy of each row, so it
+    neither pins the model's matrix nor changes when a caller modifies it.
+    """
+
+    def __init__(self, embedding_service: EmbeddingPort, max_memory_items: int = 4096,
+                 cache_dir: Optional[str] = None):
+        """
+        embedding_service: Adapter that computes embeddings on a cache miss.
+        max_memory_items: Capacity of the in-memory LRU tier.
+        cache_dir: Folder of the disk tier. None disables it.
+        """
+        self.embedding_service = embedding_service
+        self.max_memory_items = max_memory_items
+        self.cache_dir = cache_dir
+        # Resolved on first use, so a lazily loaded model is not loaded here
+        self._namespace_value: Optional[str] = None
+        self._disk_matrix: Optional[MmapMatrix] = None
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def model_id(self) -> str:
+        return getattr(self.embedding_service, "model_id", type(self.embedding_service).__name__)
+
+    @property
+    def preprocess_config(self) -> str:
+        return getattr(self.embedding_service, "preprocess_config", "")
+
+    @property
+    def _namespace(self) -> str:
+        if self._namespace_value is None:
+            self._namespace_value = hashlib.sha256(
+                f"{self.model_id}|{self.preprocess_config}".encode("utf-8")
+            ).hexdigest()[:16]
+        return self._namespace_value
+
+    @property
+    def _disk(self) -> Optional[MmapMatrix]:
+        if self._disk_matrix is None and self.cache_dir:
+            self._disk_matrix = MmapMatrix(f"{self.cache_dir}/{self._namespace}")
+        return self._disk_matrix
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current tier sizes, for cache sizing."""
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_items": len(self._memory),
+                "memory_capacity": self.max_memory_items,
+                "disk_items": len(self._disk_matrix) if self._disk_matrix is not None else 0
+            }
+
+    def extract_embeddings(self, images: List[ImageItem]) -> EmbeddingBatch:
+        keys = [self._key(img) for img in images]
+        values: Dict[str, np.ndarray] = {}
+        missing: Dict[str, ImageItem] = {}
+
+        with self._lock:
+            for key, img in zip(keys, images):
+                if key in values or key in missing:
+                    continue
+                value = self._lookup(key)
+                if value is None:
+                    missing[key] = img
+                else:
+                    values[key] = value
+            self.misses += len(missing)
+
+        miss_matrix = None
+        if missing:
+            # One batched call for every miss of this request
+            computed = EmbeddingBatch.of(self.embedding_service.extract_embeddings(list(missing.values())))
+            miss_keys = list(missing.keys())
+            miss_matrix = computed.vectors()
+            with self._lock:
+                for key, value in zip(miss_keys, miss_matrix):
+                    values[key] = value
+                    self._remember(key, value.copy())
+                if self._disk is not None:
+                    self._disk.append(miss_keys, miss_matrix)
+                    self._disk.flush()
+
+        logger.info(
+            f"Embedding cache: {len(images) - len(missing)} hits, {len(missing)} misses "
+            f"(totals: {self.stats()})"
+        )
+        if miss_matrix is not None and len(missing) == len(images):
+            # Every image missed (and none repeats): the model's matrix is the result
+            return EmbeddingBatch(images=list(images), matrix=miss_matrix)
+        if not images:
+            return EmbeddingBatch.empty([], 0)
+        result = EmbeddingBatch.empty(images, len(values[keys[0]]))
+        for row, key in enumerate(keys):
+            result.matrix[row] = values[key]
+        return result
+
+    def _key(self, image: ImageItem) -> str:
+        digest = image.digest
+        if digest is None:
+            # No upload bytes available: fall back to the decoded pixels
+            img = image.data
+            digest = hashlib.sha256(
+                f"{img.mode}{img.size}".encode("utf-8") + img.tobytes()
+            ).hexdigest()
+        return f"{self._namespace}:{digest}"
+
+    def _lookup(self, key: str) -> Optional[np.ndarray]:
+        value = self._memory.get(key)
+        if value is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return value
+        if self._disk is not None:
+            row = self._disk.get(key)
+            if row is not None:
+                value = np.array(row, dtype=np.float32)
+                self._remember(key, value)
+                self.disk_hits += 1
+                return value
+        return None
+
+    def _remember(self, key: str, value: np.ndarray) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
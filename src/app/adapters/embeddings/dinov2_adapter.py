@@ -1,10 +1,16 @@
+import os
 import torch
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from PIL import Image
 from tqdm import tqdm
 import logging
 
-from app.config.settings import DEVICE
-from app.domain.models import ImageItem, EmbeddingVector
+from app.adapters.embeddings.preprocessing import iter_preprocessed_batches
+from app.adapters.inference.inference_modes import inference_context, prepare_model, to_model_input
+from app.adapters.inference.torch_runtime import DEVICE
+from app.config.settings import EMBEDDING_INFERENCE_MODE, PREPROCESS_WORKERS, PROGRESS_BARS
+from app.domain.models import ImageItem, EmbeddingBatch
 from app.ports.embedding_port import EmbeddingPort
 
 logger = logging.getLogger(__name__)
@@ -13,19 +19,48 @@ class DINOv2EmbeddingAdapter(EmbeddingPort):
     """
     Embedding service using DINOv2.
     Extracts normalized embeddings for a list of ImageItem objects.
-    Supports GPU/MPS batching and CPU sequential processing.
+    Images are processed in batches of `batch_size_gpu` on every device, CPU included.
+    Preprocessing of the next batch runs in a thread pool while the current one is in the model.
     """
 
-    def __init__(self, batch_size_gpu: int = 16):
+    model_id = "facebookresearch/dinov2:dinov2_vitb14"
+    # Subfolder of a model snapshot (see app.tools.materialize_models)
+    snapshot_name = "dinov2"
+
+    def __init__(self, batch_size_gpu: int = 16, snapshot_dir: Optional[str] = None,
+                 inference_mode: str = EMBEDDING_INFERENCE_MODE):
+        """
+        batch_size_gpu: Images per forward pass, on GPU, MPS and CPU alike.
+        snapshot_dir: Local model snapshot; when set, nothing is fetched from the network.
+        inference_mode: One of app.adapters.inference.inference_modes.INFERENCE_MODES.
+        """
         logger.info(f"Loading DINOv2 model on {DEVICE}...")
         # Carga del modelo DINOv2 ViT-B/14
-        self.model = torch.hub.load(
-            "facebookresearch/dinov2",
-            "dinov2_vitb14"
-        ).to(DEVICE)
+        if snapshot_dir:
+            # Código del hub y pesos safetensors desde el snapshot local
+            from safetensors.torch import load_file
+            folder = os.path.join(snapshot_dir, self.snapshot_name)
+            self.model = torch.hub.load(
+                os.path.join(folder, "hub"),
+                "dinov2_vitb14",
+                source="local",
+                pretrained=False
+            )
+            self.model.load_state_dict(load_file(os.path.join(folder, "model.safetensors")))
+            self.model = self.model.to(DEVICE)
+        else:
+            self.model = torch.hub.load(
+                "facebookresearch/dinov2",
+                "dinov2_vitb14"
+            ).to(DEVICE)
         self.model.eval()
+        self.inference_mode = inference_mode
+        self.model = prepare_model(self.model, inference_mode)
+        if inference_mode != "fp32":
+            # Other modes give slightly different vectors: keep their cache entries apart
+            self.model_id = f"{self.model_id}:{inference_mode}"
         self.batch_size_gpu = batch_size_gpu
-        logger.info("DINOv2 model loaded successfully.")
+        logger.info(f"DINOv2 model loaded successfully ({inference_mode}).")
 
         # Preprocess: se usa transform de DINOv2
         # Normalmente DINOv2 espera imágenes [0,1] y tamaño 224x224
@@ -36,26 +71,41 @@ class DINOv2EmbeddingAdapter(EmbeddingPort):
             T.ToTensor(),
             T.Normalize(mean=[0.5, 0.5, 0.5], std=[0.5, 0.5, 0.5])
         ])
+        # Identifies the transform for cache keys
+        self.preprocess_config = repr(self.preprocess)
+        self.executor = ThreadPoolExecutor(
+            max_workers=PREPROCESS_WORKERS, thread_name_prefix="dinov2-preprocess"
+        )
+
+    def warmup(self) -> None:
+        """Run one forward pass on a blank image (first-call allocations, kernel selection)."""
+        self.extract_embeddings([ImageItem(id="warmup", image=Image.new("RGB", (224, 224)))])
 
-    def extract_embeddings(self, images: List[ImageItem]) -> List[EmbeddingVector]:
-        embeddings: List[EmbeddingVector] = []
+    def extract_embeddings(self, images: List[ImageItem]) -> EmbeddingBatch:
+        embeddings: Optional[EmbeddingBatch] = None
+        start = 0
         logger.info(f"Starting extraction of embeddings for {len(images)} images using {DEVICE}.")
 
-        # Procesamiento por batch
-        for i in tqdm(range(0, len(images), self.batch_size_gpu), desc="Extracting embeddings"):
-            batch = images[i:i + self.batch_size_gpu]
+        # Procesamiento por batch; el preprocess del siguiente batch corre en el pool
+        batches = iter_preprocessed_batches(images, self.preprocess, self.batch_size_gpu, self.executor)
+        total = (len(images) + self.batch_size_gpu - 1) // self.batch_size_gpu
 
-            # Preprocess y apilado en tensor
-            batch_tensor = torch.stack([self.preprocess(img.data) for img in batch]).to(DEVICE)
+        progress = tqdm(batches, total=total, desc="Extracting embeddings", disable=not PROGRESS_BARS)
+        for batch, batch_tensor in progress:
+            batch_tensor = to_model_input(batch_tensor, self.inference_mode)
 
             # Forward pass
-            with torch.no_grad():
-                emb = self.model(batch_tensor)
+            with inference_context(self.inference_mode):
+                emb = self.model(batch_tensor).float()
                 emb = emb / emb.norm(dim=-1, keepdim=True)  # Normalización
 
-            # Convertir a EmbeddingVector
-            for img_item, e in zip(batch, emb.cpu().numpy()):
-                embeddings.append(EmbeddingVector(image=img_item, value=e))
+            # Escritura directa en la matriz de salida (reservada al conocer la dimensión)
+            if embeddings is None:
+                embeddings = EmbeddingBatch.empty(images, emb.shape[1])
+            embeddings.matrix[start:start + len(batch)] = emb.cpu().numpy()
+            start += len(batch)
 
+        if embeddings is None:
+            embeddings = EmbeddingBatch.empty([], 0)
         logger.info(f"Completed extraction of {len(embeddings)} embeddings.")
         return embeddings
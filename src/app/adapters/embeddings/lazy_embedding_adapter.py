@@ -0,0 +1,30 @@
+from typing import List
+
+from app.core.model_registry import ModelRegistry
+from app.domain.models import ImageItem, EmbeddingBatch
+from app.ports.embedding_port import EmbeddingPort
+
+class LazyEmbeddingAdapter(EmbeddingPort):
+    """
+    EmbeddingPort resolved from a ModelRegistry on first use.
+    Lets decorators (cache, micro-batching) be built before the model is loaded.
+    """
+
+    def __init__(self, registry: ModelRegistry, name: str):
+        self.registry = registry
+        self.name = name
+
+    @property
+    def adapter(self) -> EmbeddingPort:
+        return self.registry.get(self.name)
+
+    @property
+    def model_id(self) -> str:
+        return getattr(self.adapter, "model_id", type(self.adapter).__name__)
+
+    @property
+    def preprocess_config(self) -> str:
+        return getattr(self.adapter, "preprocess_config", "")
+
+    def extract_embeddings(self, images: List[ImageItem]) -> EmbeddingBatch:
+        return self.adapter.extract_embeddings(images)
@@ -0,0 +1,116 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Tuple
+
+from app.domain.models import ImageItem, EmbeddingBatch
+from app.ports.embedding_port import EmbeddingPort
+
+logger = logging.getLogger(__name__)
+
+class MicroBatchingEmbeddingAdapter(EmbeddingPort):
+    """
+    Dynamic micro-batching in front of another EmbeddingPort.
+    Concurrent pipelines enqueue their images; a single scheduler thread merges
+    pending requests into one call to the wrapped adapter until the batch is
+    full or the oldest request has waited `max_wait_ms`. Each caller gets back
+    only its own rows, as a view of the merged EmbeddingBatch (no copy). Requests are never split: one that would
+    overflow the batch starts the next one, and one larger than
+    `max_batch_size` runs on its own.
+    """
+
+    def __init__(self, embedding_service: EmbeddingPort, max_batch_size: int = 16,
+                 max_wait_ms: float = 5.0):
+        """
+        embedding_service: Adapter running the model (called from one thread only).
+        max_batch_size: Target number of images per merged call.
+        max_wait_ms: Longest time the first request of a batch waits for others.
+        """
+        self.embedding_service = embedding_service
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000.0
+
+        self._queue: "queue.Queue[Tuple[List[ImageItem], Future, float]]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.images = 0
+        self.queue_wait_s = 0.0
+
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    @property
+    def model_id(self) -> str:
+        return getattr(self.embedding_service, "model_id", type(self.embedding_service).__name__)
+
+    @property
+    def preprocess_config(self) -> str:
+        return getattr(self.embedding_service, "preprocess_config", "")
+
+    def extract_embeddings(self, images: List[ImageItem]) -> EmbeddingBatch:
+        if not images:
+            return EmbeddingBatch.empty([], 0)
+        future: Future = Future()
+        self._queue.put((images, future, time.monotonic()))
+        return future.result()
+
+    def stats(self) -> Dict[str, float]:
+        """Batches run, images embedded, mean batch fill ratio and mean queue wait."""
+        with self._stats_lock:
+            return {
+                "batches": self.batches,
+                "images": self.images,
+                "mean_fill_ratio": self.images / (self.batches * self.max_batch_size) if self.batches else 0.0,
+                "mean_queue_wait_ms": 1000.0 * self.queue_wait_s / self.batches if self.batches else 0.0
+            }
+
+    def _run(self) -> None:
+        carry = None
+        while True:
+            # A request that did not fit in the previous batch starts the next one
+            pending = [carry if carry is not None else self._queue.get()]
+            carry = None
+            size = len(pending[0][0])
+            deadline = pending[0][2] + self.max_wait_s
+
+            # Gather more requests until the batch is full or the deadline passes
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if size + len(request[0]) > self.max_batch_size:
+                    carry = request
+                    break
+                pending.append(request)
+                size += len(request[0])
+
+            self._process(pending, size)
+
+    def _process(self, pending: List[Tuple[List[ImageItem], Future, float]], size: int) -> None:
+        started = time.monotonic()
+        merged = [img for images, _, _ in pending for img in images]
+        try:
+            embeddings = EmbeddingBatch.of(self.embedding_service.extract_embeddings(merged))
+        except Exception as e:
+            for _, future, _ in pending:
+                future.set_exception(e)
+            return
+
+        # Split the merged result back per request, in submission order (slices are views)
+        offset = 0
+        for images, future, _ in pending:
+            future.set_result(embeddings[offset:offset + len(images)])
+            offset += len(images)
+
+        with self._stats_lock:
+            self.batches += 1
+            self.images += size
+            self.queue_wait_s += sum(started - enqueued for _, _, enqueued in pending) / len(pending)
+        if len(pending) > 1:
+            logger.info(f"Merged {len(pending)} requests into one batch of {size} images")
@@ -0,0 +1,118 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+import onnxruntime as ort
+from PIL import Image
+from tqdm import tqdm
+
+from app.adapters.embeddings.preprocessing import iter_preprocessed_batches
+from app.config.settings import EMBEDDING_BATCH_SIZE_CPU, PREPROCESS_WORKERS, PROGRESS_BARS, TORCH_NUM_THREADS
+from app.domain.models import ImageItem, EmbeddingBatch
+from app.ports.embedding_port import EmbeddingPort
+
+logger = logging.getLogger(__name__)
+
+INTERPOLATIONS = {"nearest": Image.NEAREST, "bilinear": Image.BILINEAR, "bicubic": Image.BICUBIC}
+
+def config_path(model_path: str) -> str:
+    """Preprocessing config written next to an exported graph (model.onnx -> model.json)."""
+    return os.path.splitext(model_path)[0] + ".json"
+
+class ONNXEmbeddingAdapter(EmbeddingPort):
+    """
+    Embedding service running an image encoder exported by app.tools.export_onnx
+    through ONNX Runtime on CPU, without torch.
+    Resize and center crop run in PIL in a thread pool (next batch ahead of the
+    model, as in the torch adapters); scaling, normalization and the NCHW layout
+    are one vectorized NumPy step per batch. Outputs are L2-normalized.
+    """
+
+    def __init__(self, model_path: str, batch_size: int = EMBEDDING_BATCH_SIZE_CPU,
+                 intra_op_threads: int = TORCH_NUM_THREADS):
+        """
+        model_path: Exported .onnx graph; its .json preprocessing config must sit next to it.
+        batch_size: Images per session run (the graph has a dynamic batch axis).
+        intra_op_threads: ONNX Runtime threads per operator.
+        """
+        logger.info(f"Loading ONNX embedding model {model_path}...")
+        with open(config_path(model_path)) as f:
+            self.config = json.load(f)
+        preprocess = self.config["preprocess"]
+
+        # Distinct from the torch model id: outputs match closely, not bit for bit
+        self.model_id = f"{self.config['model_id']}:onnx"
+        self.preprocess_config = json.dumps(preprocess, sort_keys=True)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+        self.resize = preprocess["resize"]
+        self.crop = preprocess["crop"]
+        self.interpolation = INTERPOLATIONS[preprocess["interpolation"]]
+        # (x / 255 - mean) / std folded into one subtract and one multiply on uint8 pixels
+        self.offset = 255.0 * np.asarray(preprocess["mean"], dtype=np.float32)
+        self.scale = 1.0 / (255.0 * np.asarray(preprocess["std"], dtype=np.float32))
+
+        self.batch_size = batch_size
+        self.executor = ThreadPoolExecutor(
+            max_workers=PREPROCESS_WORKERS, thread_name_prefix="onnx-preprocess"
+        )
+        logger.info("ONNX embedding model loaded successfully.")
+
+    def warmup(self) -> None:
+        """Run one forward pass on a blank image (session initialization, buffer allocation)."""
+        self.extract_embeddings([ImageItem(id="warmup", image=Image.new("RGB", (self.crop, self.crop)))])
+
+    def extract_embeddings(self, images: List[ImageItem]) -> EmbeddingBatch:
+        embeddings: Optional[EmbeddingBatch] = None
+        start = 0
+        logger.info(f"Starting extraction of embeddings for {len(images)} images using ONNX Runtime.")
+
+        batches = iter_preprocessed_batches(
+            images, self._resize_crop, self.batch_size, self.executor, stack=self._to_input
+        )
+        total = (len(images) + self.batch_size - 1) // self.batch_size
+
+        progress = tqdm(batches, total=total, desc="Extracting embeddings (onnx)", disable=not PROGRESS_BARS)
+        for batch, inputs in progress:
+            emb = self.session.run(None, {self.input_name: inputs})[0]
+            if embeddings is None:
+                embeddings = EmbeddingBatch.empty(images, emb.shape[1])
+            # Normalized straight into the output matrix
+            np.divide(emb, np.linalg.norm(emb, axis=-1, keepdims=True), out=embeddings.matrix[start:start + len(batch)])
+            start += len(batch)
+
+        if embeddings is None:
+            embeddings = EmbeddingBatch.empty([], 0)
+        logger.info(f"Completed extraction of {len(embeddings)} embeddings.")
+        return embeddings
+
+    def _resize_crop(self, img: Image.Image) -> np.ndarray:
+        # Same geometry as torchvision Resize(int) + CenterCrop on PIL images
+        img = img.convert("RGB")
+        width, height = img.size
+        short, long = min(width, height), max(width, height)
+        if short != self.resize:
+            new_long = int(self.resize * long / short)
+            size = (self.resize, new_long) if width <= height else (new_long, self.resize)
+            img = img.resize(size, self.interpolation)
+
+        width, height = img.size
+        left = int(round((width - self.crop) / 2.0))
+        top = int(round((height - self.crop) / 2.0))
+        return np.asarray(img.crop((left, top, left + self.crop, top + self.crop)), dtype=np.uint8)
+
+    def _to_input(self, pixels: List[np.ndarray]) -> np.ndarray:
+        # (N, H, W, 3) uint8 -> normalized (N, 3, H, W) float32
+        batch = np.stack(pixels).astype(np.float32)
+        batch -= self.offset
+        batch *= self.scale
+        return np.ascontiguousarray(batch.transpose(0, 3, 1, 2))
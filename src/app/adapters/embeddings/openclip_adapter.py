@@ -1,11 +1,19 @@
-from typing import List
-import torch
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+import numpy as np
 import open_clip
+from PIL import Image
 from tqdm import tqdm
 import logging
 
-from app.config.settings import DEVICE
-from app.domain.models import ImageItem, EmbeddingVector
+from app.adapters.embeddings.preprocessing import iter_preprocessed_batches
+from app.adapters.inference.inference_modes import inference_context, prepare_model, to_model_input
+from app.adapters.inference.torch_runtime import DEVICE
+from app.config.settings import (
+    EMBEDDING_BATCH_SIZE_CPU, EMBEDDING_INFERENCE_MODE, PREPROCESS_WORKERS, PROGRESS_BARS
+)
+from app.domain.models import ImageItem, EmbeddingBatch
 from app.ports.embedding_port import EmbeddingPort
 
 logger = logging.getLogger(__name__)
@@ -13,51 +21,100 @@ logger = logging.getLogger(__name__)
 class OpenCLIPEmbeddingAdapter(EmbeddingPort):
     """
     Embedding service using OpenCLIP.
-    Supports GPU/MPS batching and CPU sequential processing.
+    Supports GPU/MPS batching and CPU batching (or sequential processing).
+    Preprocessing of the next batch runs in a thread pool while the current one is in the model.
     Logs progress during embedding extraction.
     """
 
-    def __init__(self, batch_size_gpu: int = 16):
+    model_id = "open_clip:ViT-B-32:laion2b_s34b_b79k"
+    architecture = "ViT-B-32"
+    # Subfolder of a model snapshot (see app.tools.materialize_models)
+    snapshot_name = "openclip"
+
+    def __init__(self, batch_size_gpu: int = 16, batch_size_cpu: int = EMBEDDING_BATCH_SIZE_CPU,
+                 cpu_batching: bool = True, snapshot_dir: Optional[str] = None,
+                 inference_mode: str = EMBEDDING_INFERENCE_MODE):
+        """
+        batch_size_cpu: Batch size on CPU when cpu_batching is enabled.
+        cpu_batching: If False, CPU processes one image at a time.
+        snapshot_dir: Local model snapshot; when set, nothing is fetched from the network.
+        inference_mode: One of app.adapters.inference.inference_modes.INFERENCE_MODES.
+        """
         # Initialize OpenCLIP model and preprocessing
         logger.info(f"Loading OpenCLIP model on {DEVICE}...")
+        pretrained = "laion2b_s34b_b79k"
+        if snapshot_dir:
+            # A checkpoint path instead of a pretrained tag loads the local safetensors file
+            pretrained = os.path.join(snapshot_dir, self.snapshot_name, "model.safetensors")
         self.model, _, self.preprocess = open_clip.create_model_and_transforms(
-            "ViT-B-32",
-            pretrained="laion2b_s34b_b79k",
+            self.architecture,
+            pretrained=pretrained,
             device=DEVICE
         )
         self.model.eval()
+        self.inference_mode = inference_mode
+        # encode_image only runs the vision tower, so that is what gets compiled
+        self.model = prepare_model(self.model, inference_mode, compile_attr="visual")
+        if inference_mode != "fp32":
+            # Other modes give slightly different vectors: keep their cache entries apart
+            self.model_id = f"{self.model_id}:{inference_mode}"
         self.batch_size_gpu = batch_size_gpu
-        logger.info("OpenCLIP model loaded successfully.")
+        self.batch_size_cpu = batch_size_cpu if cpu_batching else 1
+        self.executor = ThreadPoolExecutor(
+            max_workers=PREPROCESS_WORKERS, thread_name_prefix="openclip-preprocess"
+        )
+        # Identifies the transform for cache keys
+        self.preprocess_config = repr(self.preprocess)
+        logger.info(f"OpenCLIP model loaded successfully ({inference_mode}).")
+
+    def warmup(self) -> None:
+        """Run one forward pass on a blank image (first-call allocations, kernel selection)."""
+        self.extract_embeddings([ImageItem(id="warmup", image=Image.new("RGB", (224, 224)))])
 
-    def extract_embeddings(self, images: List[ImageItem]) -> List[EmbeddingVector]:
+    def extract_embeddings(self, images: List[ImageItem]) -> EmbeddingBatch:
         """
         Extract embeddings for a list of ImageItem objects.
-        Returns a list of EmbeddingVector objects with normalized vectors.
+        Returns an EmbeddingBatch of normalized vectors, written batch by batch into one matrix.
         """
-        embeddings: List[EmbeddingVector] = []
+        embeddings: Optional[EmbeddingBatch] = None
+        start = 0
         logger.info(f"Starting extraction of embeddings for {len(images)} images using {DEVICE}.")
 
-        if DEVICE == "cpu":
-            logger.info("Processing images sequentially on CPU...")
-            for img in tqdm(images, desc="Extracting embeddings (CPU)"):
-                tensor = self.preprocess(img.data).unsqueeze(0).to(DEVICE)
-                with torch.no_grad():
-                    emb = self.model.encode_image(tensor)
-                    emb /= emb.norm(dim=-1, keepdim=True)  # Normalize vector
-                embeddings.append(EmbeddingVector(image=img, value=emb.cpu().numpy()[0]))
-        else:
-            logger.info(f"Processing images in batches of {self.batch_size_gpu} on {DEVICE}...")
-            for i in tqdm(range(0, len(images), self.batch_size_gpu), desc="Extracting embeddings (GPU)"):
-                batch = images[i:i + self.batch_size_gpu]
-                batch_tensor = torch.stack([self.preprocess(img.data) for img in batch]).to(DEVICE)
-
-                with torch.no_grad():
-                    emb = self.model.encode_image(batch_tensor)
-                    emb /= emb.norm(dim=-1, keepdim=True)  # Normalize each vector
-
-                # Convert each embedding to EmbeddingVector with its ImageItem
-                for img_item, e in zip(batch, emb.cpu().numpy()):
-                    embeddings.append(EmbeddingVector(image=img_item, value=e))
+        batch_size = self.batch_size_cpu if DEVICE == "cpu" else self.batch_size_gpu
+        logger.info(f"Processing images in batches of {batch_size} on {DEVICE}...")
+        batches = iter_preprocessed_batches(images, self.preprocess, batch_size, self.executor)
+        total = (len(images) + batch_size - 1) // batch_size
+
+        progress = tqdm(batches, total=total, desc=f"Extracting embeddings ({DEVICE})", disable=not PROGRESS_BARS)
+        for batch, batch_tensor in progress:
+            batch_tensor = to_model_input(batch_tensor, self.inference_mode)
 
+            with inference_context(self.inference_mode):
+                emb = self.model.encode_image(batch_tensor).float()
+                emb /= emb.norm(dim=-1, keepdim=True)  # Normalize each vector
+
+            # Write the rows straight into the output matrix (allocated once the width is known)
+            if embeddings is None:
+                embeddings = EmbeddingBatch.empty(images, emb.shape[1])
+            embeddings.matrix[start:start + len(batch)] = emb.cpu().numpy()
+            start += len(batch)
+
+        if embeddings is None:
+            embeddings = EmbeddingBatch.empty([], 0)
         logger.info(f"Completed extraction of {len(embeddings)} embeddings.")
         return embeddings
+
+    def encode_text(self, texts: List[str], batch_size: int = 256) -> np.ndarray:
+        """
+        Normalized text embeddings (float32, one row per text) in the same space as
+        the image embeddings, for zero-shot labeling.
+        """
+        tokenizer = open_clip.get_tokenizer(self.architecture)
+        rows = []
+        for i in range(0, len(texts), batch_size):
+            tokens = tokenizer(texts[i:i + batch_size]).to(DEVICE)
+            with inference_context(self.inference_mode):
+                emb = self.model.encode_text(tokens).float()
+                emb /= emb.norm(dim=-1, keepdim=True)
+            rows.append(emb.cpu().numpy())
+        return np.concatenate(rows) if rows else np.empty((0, 0), dtype=np.float32)
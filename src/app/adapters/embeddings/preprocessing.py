@@ -0,0 +1,44 @@
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+from app.domain.models import ImageItem
+
+def iter_preprocessed_batches(
+        images: List[ImageItem],
+        preprocess: Callable[[Image.Image], Any],
+        batch_size: int,
+        executor: Executor,
+        stack: Optional[Callable[[List[Any]], Any]] = None
+) -> Iterator[Tuple[List[ImageItem], Any]]:
+    """
+    Yield (batch, stacked input) pairs for consecutive batches of images.
+    The decode and PIL resize/crop/normalize work of the next batch is submitted
+    to the executor before the current batch is yielded, so it overlaps with the
+    model forward pass done by the caller.
+    stack: Combines the per-image outputs of `preprocess` into one batch input
+    (default: torch.stack).
+    """
+    if stack is None:
+        # Imported here: backends passing their own NumPy `stack` (ONNX) do not load torch through this module
+        import torch
+        stack = torch.stack
+
+    batches = [images[i:i + batch_size] for i in range(0, len(images), batch_size)]
+    if not batches:
+        return
+
+    def prepare(img: ImageItem) -> Any:
+        # img.data decodes lazily, so decoding also runs in the pool
+        return preprocess(img.data)
+
+    def submit(batch: List[ImageItem]) -> List[Future]:
+        return [executor.submit(prepare, img) for img in batch]
+
+    pending = submit(batches[0])
+    for index, batch in enumerate(batches):
+        inputs = [future.result() for future in pending]
+        if index + 1 < len(batches):
+            pending = submit(batches[index + 1])
+        yield batch, stack(inputs)
@@ -0,0 +1,43 @@
+"""
+Builders of the configured model adapters, shared by the API and the batch CLI.
+Model stacks are imported inside each builder, so the ONNX backend never loads
+timm/torchvision and an unused captioning backend is never imported.
+"""
+from app.config.settings import (
+    MICRO_BATCH_MAX_SIZE,
+    MODEL_SNAPSHOT_DIR,
+    EMBEDDING_BACKEND,
+    ONNX_MODEL_PATH,
+    CAPTIONING_BACKEND,
+    CAPTION_IMAGES_PER_CLUSTER,
+    CLIP_LABELS_FILE,
+    CLIP_LABEL_PROMPT,
+    CLIP_LABELS_TOP_K,
+    CLIP_LABEL_CACHE_DIR
+)
+from app.ports.captioning_port import CaptioningPort
+from app.ports.embedding_port import EmbeddingPort
+
+def build_embedding_model() -> EmbeddingPort:
+    """Embedding adapter of EMBEDDING_BACKEND ("torch": DINOv2, "onnx": ONNX Runtime)."""
+    if EMBEDDING_BACKEND == "onnx":
+        from app.adapters.embeddings.onnx_adapter import ONNXEmbeddingAdapter
+        return ONNXEmbeddingAdapter(ONNX_MODEL_PATH, batch_size=MICRO_BATCH_MAX_SIZE)
+    from app.adapters.embeddings.dinov2_adapter import DINOv2EmbeddingAdapter
+    return DINOv2EmbeddingAdapter(batch_size_gpu=MICRO_BATCH_MAX_SIZE, snapshot_dir=MODEL_SNAPSHOT_DIR)
+
+def build_captioning_model() -> CaptioningPort:
+    """Captioning adapter of CAPTIONING_BACKEND ("blip" or "clip_labels")."""
+    if CAPTIONING_BACKEND == "clip_labels":
+        from app.adapters.descriptions.clip_label_adapter import CLIPLabelCaptioningAdapter, load_labels
+        from app.adapters.embeddings.openclip_adapter import OpenCLIPEmbeddingAdapter
+        return CLIPLabelCaptioningAdapter(
+            OpenCLIPEmbeddingAdapter(snapshot_dir=MODEL_SNAPSHOT_DIR),
+            load_labels(CLIP_LABELS_FILE),
+            top_k=CLIP_LABELS_TOP_K,
+            images_per_cluster=CAPTION_IMAGES_PER_CLUSTER,
+            prompt=CLIP_LABEL_PROMPT,
+            cache_dir=CLIP_LABEL_CACHE_DIR
+        )
+    from app.adapters.descriptions.blip_adapter import BLIPCaptioningAdapter
+    return BLIPCaptioningAdapter(snapshot_dir=MODEL_SNAPSHOT_DIR)
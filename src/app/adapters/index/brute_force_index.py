@@ -0,0 +1,139 @@
+import json
+import logging
+import os
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.adapters.storage.mmap_matrix import MmapArray, MmapMatrix
+from app.ports.vector_index_port import VectorIndexPort
+
+logger = logging.getLogger(__name__)
+
+def top_k(scores: np.ndarray, rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Best k (scores, rows) of a 1-D score array, sorted by descending score.
+    Uses argpartition, so the cost is O(n) plus O(k log k).
+    """
+    if len(scores) > k:
+        part = np.argpartition(-scores, k - 1)[:k]
+        scores, rows = scores[part], rows[part]
+    order = np.argsort(-scores, kind="stable")
+    return scores[order], rows[order]
+
+class BruteForceVectorIndex(VectorIndexPort):
+    """
+    Exact vector index: vectorized NumPy inner products over every stored row.
+    Rows are keyed by image content digest, so uploads that share a file name
+    never replace each other; the file name is kept as metadata of the row.
+    Vectors live in a memory-mapped float32/float16 matrix; deletions are
+    tombstones in a memory-mapped flag array, so add/delete never rewrite the
+    matrix and a flush only writes what changed. Search scans the matrix in
+    chunks to bound temporary memory.
+    """
+
+    CHUNK_ROWS = 65536
+    DELETED_FILE = "deleted.bin"
+    NAMES_FILE = "names.jsonl"
+
+    def __init__(self, folder: str, dtype: str = "float16"):
+        """
+        folder: Directory of the index files (created if missing).
+        dtype: Storage dtype of the vectors (float16 halves disk and page-cache use).
+        """
+        self.folder = folder
+        self.storage = MmapMatrix(folder, dtype=dtype)
+        self._deleted = MmapArray(os.path.join(folder, self.DELETED_FILE), dtype="bool")
+        self._deleted.resize(self.storage.capacity)
+        self._names_path = os.path.join(folder, self.NAMES_FILE)
+        self._names = self._load_names()
+        self._names_flushed = len(self._names)
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.storage) - int(self._deleted.array[:len(self.storage)].sum())
+
+    def add(self, ids: List[str], vectors: np.ndarray, names: Optional[List[str]] = None) -> None:
+        if not ids:
+            return
+        with self._lock:
+            previous = len(self.storage)
+            # Same digest, same content: an existing row is only revived, never overwritten
+            rows = self.storage.append(ids, vectors)
+            self._deleted.resize(self.storage.capacity)
+            self._deleted.array[rows] = False
+            # New rows are named after the first upload of their content in this call
+            first_names = dict(zip(reversed(ids), reversed(names or ids)))
+            self._names.extend(first_names[key] for key in self.storage.keys[previous:])
+            self._on_added(np.asarray(rows))
+            self.flush()
+
+    def delete(self, ids: List[str]) -> int:
+        with self._lock:
+            rows = [self.storage.rows[i] for i in ids if i in self.storage.rows]
+            rows = [row for row in rows if not self._deleted.array[row]]
+            self._deleted.array[rows] = True
+            self.flush()
+            return len(rows)
+
+    def name(self, image_id: str) -> Optional[str]:
+        with self._lock:
+            row = self.storage.rows.get(image_id)
+            return self._names[row] if row is not None else None
+
+    def search(self, queries: np.ndarray, k: int) -> List[List[Tuple[str, float]]]:
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        with self._lock:
+            return self._search_exhaustive(queries, k)
+
+    def flush(self) -> None:
+        with self._lock:
+            # Names first: on reload, rows beyond the stored count are dropped anyway
+            if self._names_flushed < len(self._names):
+                with open(self._names_path, "a", encoding="utf-8") as f:
+                    for name in self._names[self._names_flushed:]:
+                        f.write(json.dumps(name) + "\n")
+                self._names_flushed = len(self._names)
+            self._deleted.flush()
+            self.storage.flush()
+
+    def _load_names(self) -> List[Optional[str]]:
+        names: List[Optional[str]] = []
+        if os.path.exists(self._names_path):
+            with open(self._names_path, "r", encoding="utf-8") as f:
+                names = [json.loads(line) for line in f]
+            if len(names) > len(self.storage):
+                # Names of rows lost by an interrupted flush
+                with open(self._names_path, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(name) + "\n" for name in names[:len(self.storage)])
+        return names[:len(self.storage)]
+
+    def _search_exhaustive(self, queries: np.ndarray, k: int) -> List[List[Tuple[str, float]]]:
+        # All queries are scored against each chunk at once (one matrix product per chunk)
+        best = [(np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)) for _ in queries]
+        for start in range(0, len(self.storage), self.CHUNK_ROWS):
+            stop = min(start + self.CHUNK_ROWS, len(self.storage))
+            scores = self.storage.matrix[start:stop].astype(np.float32, copy=False) @ queries.T
+            row_ids = np.arange(start, stop)
+            live = ~self._deleted.array[start:stop]
+            for q, (best_scores, best_rows) in enumerate(best):
+                chunk_scores, chunk_rows = top_k(scores[live, q], row_ids[live], k)
+                best[q] = top_k(
+                    np.concatenate([best_scores, chunk_scores]), np.concatenate([best_rows, chunk_rows]), k
+                )
+        return [self._to_results(best_scores, best_rows) for best_scores, best_rows in best]
+
+    def _search_rows(self, query: np.ndarray, rows: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """Score only the given rows (index array) for one query."""
+        rows = rows[~self._deleted.array[rows]]
+        scores = self.storage.matrix[rows].astype(np.float32, copy=False) @ query
+        return self._to_results(*top_k(scores, rows, k))
+
+    def _to_results(self, scores: np.ndarray, rows: np.ndarray) -> List[Tuple[str, float]]:
+        keys = self.storage.keys
+        return [(keys[row], float(score)) for score, row in zip(scores, rows)]
+
+    def _on_added(self, rows: np.ndarray) -> None:
+        """Hook for subclasses maintaining extra per-row structures."""
+        pass
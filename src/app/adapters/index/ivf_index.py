@@ -0,0 +1,152 @@
+import logging
+import os
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+
+from app.adapters.index.brute_force_index import BruteForceVectorIndex
+from app.adapters.storage.mmap_matrix import MmapArray
+
+logger = logging.getLogger(__name__)
+
+class IVFVectorIndex(BruteForceVectorIndex):
+    """
+    Approximate vector index with an inverted file (IVF) over the same
+    memory-mapped storage as the brute-force index.
+    Vectors are partitioned by their nearest of `nlist` k-means centroids; a
+    query only scores the rows of its `nprobe` closest partitions.
+    Until `train_size` vectors exist, the index is untrained and searches
+    exhaustively; reaching it starts training on a background thread, so no
+    request waits for k-means. New vectors are assigned to the existing
+    centroids incrementally; call `train()` to rebuild the partitions after
+    heavy drift.
+    """
+
+    ASSIGNMENTS_FILE = "assignments.bin"
+
+    def __init__(self, folder: str, dtype: str = "float16", nlist: int = 1024, nprobe: int = 16,
+                 train_size: int = 20000):
+        """
+        nlist: Number of partitions (k-means centroids).
+        nprobe: Partitions scanned per query (higher: better recall, slower).
+        train_size: Vectors required before the partitions are trained in the background.
+        """
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size
+        self._centroids_path = os.path.join(folder, "centroids.npy")
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+        self._training: Optional[threading.Thread] = None
+
+        super().__init__(folder, dtype=dtype)
+
+        # Partition of each row, -1 while unassigned
+        self._assignments = MmapArray(os.path.join(folder, self.ASSIGNMENTS_FILE), dtype="int32", fill=-1)
+        self._assignments.resize(self.storage.capacity)
+        if os.path.exists(self._centroids_path):
+            self.centroids = np.load(self._centroids_path)
+            # Rows added after the last flush of the assignments
+            unassigned = np.flatnonzero(self._assignments.array[:len(self.storage)] == -1)
+            self._assign(unassigned)
+            self._build_lists()
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self) -> None:
+        """
+        (Re)train the centroids on a sample of the stored vectors and reassign every row.
+        k-means and the reassignment of existing rows run without holding the index
+        lock, so searches and adds continue meanwhile.
+        """
+        with self._lock:
+            count = len(self.storage)
+            sample_size = min(count, max(self.train_size, 50 * self.nlist))
+            sample = np.sort(np.random.default_rng(0).choice(count, sample_size, replace=False))
+            vectors = self.storage.matrix[sample].astype(np.float32)
+            # Rows never move and are never overwritten, so this view stays valid
+            matrix = self.storage.matrix[:count]
+        nlist = min(self.nlist, sample_size)
+        logger.info(f"Training IVF index: {nlist} partitions on {sample_size} vectors...")
+
+        kmeans = MiniBatchKMeans(n_clusters=nlist, random_state=0, n_init=1, batch_size=4096)
+        kmeans.fit(vectors)
+        centroids = kmeans.cluster_centers_.astype(np.float32)
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+        assignments = self._nearest(matrix, centroids)
+
+        with self._lock:
+            self.centroids = centroids
+            self._assignments.array[:count] = assignments
+            # Rows added while training ran
+            self._assign(np.arange(count, len(self.storage)))
+            self._build_lists()
+            np.save(self._centroids_path, self.centroids)
+            self.flush()
+        logger.info(f"IVF index trained on {count} vectors.")
+
+    def flush(self) -> None:
+        with self._lock:
+            if self.trained:
+                self._assignments.flush()
+            super().flush()
+
+    def _on_added(self, rows: np.ndarray) -> None:
+        self._assignments.resize(self.storage.capacity)
+        if not self.trained:
+            if len(self.storage) >= self.train_size and self._training is None:
+                self._training = threading.Thread(target=self._train_background, name="ivf-train", daemon=True)
+                self._training.start()
+            return
+
+        # Rows already present keep their partition
+        rows = rows[self._assignments.array[rows] == -1]
+        if len(rows):
+            assignments = self._assign(rows)
+            for partition in np.unique(assignments):
+                self._lists[partition] = np.concatenate([self._lists[partition], rows[assignments == partition]])
+
+    def _train_background(self) -> None:
+        try:
+            self.train()
+        except Exception:
+            logger.exception("IVF index training failed; searches stay exhaustive")
+        finally:
+            self._training = None
+
+    def _assign(self, rows: np.ndarray) -> np.ndarray:
+        assignments = self._nearest(self.storage.matrix[rows], self.centroids)
+        self._assignments.array[rows] = assignments
+        return assignments
+
+    def _nearest(self, matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        # Assign in chunks to bound the temporary (rows x nlist) score matrix
+        assignments = np.empty(len(matrix), dtype=np.int32)
+        for start in range(0, len(matrix), self.CHUNK_ROWS):
+            chunk = matrix[start:start + self.CHUNK_ROWS].astype(np.float32)
+            assignments[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+        return assignments
+
+    def _build_lists(self) -> None:
+        assignments = self._assignments.array[:len(self.storage)]
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(len(self.centroids) + 1))
+        self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.centroids))]
+
+    def search(self, queries: np.ndarray, k: int) -> List[List[Tuple[str, float]]]:
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        with self._lock:
+            if not self.trained:
+                return self._search_exhaustive(queries, k)
+
+            results = []
+            probes = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :self.nprobe]
+            for query, query_probes in zip(queries, probes):
+                # Sorted rows keep memory-mapped reads sequential
+                rows = np.sort(np.concatenate([self._lists[p] for p in query_probes]))
+                results.append(self._search_rows(query, rows, k))
+            return results
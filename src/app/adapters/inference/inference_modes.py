@@ -0,0 +1,57 @@
+import contextlib
+import logging
+from typing import Optional
+
+import torch
+
+from app.adapters.inference.torch_runtime import DEVICE
+
+logger = logging.getLogger(__name__)
+
+# fp32: plain eager model
+# bf16: bfloat16 autocast around the forward pass
+# int8: dynamic int8 quantization of nn.Linear layers (CPU only)
+# compiled: torch.compile with channels-last inputs
+INFERENCE_MODES = ("fp32", "bf16", "int8", "compiled")
+
+def prepare_model(model: torch.nn.Module, mode: str, compile_attr: Optional[str] = None) -> torch.nn.Module:
+    """
+    Return `model` converted for the given inference mode.
+    compile_attr: In "compiled" mode, compile only this submodule (e.g. the vision
+    tower of a generative model, whose decoder changes shape at every step).
+    """
+    if mode not in INFERENCE_MODES:
+        raise ValueError(f"Unknown inference mode '{mode}', expected one of {INFERENCE_MODES}")
+
+    if mode == "int8":
+        if DEVICE != "cpu":
+            logger.warning(f"int8 dynamic quantization only runs on CPU; using fp32 on {DEVICE}.")
+            return model
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    if mode == "compiled":
+        model = model.to(memory_format=torch.channels_last)
+        if compile_attr:
+            setattr(model, compile_attr, torch.compile(getattr(model, compile_attr)))
+            return model
+        return torch.compile(model)
+
+    return model
+
+def inference_context(mode: str) -> contextlib.ExitStack:
+    """
+    Context for a forward pass: inference_mode, plus bf16 autocast in "bf16" mode.
+    """
+    stack = contextlib.ExitStack()
+    stack.enter_context(torch.inference_mode())
+    if mode == "bf16":
+        stack.enter_context(torch.autocast(device_type=DEVICE, dtype=torch.bfloat16))
+    return stack
+
+def to_model_input(tensor: torch.Tensor, mode: str) -> torch.Tensor:
+    """
+    Move an image batch to DEVICE, in channels-last layout for "compiled" mode.
+    """
+    if mode == "compiled" and tensor.dim() == 4:
+        return tensor.to(DEVICE, memory_format=torch.channels_last)
+    return tensor.to(DEVICE)
@@ -0,0 +1,33 @@
+import torch
+
+from app.config.settings import TORCH_NUM_INTEROP_THREADS, TORCH_NUM_THREADS
+
+# Device selection and thread setup for the torch adapters. Kept out of
+# app.config.settings so backends without torch (ONNX Runtime) never import it.
+
+def get_device() -> str:
+    """
+    Select the best available device:
+    - CUDA: NVIDIA GPUs
+    - MPS: Apple Silicon
+    - CPU: fallback
+    """
+    if torch.cuda.is_available():
+        return "cuda"
+    if hasattr(torch.backends, "mps") and torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+def configure_torch_threads() -> None:
+    """
+    Apply the thread settings instead of relying on torch defaults.
+    Inter-op threads can only be set once per process, before any parallel work.
+    """
+    torch.set_num_threads(TORCH_NUM_THREADS)
+    try:
+        torch.set_num_interop_threads(TORCH_NUM_INTEROP_THREADS)
+    except RuntimeError:
+        pass
+
+DEVICE = get_device()
+configure_torch_threads()
@@ -0,0 +1,36 @@
+import copy
+import threading
+from typing import Dict, Optional
+
+from app.domain.models import Job
+from app.ports.job_store_port import JobStorePort
+
+class InMemoryJobStore(JobStorePort):
+    """
+    Job store that keeps jobs in a dictionary.
+    Jobs are lost when the process restarts.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: Job) -> None:
+        # Store a copy so later changes by the caller need an explicit save
+        with self._lock:
+            self._jobs[job.id] = copy.deepcopy(job)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return copy.deepcopy(job) if job is not None else None
+
+    def delete_finished_before(self, cutoff: float) -> int:
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.status in (Job.SUCCEEDED, Job.FAILED) and job.updated_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+            return len(expired)
@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from app.domain.models import Job
+from app.ports.job_store_port import JobStorePort
+
+logger = logging.getLogger(__name__)
+
+class SQLiteJobStore(JobStorePort):
+    """
+    Job store backed by a SQLite file, so finished results survive a restart.
+    Uploads are not persisted: jobs still queued or running when the process
+    stopped are marked as failed on startup.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        db_path: Path of the SQLite database file (created if missing).
+        """
+        folder = os.path.dirname(db_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    progress TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_updated_at ON jobs (updated_at)")
+            interrupted = self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE status IN (?, ?)",
+                (Job.FAILED, "Interrupted by a server restart", time.time(), Job.QUEUED, Job.RUNNING)
+            ).rowcount
+        if interrupted:
+            logger.warning(f"Marked {interrupted} interrupted jobs as failed")
+
+    def save(self, job: Job) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.status, json.dumps(job.progress), job.result, job.error,
+                 job.created_at, job.updated_at)
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, progress, result, error, created_at, updated_at "
+                "FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return Job(
+            id=row[0], status=row[1], progress=json.loads(row[2]), result=row[3],
+            error=row[4], created_at=row[5], updated_at=row[6]
+        )
+
+    def delete_finished_before(self, cutoff: float) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (Job.SUCCEEDED, Job.FAILED, cutoff)
+            ).rowcount
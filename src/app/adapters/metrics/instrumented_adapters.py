@@ -0,0 +1,120 @@
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.instrumentation import Instrumentation
+from app.domain.models import Cluster, EmbeddingBatch, Embeddings, ImageItem
+from app.ports.captioning_port import CaptioningPort
+from app.ports.clustering_port import ClusteringPort
+from app.ports.embedding_port import EmbeddingPort
+from app.ports.render_port import RendererPort
+from app.ports.storage_port import StoragePort
+
+# Timing decorators around each port. Every call is reported to an Instrumentation
+# as one observation of its stage ("embedding", "clustering", "captioning",
+# "render", "storage") with the number of images it handled.
+
+class InstrumentedEmbeddingAdapter(EmbeddingPort):
+    """Times calls to the wrapped EmbeddingPort (stage "embedding")."""
+
+    def __init__(self, embedding_service: EmbeddingPort, instrumentation: Instrumentation):
+        self.embedding_service = embedding_service
+        self.instrumentation = instrumentation
+
+    @property
+    def model_id(self) -> str:
+        return getattr(self.embedding_service, "model_id", type(self.embedding_service).__name__)
+
+    @property
+    def preprocess_config(self) -> str:
+        return getattr(self.embedding_service, "preprocess_config", "")
+
+    def extract_embeddings(self, images: List[ImageItem]) -> EmbeddingBatch:
+        started = time.perf_counter()
+        embeddings = self.embedding_service.extract_embeddings(images)
+        self.instrumentation.observe("embedding", time.perf_counter() - started, len(images))
+        return embeddings
+
+class InstrumentedClusteringAdapter(ClusteringPort):
+    """Times calls to the wrapped ClusteringPort, including fit/predict and re-cuts (stage "clustering")."""
+
+    def __init__(self, clustering_service: ClusteringPort, instrumentation: Instrumentation):
+        self.clustering_service = clustering_service
+        self.instrumentation = instrumentation
+
+    def cluster_embeddings(self, embeddings: Embeddings) -> List[Cluster]:
+        started = time.perf_counter()
+        clusters = self.clustering_service.cluster_embeddings(embeddings)
+        self.instrumentation.observe("clustering", time.perf_counter() - started, len(embeddings))
+        return clusters
+
+    def fit(self, embeddings: Embeddings) -> Tuple[object, np.ndarray]:
+        started = time.perf_counter()
+        result = self.clustering_service.fit(embeddings)
+        self.instrumentation.observe("clustering", time.perf_counter() - started, len(embeddings))
+        return result
+
+    def predict(self, model: object, embeddings: Embeddings) -> Tuple[np.ndarray, np.ndarray]:
+        started = time.perf_counter()
+        result = self.clustering_service.predict(model, embeddings)
+        self.instrumentation.observe("clustering", time.perf_counter() - started, len(embeddings))
+        return result
+
+    def build_hierarchy(self, embeddings: Embeddings) -> Tuple[object, np.ndarray]:
+        started = time.perf_counter()
+        result = self.clustering_service.build_hierarchy(embeddings)
+        self.instrumentation.observe("clustering", time.perf_counter() - started, len(embeddings))
+        return result
+
+    def recut(self, hierarchy: object, min_cluster_size: int, selection_method: str = "leaf") -> np.ndarray:
+        started = time.perf_counter()
+        labels = self.clustering_service.recut(hierarchy, min_cluster_size, selection_method)
+        self.instrumentation.observe("clustering", time.perf_counter() - started, len(labels))
+        return labels
+
+class InstrumentedCaptioningAdapter(CaptioningPort):
+    """Times calls to the wrapped CaptioningPort (stage "captioning")."""
+
+    def __init__(self, captioning_service: CaptioningPort, instrumentation: Instrumentation):
+        self.captioning_service = captioning_service
+        self.instrumentation = instrumentation
+
+    @property
+    def model_id(self) -> str:
+        return getattr(self.captioning_service, "model_id", type(self.captioning_service).__name__)
+
+    def generate_descriptions(self, clusters: List[Cluster]) -> List[Cluster]:
+        started = time.perf_counter()
+        result = self.captioning_service.generate_descriptions(clusters)
+        images = sum(len(cluster.images) for cluster in clusters)
+        self.instrumentation.observe("captioning", time.perf_counter() - started, images)
+        return result
+
+class InstrumentedRenderer(RendererPort):
+    """Times calls to the wrapped RendererPort (stage "render")."""
+
+    def __init__(self, renderer: RendererPort, instrumentation: Instrumentation):
+        self.renderer = renderer
+        self.instrumentation = instrumentation
+
+    def render(self, clusters: List[Cluster]) -> str:
+        started = time.perf_counter()
+        result = self.renderer.render(clusters)
+        images = sum(len(cluster.images) for cluster in clusters)
+        self.instrumentation.observe("render", time.perf_counter() - started, images)
+        return result
+
+class InstrumentedStorage(StoragePort):
+    """Times calls to the wrapped StoragePort (stage "storage")."""
+
+    def __init__(self, storage: StoragePort, instrumentation: Instrumentation):
+        self.storage = storage
+        self.instrumentation = instrumentation
+
+    def save(self, clusters: List[Cluster], embedding_rows: Optional[Dict[str, int]] = None):
+        started = time.perf_counter()
+        result = self.storage.save(clusters, embedding_rows)
+        images = sum(len(cluster.images) for cluster in clusters)
+        self.instrumentation.observe("storage", time.perf_counter() - started, images)
+        return result
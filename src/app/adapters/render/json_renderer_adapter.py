@@ -15,16 +15,17 @@ class JsonRendererAdapter(RendererPort):
 
         for cluster in clusters:
             cluster_entry = {
+                # Identifies the cluster (e.g. in the "changed" list of a re-cut)
+                "label": cluster.label,
                 "name": str(cluster.description.split(" / ")[0].strip()),
                 "image_ids": [img.id for img in cluster.images],  # Collect image IDs
                 "description": cluster.description
             }
             clusters_list.append(cluster_entry)
 
-        # Convert list of clusters to a JSON string
+        # Convert list of clusters to a JSON string (compact: it is sent as the response body as is)
         json_string = json.dumps(
             {"clusters": clusters_list},
-            indent=4,
             ensure_ascii=False
         )
 
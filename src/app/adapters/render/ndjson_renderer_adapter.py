@@ -0,0 +1,50 @@
+import json
+from typing import List
+
+from app.domain.models import Cluster
+from app.ports.render_port import RendererPort
+
+class NdjsonRendererAdapter(RendererPort):
+    """
+    Renderer adapter producing newline-delimited JSON events, for streamed responses.
+    Cluster membership and descriptions are separate events, so membership can be
+    sent as soon as clustering ends and each description as soon as it is generated:
+
+        {"type": "cluster", "label": 0, "image_ids": ["img1.jpg", "img2.jpg"]}
+        {"type": "description", "label": 0, "name": "black leather shoes", "description": "black leather shoes"}
+        {"type": "done"}
+
+    Each event is serialized exactly once, straight to its output line.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def render(self, clusters: List[Cluster]) -> str:
+        return self.render_clusters(clusters) + self.render_descriptions(clusters) + self.render_done()
+
+    def render_clusters(self, clusters: List[Cluster]) -> str:
+        return "".join(
+            self._line({"type": "cluster", "label": cluster.label, "image_ids": [img.id for img in cluster.images]})
+            for cluster in clusters
+        )
+
+    def render_descriptions(self, clusters: List[Cluster]) -> str:
+        return "".join(
+            self._line({
+                "type": "description",
+                "label": cluster.label,
+                "name": cluster.description.split(" / ")[0].strip(),
+                "description": cluster.description
+            })
+            for cluster in clusters if cluster.description
+        )
+
+    def render_done(self) -> str:
+        return self._line({"type": "done"})
+
+    def render_error(self, detail: str) -> str:
+        return self._line({"type": "error", "detail": detail})
+
+    @staticmethod
+    def _line(event: dict) -> str:
+        return json.dumps(event, ensure_ascii=False) + "\n"
@@ -1,39 +1,157 @@
+import fcntl
+import json
 import os
-from typing import List
-from app.domain.models import Cluster
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from app.config.settings import STORAGE_LINK_MODE, STORAGE_MANIFEST, STORAGE_WORKERS
+from app.domain.models import Cluster, ImageItem
 from app.ports.storage_port import StoragePort
 
+# ioctl request cloning a whole file (Linux, btrfs/XFS): the copy shares extents with its source
+FICLONE = 0x40049409
+
 class DiskStorageAdapter(StoragePort):
     """
     Storage adapter that saves clusters and their images/descriptions to disk.
     Each cluster is stored in a separate folder.
+    Images are written by a thread pool. Images read from a file are linked
+    rather than copied when `link_mode` allows it, so saving is I/O-bound and
+    does not duplicate bytes; only images that exist purely in memory are encoded.
+    A columnar manifest.json (image id, file, cluster label, description and
+    optionally the embedding row of each image) can be written next to the
+    cluster folders; `load` reads it back.
     """
 
-    def __init__(self, output_folder: str):
+    LINK_MODES = ("link", "reflink", "copy")
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, output_folder: str, workers: int = STORAGE_WORKERS,
+                 link_mode: str = STORAGE_LINK_MODE, manifest: bool = STORAGE_MANIFEST):
         """
         output_folder: Root folder where clusters will be saved.
+        workers: Threads writing image files.
+        link_mode: How images read from a file are stored:
+            "link" (hardlink, shares the inode with the source; falls back to reflink, then copy),
+            "reflink" (copy-on-write clone; falls back to copy) or "copy".
+        manifest: Write manifest.json.
         """
+        if link_mode not in self.LINK_MODES:
+            raise ValueError(f"Unknown link mode: {link_mode}")
         self.output_folder = output_folder
+        self.workers = workers
+        self.link_mode = link_mode
+        self.manifest = manifest
         os.makedirs(self.output_folder, exist_ok=True)
 
-    def save(self, clusters: List[Cluster]) -> None:
+    def save(self, clusters: List[Cluster], embedding_rows: Optional[Dict[str, int]] = None) -> None:
         """
         Save images and descriptions of clusters to disk.
         Each cluster is saved in a subfolder "cluster_<label>".
         Noise cluster (label=-1) is saved in "cluster_noise".
+        embedding_rows: Image id -> row of its embedding in an external store, added to the manifest.
         """
+        # Destination -> image; a later image with the same id in a folder replaces the earlier one
+        writes: Dict[str, ImageItem] = {}
+        columns = {"image_id": [], "file": [], "label": []}
+        if embedding_rows is not None:
+            columns["embedding_row"] = []
+
         for cluster in clusters:
-            folder_name = f"cluster_{cluster.label}" if cluster.label != -1 else "cluster_noise"
+            folder_name = self.folder_name(cluster.label)
             path = os.path.join(self.output_folder, folder_name)
             os.makedirs(path, exist_ok=True)
 
             # Save images using their original ID as filename
             for img_obj in cluster.images:
-                img_path = os.path.join(path, img_obj.id)
-                img_obj.data.save(img_path)
+                writes[os.path.join(path, img_obj.id)] = img_obj
+                columns["image_id"].append(img_obj.id)
+                columns["file"].append(f"{folder_name}/{img_obj.id}")
+                columns["label"].append(cluster.label)
+                if embedding_rows is not None:
+                    columns["embedding_row"].append(embedding_rows.get(img_obj.id))
 
             # Save description if it exists
             if cluster.description:
                 desc_path = os.path.join(path, "description.txt")
                 with open(desc_path, "w", encoding="utf-8") as f:
                     f.write(cluster.description)
+
+        if self.workers > 1 and len(writes) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="storage") as executor:
+                # list() surfaces the first write error
+                list(executor.map(self._write_image, writes.values(), writes.keys()))
+        else:
+            for img_path, img_obj in writes.items():
+                self._write_image(img_obj, img_path)
+
+        if self.manifest:
+            descriptions = {str(c.label): c.description for c in clusters if c.description}
+            manifest_path = os.path.join(self.output_folder, self.MANIFEST_FILE)
+            with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"columns": columns, "descriptions": descriptions}, f, ensure_ascii=False)
+            os.replace(manifest_path + ".tmp", manifest_path)
+
+    @staticmethod
+    def folder_name(label: int) -> str:
+        return f"cluster_{label}" if label != -1 else "cluster_noise"
+
+    @classmethod
+    def load(cls, output_folder: str) -> List[Cluster]:
+        """
+        Rebuild the clusters of a saved output from its manifest.
+        Images point to the stored files and are decoded on demand.
+        """
+        with open(os.path.join(output_folder, cls.MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        columns = manifest["columns"]
+
+        clusters: Dict[int, Cluster] = {}
+        for image_id, file, label in zip(columns["image_id"], columns["file"], columns["label"]):
+            cluster = clusters.get(label)
+            if cluster is None:
+                cluster = Cluster(label=label, images=[], description=manifest["descriptions"].get(str(label)))
+                clusters[label] = cluster
+            cluster.images.append(ImageItem(id=image_id, path=os.path.join(output_folder, file)))
+        return list(clusters.values())
+
+    def _write_image(self, img_obj: ImageItem, img_path: str) -> None:
+        # Original bytes are written as-is (no re-encode); in-memory images are encoded.
+        if img_obj.source is None and img_obj.path is not None and img_obj.image is None:
+            self._link_or_copy(img_obj.path, img_path)
+        elif img_obj.source is not None:
+            with open(img_path, "wb") as f:
+                f.write(img_obj.source)
+        else:
+            img_obj.data.save(img_path)
+
+    def _link_or_copy(self, source: str, target: str) -> None:
+        if os.path.lexists(target):
+            # The target may be the source itself (output folder inside the input, or a
+            # reloaded output saved in place) or a hardlink of it: already stored, and
+            # removing it would delete the original
+            if os.path.exists(target) and os.path.samefile(source, target):
+                return
+            os.remove(target)
+        if self.link_mode == "link":
+            try:
+                os.link(source, target)
+                return
+            except OSError:
+                # Other filesystem, or links not supported
+                pass
+        if self.link_mode in ("link", "reflink") and self._reflink(source, target):
+            return
+        shutil.copyfile(source, target)
+
+    @staticmethod
+    def _reflink(source: str, target: str) -> bool:
+        try:
+            with open(source, "rb") as src, open(target, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return True
+        except OSError:
+            if os.path.exists(target):
+                os.remove(target)
+            return False
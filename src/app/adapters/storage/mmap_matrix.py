@@ -0,0 +1,205 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class MmapMatrix:
+    """
+    Append-only matrix of fixed-width vectors backed by a memory-mapped file.
+    Rows are addressed by a string key. Keys are stored one per line in an
+    append-only file, so flushing costs O(new rows) rather than O(all rows).
+    Capacity grows geometrically, so appends are amortised O(1).
+    """
+
+    DATA_FILE = "vectors.bin"
+    KEYS_FILE = "keys.jsonl"
+    META_FILE = "meta.json"
+
+    def __init__(self, folder: str, dim: Optional[int] = None, dtype: str = "float32",
+                 initial_capacity: int = 1024):
+        """
+        folder: Directory holding the data, keys and meta files (created if missing).
+        dim: Vector width. Optional when reopening an existing matrix.
+        dtype: Storage dtype of the matrix (e.g. float32, float16).
+        """
+        self.folder = folder
+        self.data_path = os.path.join(folder, self.DATA_FILE)
+        self.keys_path = os.path.join(folder, self.KEYS_FILE)
+        self.meta_path = os.path.join(folder, self.META_FILE)
+        self._lock = threading.RLock()
+        os.makedirs(folder, exist_ok=True)
+
+        self.keys: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.dtype = np.dtype(dtype)
+        self.dim = dim
+        self.capacity = 0
+        self._flushed = 0
+        self._matrix: Optional[np.memmap] = None
+
+        if os.path.exists(self.meta_path):
+            self._load()
+        if self.dim is not None and self._matrix is None:
+            self._resize(initial_capacity)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.rows
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """View of the filled rows (no copy)."""
+        if self._matrix is None:
+            return np.empty((0, self.dim or 0), dtype=self.dtype)
+        return self._matrix[:len(self.keys)]
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.rows.get(key)
+        if row is None:
+            return None
+        return self._matrix[row]
+
+    def append(self, keys: List[str], vectors: np.ndarray, overwrite: bool = False) -> List[int]:
+        """
+        Append vectors under the given keys and return their row numbers.
+        Keys that already exist keep their original row; their vector is
+        replaced only if `overwrite` is set.
+        """
+        vectors = np.asarray(vectors)
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+            if self._matrix is None:
+                self._resize(max(1024, len(keys)))
+
+            new_keys = []
+            new_rows = []
+            pending = set()
+            for key, vector in zip(keys, vectors):
+                if key in self.rows:
+                    if overwrite:
+                        self._matrix[self.rows[key]] = vector
+                    continue
+                if key in pending:
+                    continue
+                pending.add(key)
+                new_keys.append(key)
+                new_rows.append(vector)
+
+            if new_keys:
+                start = len(self.keys)
+                needed = start + len(new_keys)
+                if needed > self.capacity:
+                    self._resize(max(needed, self.capacity * 2))
+                self._matrix[start:needed] = np.stack(new_rows).astype(self.dtype, copy=False)
+                for offset, key in enumerate(new_keys):
+                    self.rows[key] = start + offset
+                self.keys.extend(new_keys)
+
+            return [self.rows[key] for key in keys]
+
+    def flush(self) -> None:
+        """Flush the memory map, append new keys and atomically rewrite the meta file."""
+        with self._lock:
+            if self._matrix is not None:
+                self._matrix.flush()
+            if self._flushed < len(self.keys):
+                with open(self.keys_path, "a", encoding="utf-8") as f:
+                    for key in self.keys[self._flushed:]:
+                        f.write(json.dumps(key) + "\n")
+                self._flushed = len(self.keys)
+
+            tmp_path = self.meta_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "dim": self.dim,
+                    "dtype": self.dtype.name,
+                    "capacity": self.capacity,
+                    "count": len(self.keys)
+                }, f)
+            os.replace(tmp_path, self.meta_path)
+
+    def _load(self) -> None:
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dim = meta["dim"]
+        self.dtype = np.dtype(meta["dtype"])
+        self.capacity = meta["capacity"]
+
+        # Keys written after the last meta update (interrupted flush) are dropped
+        with open(self.keys_path, "r+b") as f:
+            while len(self.keys) < meta["count"]:
+                self.keys.append(json.loads(f.readline().decode("utf-8")))
+            f.truncate(f.tell())
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        self._flushed = len(self.keys)
+        self._matrix = np.memmap(self.data_path, dtype=self.dtype, mode="r+",
+                                 shape=(self.capacity, self.dim))
+
+    def _resize(self, capacity: int) -> None:
+        if self._matrix is not None:
+            self._matrix.flush()
+            del self._matrix
+        # Growing the file keeps existing rows in place
+        nbytes = capacity * self.dim * self.dtype.itemsize
+        with open(self.data_path, "ab") as f:
+            if f.tell() < nbytes:
+                f.truncate(nbytes)
+        self.capacity = capacity
+        self._matrix = np.memmap(self.data_path, dtype=self.dtype, mode="r+",
+                                 shape=(self.capacity, self.dim))
+
+class MmapArray:
+    """
+    Growable 1-D memory-mapped array of per-row values (flags, assignments) kept
+    next to an MmapMatrix. Writes go straight to the mapped pages, so a flush
+    costs the pages changed since the last one rather than the whole array.
+    """
+
+    def __init__(self, path: str, dtype: str, fill=0):
+        """
+        path: Backing file (created on the first resize).
+        fill: Value of rows added by a resize.
+        """
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.fill = fill
+        self._array: Optional[np.memmap] = None
+        if os.path.exists(path) and os.path.getsize(path):
+            self._map(os.path.getsize(path) // self.dtype.itemsize)
+
+    def __len__(self) -> int:
+        return len(self._array) if self._array is not None else 0
+
+    @property
+    def array(self) -> np.ndarray:
+        """The mapped values (no copy)."""
+        if self._array is None:
+            return np.empty(0, dtype=self.dtype)
+        return self._array
+
+    def resize(self, capacity: int) -> None:
+        """Grow to at least `capacity` rows; existing rows keep their values."""
+        previous = len(self)
+        if capacity <= previous:
+            return
+        if self._array is not None:
+            self._array.flush()
+            del self._array
+        with open(self.path, "ab") as f:
+            f.truncate(capacity * self.dtype.itemsize)
+        self._map(capacity)
+        if self.fill:
+            self._array[previous:] = self.fill
+
+    def flush(self) -> None:
+        if self._array is not None:
+            self._array.flush()
+
+    def _map(self, length: int) -> None:
+        self._array = np.memmap(self.path, dtype=self.dtype, mode="r+", shape=(length,))
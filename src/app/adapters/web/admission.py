@@ -0,0 +1,102 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries the Retry-After hint."""
+
+    def __init__(self, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.retry_after = retry_after
+        self.reason = reason
+
+class AdmissionController:
+    """
+    Memory-based admission control for pipeline requests.
+    Each request reserves an estimate of its peak memory (derived from image
+    count and decoded pixel size) out of a fixed budget. Requests that do not
+    fit wait in a FIFO queue; when the queue is full or the wait times out
+    they are rejected so the caller can answer 429.
+    A request larger than the whole budget is still admitted when nothing else runs.
+    All methods must be called from the event loop thread.
+    """
+
+    def __init__(self, memory_budget_bytes: int, bytes_per_pixel: int, image_overhead_bytes: int,
+                 max_queue: int, queue_timeout_s: float, retry_after_s: int):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.bytes_per_pixel = bytes_per_pixel
+        self.image_overhead_bytes = image_overhead_bytes
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self.retry_after_s = retry_after_s
+
+        self.in_use = 0
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+
+    def estimate(self, sizes: Iterable[Tuple[int, int]]) -> int:
+        """
+        Estimate the memory of a request from the decoded (width, height) of its images.
+        """
+        return sum(w * h * self.bytes_per_pixel + self.image_overhead_bytes for w, h in sizes)
+
+    async def acquire(self, estimate: int) -> int:
+        """
+        Reserve `estimate` bytes, waiting in the queue if needed.
+        Returns the reserved amount, to be passed to `release`.
+        """
+        if not self._waiters and self._fits(estimate):
+            self.in_use += estimate
+            return estimate
+
+        if len(self._waiters) >= self.max_queue:
+            raise AdmissionRejected(self.retry_after_s, "Server busy: admission queue is full")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (estimate, future)
+        self._waiters.append(entry)
+        logger.info(f"Queued request needing {estimate / 2**20:.0f} MB ({len(self._waiters)} waiting)")
+
+        try:
+            await asyncio.wait_for(future, self.queue_timeout_s)
+        except asyncio.TimeoutError:
+            self._discard(entry)
+            raise AdmissionRejected(self.retry_after_s, "Server busy: timed out waiting for capacity")
+        except asyncio.CancelledError:
+            # Client went away; give back capacity if it was granted meanwhile
+            if future.done() and not future.cancelled():
+                self.release(estimate)
+            self._discard(entry)
+            raise
+        return estimate
+
+    def release(self, reserved: int) -> None:
+        """Return reserved capacity and admit queued requests that now fit."""
+        self.in_use -= reserved
+        self._wake()
+
+    def _wake(self) -> None:
+        # FIFO: stop at the first live waiter that does not fit
+        while self._waiters:
+            estimate, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if not self._fits(estimate):
+                break
+            self._waiters.popleft()
+            self.in_use += estimate
+            future.set_result(None)
+
+    def _fits(self, estimate: int) -> bool:
+        return self.in_use == 0 or self.in_use + estimate <= self.memory_budget_bytes
+
+    def _discard(self, entry: Tuple[int, asyncio.Future]) -> None:
+        try:
+            self._waiters.remove(entry)
+        except ValueError:
+            return
+        # A removed head may have been blocking smaller requests behind it
+        self._wake()
@@ -1,26 +1,249 @@
+import asyncio
+import contextvars
+import functools
 import json
-from io import BytesIO
-from typing import List
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, List, Optional, Tuple
 
-from PIL import Image, UnidentifiedImageError
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from PIL import UnidentifiedImageError
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request
 from starlette.middleware.cors import CORSMiddleware
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 
-from app.adapters.descriptions.blip_adapter import BLIPCaptioningAdapter
+from app.adapters.descriptions.lazy_captioning_adapter import LazyCaptioningAdapter
+from app.adapters.factories import build_captioning_model, build_embedding_model
 from app.adapters.clustering.hdbscan_adapter import HDBSCANClusteringAdapter
-from app.adapters.embeddings.dinov2_adapter import DINOv2EmbeddingAdapter
+from app.adapters.collections.disk_collection_store import DiskCollectionStore
+from app.adapters.embeddings.cached_embedding_adapter import CachedEmbeddingAdapter
+from app.adapters.embeddings.lazy_embedding_adapter import LazyEmbeddingAdapter
+from app.adapters.embeddings.micro_batching_adapter import MicroBatchingEmbeddingAdapter
+from app.adapters.index.brute_force_index import BruteForceVectorIndex
+from app.adapters.index.ivf_index import IVFVectorIndex
+from app.adapters.jobs.memory_job_store import InMemoryJobStore
+from app.adapters.jobs.sqlite_job_store import SQLiteJobStore
+from app.adapters.metrics.instrumented_adapters import (
+    InstrumentedCaptioningAdapter,
+    InstrumentedClusteringAdapter,
+    InstrumentedEmbeddingAdapter,
+    InstrumentedRenderer
+)
 from app.adapters.render.json_renderer_adapter import JsonRendererAdapter
-from app.core.rchestrator import run_pipeline
-from app.domain.models import ImageItem, Cluster
+from app.adapters.render.ndjson_renderer_adapter import NdjsonRendererAdapter
+from app.adapters.web.admission import AdmissionController, AdmissionRejected
+from app.adapters.web.result_cache import ResultCache
+from app.config.settings import (
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_CACHE_MEMORY_ITEMS,
+    PIPELINE_MAX_CONCURRENCY,
+    ADMISSION_MEMORY_BUDGET_MB,
+    ADMISSION_BYTES_PER_PIXEL,
+    ADMISSION_IMAGE_OVERHEAD_MB,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT_S,
+    ADMISSION_RETRY_AFTER_S,
+    RESULT_CACHE_ENABLED,
+    RESULT_CACHE_MAX_ITEMS,
+    RESULT_CACHE_TTL_S,
+    CAPTION_INFERENCE_MODE,
+    CAPTION_MAX_NEW_TOKENS,
+    CAPTION_NUM_BEAMS,
+    JOB_STORE,
+    JOB_STORE_PATH,
+    JOB_WORKERS,
+    MAX_JOB_IMAGES,
+    JOB_MAX_QUEUED,
+    JOB_MEMORY_BUDGET_MB,
+    JOB_RESULT_TTL_S,
+    MICRO_BATCH_MAX_SIZE,
+    MICRO_BATCH_MAX_WAIT_MS,
+    DECODE_MIN_SIDE,
+    INGEST_WORKERS,
+    COLLECTIONS_DIR,
+    COLLECTION_REFIT_OUTLIER_SHARE,
+    COLLECTION_MIN_STRENGTH,
+    TUNING_MAX_SESSIONS,
+    TUNING_SESSION_TTL_S,
+    VECTOR_INDEX_BACKEND,
+    VECTOR_INDEX_DIR,
+    VECTOR_INDEX_DTYPE,
+    IVF_NLIST,
+    IVF_NPROBE,
+    IVF_TRAIN_SIZE,
+    INDEX_UPLOADS,
+    MODEL_LOADING,
+    MODEL_RETRY_BACKOFF_S,
+    MODEL_RETRY_MAX_BACKOFF_S,
+    MODEL_WARMUP,
+    METRICS_ENABLED,
+    SERVER_TIMING_HEADERS,
+    STREAM_CAPTION_CHUNK,
+    CAPTION_IMAGES_PER_CLUSTER,
+    DEDUP_ENABLED,
+    DEDUP_MAX_HAMMING
+)
+from app.core.collections import CollectionService
+from app.core.dedup import NearDuplicateDetector
+from app.core.instrumentation import Instrumentation, model_memory_bytes, resident_memory_bytes
+from app.core.ingestion import ImageIngestor
+from app.core.tuning import ClusterTuningService
+from app.core.job_runner import JobRejected, JobRunner
+from app.core.model_registry import ModelRegistry
+from app.core.rchestrator import run_pipeline, stream_pipeline
+from app.domain.models import ImageItem, Cluster, embedding_matrix
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
-# Initialize adapters once at startup
-embedding_adapter = DINOv2EmbeddingAdapter()
+# Models are built by the registry (in the background or on first use) and reported by /ready
+model_registry = ModelRegistry(
+    lazy=MODEL_LOADING == "lazy",
+    retry_backoff_s=MODEL_RETRY_BACKOFF_S,
+    max_retry_backoff_s=MODEL_RETRY_MAX_BACKOFF_S
+)
+model_registry.register("embedding", build_embedding_model, warmup=MODEL_WARMUP)
+model_registry.register("captioning", build_captioning_model, warmup=MODEL_WARMUP)
+if MODEL_LOADING == "background":
+    model_registry.start()
+
+# Initialize adapters once at startup.
+# Cache hits never reach the model; misses from concurrent requests are merged into shared batches.
+micro_batcher = MicroBatchingEmbeddingAdapter(
+    LazyEmbeddingAdapter(model_registry, "embedding"),
+    max_batch_size=MICRO_BATCH_MAX_SIZE,
+    max_wait_ms=MICRO_BATCH_MAX_WAIT_MS
+)
+embedding_cache = CachedEmbeddingAdapter(
+    micro_batcher,
+    max_memory_items=EMBEDDING_CACHE_MEMORY_ITEMS,
+    cache_dir=EMBEDDING_CACHE_DIR
+)
+embedding_adapter = embedding_cache
 clustering_adapter = HDBSCANClusteringAdapter()
-captioning_adapter = BLIPCaptioningAdapter()
+# Parameters that shape the clusters (part of the result cache key)
+clustering_config = repr(sorted(vars(clustering_adapter).items()))
+captioning_adapter = LazyCaptioningAdapter(model_registry, "captioning")
 renderer = JsonRendererAdapter()
+stream_renderer = NdjsonRendererAdapter()
+
+# Persistent similarity index over the embeddings of processed uploads
+if VECTOR_INDEX_BACKEND == "ivf":
+    vector_index = IVFVectorIndex(
+        VECTOR_INDEX_DIR, dtype=VECTOR_INDEX_DTYPE, nlist=IVF_NLIST, nprobe=IVF_NPROBE, train_size=IVF_TRAIN_SIZE
+    )
+else:
+    vector_index = BruteForceVectorIndex(VECTOR_INDEX_DIR, dtype=VECTOR_INDEX_DTYPE)
+
+# Per-stage timings of every port call; with metrics disabled the adapters are not wrapped at all
+instrumentation = Instrumentation(enabled=METRICS_ENABLED)
+if METRICS_ENABLED:
+    embedding_adapter = InstrumentedEmbeddingAdapter(embedding_adapter, instrumentation)
+    clustering_adapter = InstrumentedClusteringAdapter(clustering_adapter, instrumentation)
+    captioning_adapter = InstrumentedCaptioningAdapter(captioning_adapter, instrumentation)
+    renderer = InstrumentedRenderer(renderer, instrumentation)
+
+# Wraps uploads in lazy ImageItems, decoded at the smallest resolution the models need
+ingestor = ImageIngestor(min_side=DECODE_MIN_SIDE, workers=INGEST_WORKERS)
+
+# Perceptual-hash prepass: near-duplicate uploads share one embedding forward pass
+deduplicator = NearDuplicateDetector(max_distance=DEDUP_MAX_HAMMING, workers=INGEST_WORKERS) if DEDUP_ENABLED else None
+
+# Pipeline work runs here, never on the event loop
+pipeline_executor = ThreadPoolExecutor(
+    max_workers=PIPELINE_MAX_CONCURRENCY, thread_name_prefix="pipeline"
+)
+admission = AdmissionController(
+    memory_budget_bytes=ADMISSION_MEMORY_BUDGET_MB * 1024 * 1024,
+    bytes_per_pixel=ADMISSION_BYTES_PER_PIXEL,
+    image_overhead_bytes=ADMISSION_IMAGE_OVERHEAD_MB * 1024 * 1024,
+    max_queue=ADMISSION_MAX_QUEUE,
+    queue_timeout_s=ADMISSION_QUEUE_TIMEOUT_S,
+    retry_after_s=ADMISSION_RETRY_AFTER_S
+)
+
+# Rendered /cluster-images responses of recently seen image sets
+result_cache = ResultCache(RESULT_CACHE_MAX_ITEMS, RESULT_CACHE_TTL_S) if RESULT_CACHE_ENABLED else None
+
+# Background jobs for large image sets
+job_store = SQLiteJobStore(JOB_STORE_PATH) if JOB_STORE == "sqlite" else InMemoryJobStore()
+job_runner = JobRunner(
+    job_store,
+    max_workers=JOB_WORKERS,
+    max_queued=JOB_MAX_QUEUED,
+    memory_budget_bytes=JOB_MEMORY_BUDGET_MB * 1024 * 1024,
+    ttl_s=JOB_RESULT_TTL_S,
+    retry_after_s=ADMISSION_RETRY_AFTER_S
+)
+
+# Persistent collections for incremental clustering
+collection_service = CollectionService(
+    DiskCollectionStore(COLLECTIONS_DIR),
+    embedding_adapter,
+    clustering_adapter,
+    captioning_adapter,
+    refit_outlier_share=COLLECTION_REFIT_OUTLIER_SHARE,
+    min_strength=COLLECTION_MIN_STRENGTH
+)
+
+# In-memory cluster hierarchies for interactive re-tuning
+tuning_service = ClusterTuningService(
+    embedding_adapter,
+    clustering_adapter,
+    captioning_adapter,
+    deduplicator=deduplicator,
+    max_sessions=TUNING_MAX_SESSIONS,
+    ttl_s=TUNING_SESSION_TTL_S
+)
+
+if METRICS_ENABLED:
+    instrumentation.register_gauge(
+        "embedding_batch_fill_ratio", "Mean fill ratio of micro-batched model calls",
+        lambda: micro_batcher.stats()["mean_fill_ratio"]
+    )
+    instrumentation.register_gauge(
+        "embedding_queue_wait_milliseconds", "Mean time a request waits for its micro-batch",
+        lambda: micro_batcher.stats()["mean_queue_wait_ms"]
+    )
+    instrumentation.register_counter(
+        "embedding_cache_lookups", "Embedding cache lookups by result",
+        lambda: {k: v for k, v in embedding_cache.stats().items() if k in ("memory_hits", "disk_hits", "misses")},
+        label="result"
+    )
+    if result_cache is not None:
+        instrumentation.register_counter(
+            "result_cache_lookups", "Whole-response cache lookups by result",
+            lambda: result_cache.stats(), label="result"
+        )
+    if deduplicator is not None:
+        instrumentation.register_counter(
+            "dedup_saved_forward_passes", "Embedding forward passes saved by the near-duplicate prepass",
+            lambda: deduplicator.stats()["saved_forward_passes"]
+        )
+    instrumentation.register_gauge(
+        "model_memory_bytes", "Parameter and buffer memory of each loaded model",
+        lambda: {name: size for name, size in (
+            (name, model_memory_bytes(adapter)) for name, adapter in model_registry.loaded().items()
+        ) if size is not None},
+        label="model"
+    )
+    instrumentation.register_gauge(
+        "process_resident_memory_bytes", "Resident memory of the API process", resident_memory_bytes
+    )
+    instrumentation.register_gauge(
+        "admission_reserved_bytes", "Memory currently reserved by admitted requests", lambda: admission.in_use
+    )
+
+async def add_server_timing(request: Request, call_next):
+    """Adds the request's per-stage breakdown as a Server-Timing header."""
+    timings = instrumentation.start_request()
+    response = await call_next(request)
+    if timings:
+        response.headers["Server-Timing"] = Instrumentation.server_timing(timings)
+    return response
+
+if METRICS_ENABLED and SERVER_TIMING_HEADERS:
+    app.middleware("http")(add_server_timing)
 
 app.add_middleware(
     CORSMiddleware,
@@ -44,22 +267,138 @@ async def health_check():
     """
     return JSONResponse(content={"status": "ok"})
 
+@app.get("/ready", summary="Readiness probe")
+async def readiness_check():
+    """
+    Reports load state and load time (including warmup) of each model.
+    Returns 503 until every model is ready, so traffic is held back while loading.
+    With MODEL_LOADING = "lazy", models load on the first request, so only failed models are 503.
+    """
+    content = {"ready": model_registry.ready, "models": model_registry.status()}
+    return JSONResponse(content=content, status_code=200 if content["ready"] else 503)
+
+@app.get("/embedding-cache", summary="Embedding cache statistics")
+async def embedding_cache_stats():
+    """
+    Returns hit/miss counters and tier sizes of the embedding cache.
+    """
+    return JSONResponse(content=embedding_cache.stats())
+
+@app.get("/metrics", summary="Prometheus metrics")
+async def metrics():
+    """
+    Per-stage latency histograms, throughput, micro-batching, cache and memory gauges
+    in the Prometheus text format.
+    """
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(instrumentation.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.post("/cluster-images")
 async def upload_images(files: List[UploadFile] = File(...)):
     """
     Receives a list of images, clusters them, and returns JSON results.
     """
 
+    uploads, sizes = await read_uploads(files, MAX_IMAGES)
+    if result_cache is None:
+        json_str = await run_admitted(sizes, process_uploads, uploads)
+    else:
+        # Hashing (and model id lookup, which may wait for a model load) stays off the event loop
+        images, key = await asyncio.get_running_loop().run_in_executor(None, fingerprint_uploads, uploads)
+        json_str = await result_cache.get_or_compute(key, lambda: run_admitted(sizes, process_images, images))
+
+    # The rendered string is the body; no parse and re-serialize
+    return Response(content=json_str, media_type="application/json")
+
+@app.post("/cluster-images/stream")
+async def upload_images_stream(files: List[UploadFile] = File(...)):
+    """
+    Same as /cluster-images, streamed as NDJSON: one "cluster" event per cluster as soon
+    as clustering ends, then one "description" event per cluster as captions finish,
+    then "done" (or "error" if the pipeline fails after the response has started).
+    """
+    uploads, sizes = await read_uploads(files, MAX_IMAGES)
+
+    loop = asyncio.get_running_loop()
+    lines: asyncio.Queue = asyncio.Queue()
+
+    def emit(line: Optional[str]) -> None:
+        loop.call_soon_threadsafe(lines.put_nowait, line)
+
+    def produce() -> None:
+        try:
+            for kind, clusters in stream_uploads(uploads):
+                if kind == "clusters":
+                    emit(stream_renderer.render_clusters(clusters))
+                else:
+                    emit(stream_renderer.render_descriptions(clusters))
+            emit(stream_renderer.render_done())
+        except Exception as e:
+            logger.exception("Streamed pipeline failed")
+            emit(stream_renderer.render_error(str(e)))
+        finally:
+            # End of stream
+            emit(None)
+
+    # Admission happens before the response starts, so a rejection is still a 429
+    await start_admitted(sizes, produce)
+
+    async def body() -> AsyncIterator[str]:
+        while True:
+            line = await lines.get()
+            if line is None:
+                return
+            yield line
+
+    return StreamingResponse(body(), media_type=stream_renderer.media_type)
+
+async def run_admitted(sizes: List[Tuple[int, int]], func: Callable, *args):
+    """
+    Run blocking pipeline work on the pipeline executor once admission control
+    has reserved memory for it. Raises 429 when the request cannot be admitted.
+    """
+    future = await start_admitted(sizes, func, *args)
+    # Cancelling the request must not cancel the work holding the reservation
+    return await asyncio.shield(future)
+
+async def start_admitted(sizes: List[Tuple[int, int]], func: Callable, *args) -> asyncio.Future:
+    """
+    Reserve memory for pipeline work and start it on the pipeline executor,
+    returning its future without waiting for it. Raises 429 when the request cannot be admitted.
+    """
+    # Reserve memory for this request, or queue / reject it
+    try:
+        reserved = await admission.acquire(admission.estimate(sizes))
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429, detail=e.reason, headers={"Retry-After": str(e.retry_after)}
+        )
+
+    # Run off the event loop; capacity is returned when the work ends,
+    # even if the client disconnects first.
+    # The request's context is carried over so stage timings reach its Server-Timing header.
+    context = contextvars.copy_context()
+    future = asyncio.get_running_loop().run_in_executor(pipeline_executor, context.run, func, *args)
+    future.add_done_callback(lambda _: admission.release(reserved))
+    return future
+
+async def read_uploads(files: List[UploadFile], max_images: int) -> Tuple[List[Tuple[str, bytes]], List[Tuple[int, int]]]:
+    """
+    Validate and read uploaded files.
+    Returns (filename, contents) pairs and the (width, height) of each image.
+    """
     if not files:
         raise HTTPException(status_code=400, detail="No files uploaded")
 
-    if len(files) > MAX_IMAGES:
+    if len(files) > max_images:
         raise HTTPException(
             status_code=400,
-            detail=f"Too many files uploaded. Maximum allowed is {MAX_IMAGES}."
+            detail=f"Too many files uploaded. Maximum allowed is {max_images}."
         )
 
-    images: List[ImageItem] = []
+    uploads: List[Tuple[str, bytes]] = []
+    sizes: List[Tuple[int, int]] = []
 
     for file in files:
         # Check file type
@@ -75,23 +414,232 @@ async def upload_images(files: List[UploadFile] = File(...)):
             raise HTTPException(status_code=413, detail=f"File too large: {file.filename}. Maximum allowed size is {max_mb:.1f} MB.")
 
         try:
-            # Convert to PIL.Image
-            img = Image.open(BytesIO(contents)).convert("RGB")
+            # Only the header is parsed here; decoding happens in the pipeline executor
+            sizes.append(ingestor.probe_size(contents))
         except UnidentifiedImageError:
             raise HTTPException(status_code=400, detail=f"Cannot open image: {file.filename}")
 
-        # Create ImageItem
-        images.append(ImageItem(id=file.filename, data=img))
+        uploads.append((file.filename, contents))
+
+    return uploads, sizes
+
+def process_uploads(uploads: List[Tuple[str, bytes]],
+                    progress: Optional[Callable[[str, int, int], None]] = None) -> str:
+    """
+    Decode the uploaded files, run the pipeline and render the result.
+    Blocking: runs on the pipeline executor or a job worker.
+    """
+    # Lazy items holding the uploaded bytes, keyed by content for the embedding cache
+    return process_images(ingestor.ingest(uploads), progress)
 
-    # Initialize adapters
-    renderer = JsonRendererAdapter()
+def fingerprint_uploads(uploads: List[Tuple[str, bytes]]) -> Tuple[List[ImageItem], str]:
+    """
+    Ingest the uploaded files and compute their result cache key.
+    Blocking: runs on a worker thread.
+    """
+    images = ingestor.ingest(uploads)
+    config = "|".join([
+        embedding_adapter.model_id, embedding_adapter.preprocess_config, clustering_config,
+        captioning_adapter.model_id, CAPTION_INFERENCE_MODE, str(CAPTION_MAX_NEW_TOKENS), str(CAPTION_NUM_BEAMS),
+        str(CAPTION_IMAGES_PER_CLUSTER), str(DEDUP_MAX_HAMMING if DEDUP_ENABLED else None)
+    ])
+    return images, ResultCache.fingerprint(images, config)
 
+def process_images(images: List[ImageItem],
+                   progress: Optional[Callable[[str, int, int], None]] = None) -> str:
+    """
+    Run the pipeline on ingested images and render the result.
+    Blocking: runs on the pipeline executor or a job worker.
+    """
     # Run pipeline
     clusters: List[Cluster] = run_pipeline(
-        images, embedding_adapter, clustering_adapter, captioning_adapter
+        images, embedding_adapter, clustering_adapter, captioning_adapter, progress=progress,
+        vector_index=vector_index if INDEX_UPLOADS else None, deduplicator=deduplicator
     )
 
     # Generate JSON string
-    json_str = renderer.render(clusters)
+    return renderer.render(clusters)
+
+def stream_uploads(uploads: List[Tuple[str, bytes]]):
+    """
+    Decode the uploaded files and run the streamed pipeline (see stream_pipeline).
+    Blocking: iterated on the pipeline executor.
+    """
+    return stream_pipeline(
+        ingestor.ingest(uploads), embedding_adapter, clustering_adapter, captioning_adapter,
+        caption_chunk=STREAM_CAPTION_CHUNK, vector_index=vector_index if INDEX_UPLOADS else None,
+        deduplicator=deduplicator
+    )
+
+@app.post("/jobs", status_code=202)
+async def create_job(files: List[UploadFile] = File(...)):
+    """
+    Accepts a (large) list of images and returns a job id at once.
+    The pipeline runs in the background; poll GET /jobs/{job_id} for progress and results.
+    Answers 429 when the job queue or its memory budget is full.
+    """
+    uploads, sizes = await read_uploads(files, MAX_JOB_IMAGES)
+    # Uploaded bytes are held while the job is queued, decoded images while it runs
+    cost = sum(len(contents) for _, contents in uploads) + admission.estimate(sizes)
+    try:
+        # submit persists the job (SQLite): keep that I/O off the event loop
+        job = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            job_runner.submit, lambda progress: process_uploads(uploads, progress), cost=cost
+        ))
+    except JobRejected as e:
+        raise HTTPException(status_code=429, detail=e.reason, headers={"Retry-After": str(e.retry_after)})
+    return JSONResponse(status_code=202, content={"job_id": job.id, "status": job.status})
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Returns status, per-stage progress and, once finished, the clustering result of a job.
+    Finished jobs are kept for JOB_RESULT_TTL_S seconds.
+    """
+    job = await asyncio.get_running_loop().run_in_executor(None, job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+
+    return JSONResponse(content={
+        "job_id": job.id,
+        "status": job.status,
+        "progress": job.progress,
+        "result": json.loads(job.result) if job.result is not None else None,
+        "error": job.error
+    })
+
+@app.post("/collections/{name}")
+async def create_collection(name: str, files: List[UploadFile] = File(...)):
+    """
+    Clusters images into a new persistent collection (replacing any existing one with that name).
+    The fitted clusterer, embeddings and captions are stored for later incremental updates.
+    """
+    validate_collection_name(name)
+    uploads, sizes = await read_uploads(files, MAX_JOB_IMAGES)
+
+    def fit() -> str:
+        return renderer.render(collection_service.fit(name, ingestor.ingest(uploads)))
+
+    json_str = await run_admitted(sizes, fit)
+    return JSONResponse(content={"collection": name, **json.loads(json_str)})
+
+@app.post("/collections/{name}/images")
+async def add_to_collection(name: str, files: List[UploadFile] = File(...)):
+    """
+    Assigns new images to an existing collection without re-clustering it.
+    Only clusters formed by new images are captioned; a full refit happens only
+    when too many new images are noise or outliers.
+    """
+    validate_collection_name(name)
+    uploads, sizes = await read_uploads(files, MAX_IMAGES)
 
-    return JSONResponse(content=json.loads(json_str))
+    def assign() -> Tuple[str, dict]:
+        clusters, summary = collection_service.assign(name, ingestor.ingest(uploads))
+        return renderer.render(clusters), summary
+
+    try:
+        json_str, summary = await run_admitted(sizes, assign)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Collection not found: {name}")
+    return JSONResponse(content={"collection": name, **summary, **json.loads(json_str)})
+
+@app.get("/collections/{name}")
+async def get_collection(name: str):
+    """
+    Returns the current clusters of a collection.
+    """
+    validate_collection_name(name)
+    try:
+        clusters = await asyncio.get_running_loop().run_in_executor(
+            pipeline_executor, collection_service.get, name
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Collection not found: {name}")
+    return JSONResponse(content={"collection": name, **json.loads(renderer.render(clusters))})
+
+def validate_collection_name(name: str) -> None:
+    if not DiskCollectionStore.NAME_PATTERN.match(name):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid collection name. Use 1-64 letters, digits, '-' or '_'."
+        )
+
+@app.post("/sessions")
+async def create_tuning_session(files: List[UploadFile] = File(...)):
+    """
+    Clusters images like /cluster-images and keeps the cluster hierarchy in memory,
+    so the result can be re-cut at new parameters with POST /sessions/{session_id}/recut.
+    """
+    uploads, sizes = await read_uploads(files, MAX_IMAGES)
+
+    def create() -> Tuple[str, str]:
+        session, clusters = tuning_service.create(ingestor.ingest(uploads))
+        return session.id, renderer.render(clusters)
+
+    session_id, json_str = await run_admitted(sizes, create)
+    return JSONResponse(content={
+        "session": session_id, "min_cluster_size": tuning_service.min_cluster_size,
+        "selection_method": "leaf", **json.loads(json_str)
+    })
+
+@app.post("/sessions/{session_id}/recut")
+async def recut_tuning_session(session_id: str,
+                               min_cluster_size: int = Query(..., ge=2),
+                               selection_method: str = Query("leaf", pattern="^(leaf|eom)$")):
+    """
+    Re-extracts the session's clusters for a new min_cluster_size and selection method
+    without re-embedding or refitting. Returns all clusters and the labels of those that
+    changed; only clusters not seen before in the session are captioned.
+    """
+    def recut() -> Tuple[str, List[int]]:
+        clusters, changed = tuning_service.recut(session_id, min_cluster_size, selection_method)
+        return renderer.render(clusters), changed
+
+    try:
+        json_str, changed = await asyncio.get_running_loop().run_in_executor(pipeline_executor, recut)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Session not found: {session_id}")
+    return JSONResponse(content={
+        "session": session_id, "min_cluster_size": min_cluster_size,
+        "selection_method": selection_method, "changed": changed, **json.loads(json_str)
+    })
+
+@app.delete("/sessions/{session_id}")
+async def delete_tuning_session(session_id: str):
+    """
+    Drops a tuning session and the images it holds.
+    """
+    if not tuning_service.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Session not found: {session_id}")
+    return JSONResponse(content={"deleted": session_id})
+
+@app.post("/similar")
+async def find_similar(file: UploadFile = File(...), k: int = Query(10, ge=1, le=100)):
+    """
+    Returns the k indexed images most similar to the uploaded one (cosine similarity).
+    """
+    uploads, sizes = await read_uploads([file], 1)
+
+    def search() -> List[dict]:
+        embeddings = embedding_adapter.extract_embeddings(ingestor.ingest(uploads))
+        results = vector_index.search(embedding_matrix(embeddings)[0], k)[0]
+        return [
+            {"digest": digest, "image_id": vector_index.name(digest), "score": score}
+            for digest, score in results
+        ]
+
+    results = await run_admitted(sizes, search)
+    return JSONResponse(content={"results": results})
+
+@app.delete("/index/{digest}")
+async def delete_from_index(digest: str):
+    """
+    Removes an image from the similarity index, by the SHA-256 of its content
+    (as returned by /similar), so only a holder of the image can address it.
+    """
+    removed = await asyncio.get_running_loop().run_in_executor(
+        pipeline_executor, vector_index.delete, [digest]
+    )
+    if not removed:
+        raise HTTPException(status_code=404, detail=f"Image not indexed: {digest}")
+    return JSONResponse(content={"deleted": digest})
@@ -0,0 +1,84 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from app.domain.models import ImageItem
+
+logger = logging.getLogger(__name__)
+
+class ResultCache:
+    """
+    Whole-response cache in front of the clustering pipeline.
+    Keys are a fingerprint of the uploaded image set (content hash and file name
+    of every image, independent of upload order) plus the pipeline configuration,
+    so re-posting an identical batch returns the stored rendered JSON at once.
+    Identical requests arriving while the first one is still computing wait for
+    it instead of starting their own run. Entries expire after `ttl_s` and the
+    least recently used are evicted beyond `max_items`; failures are never cached.
+    All methods must be called from the event loop thread.
+    """
+
+    def __init__(self, max_items: int = 256, ttl_s: float = 600):
+        """
+        max_items: Rendered responses kept.
+        ttl_s: Seconds a response is served from the cache.
+        """
+        self.max_items = max_items
+        self.ttl_s = ttl_s
+
+        # key -> (expiry, rendered response)
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def fingerprint(images: List[ImageItem], config: str) -> str:
+        """Order-independent key of an image set under a pipeline configuration."""
+        # File names are part of the response (image ids), so they are part of the key
+        members = sorted(f"{img.digest}:{img.id}" for img in images)
+        return hashlib.sha256("\n".join([config] + members).encode("utf-8")).hexdigest()
+
+    def stats(self) -> Dict[str, int]:
+        """Lookups by result since startup."""
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """
+        Return the cached response for `key`, join the computation already running
+        for it, or start `compute` and cache its result.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            logger.info("Identical request in flight; waiting for its result")
+        else:
+            self.misses += 1
+            # A task of its own: the shared run survives the first caller disconnecting
+            future = asyncio.ensure_future(compute())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(future)
+
+    def _finish(self, key: str, future: asyncio.Future) -> None:
+        del self._in_flight[key]
+        # Reading the exception marks it retrieved even when every caller is gone
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_s, future.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
@@ -1,22 +1,185 @@
+import os
 from datetime import datetime
 
-import torch
-
-# --- Device ---
-def get_device() -> str:
-    """
-    Select the best available device:
-    - CUDA: NVIDIA GPUs
-    - MPS: Apple Silicon
-    - CPU: fallback
-    """
-    if torch.cuda.is_available():
-        return "cuda"
-    if hasattr(torch.backends, "mps") and torch.backends.mps.is_available():
-        return "mps"
-    return "cpu"
-
-DEVICE = get_device()
+# Plain values only: torch device selection and thread setup live in
+# app.adapters.inference.torch_runtime, imported by the torch adapters alone.
+
 IMAGE_FOLDER = "../../input"
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-OUTPUT_FOLDER = f"../../../output_{timestamp}"
\ No newline at end of file
+OUTPUT_FOLDER = f"../../../output_{timestamp}"
+
+# --- CPU inference ---
+# Threads running PIL preprocessing ahead of the model
+PREPROCESS_WORKERS = 4
+# Intra-op threads for torch kernels (and ONNX Runtime operators); leave cores for the preprocessing pool
+TORCH_NUM_THREADS = max(1, (os.cpu_count() or 1) - PREPROCESS_WORKERS)
+# Inter-op threads for torch (independent ops run in parallel)
+TORCH_NUM_INTEROP_THREADS = 1
+# Default CPU batch size of the OpenCLIP and ONNX embedding adapters
+# (DINOv2 uses its batch_size_gpu on every device; the API and batch CLI pass MICRO_BATCH_MAX_SIZE)
+EMBEDDING_BATCH_SIZE_CPU = 8
+
+# --- Inference mode ---
+# "fp32", "bf16" (autocast), "int8" (dynamic quantization of Linear layers, CPU only)
+# or "compiled" (torch.compile + channels-last). Check drift with app.tools.validate_inference_modes
+EMBEDDING_INFERENCE_MODE = "fp32"
+CAPTION_INFERENCE_MODE = "fp32"
+
+# --- Embedding cache ---
+# Entries kept in the in-memory LRU tier
+EMBEDDING_CACHE_MEMORY_ITEMS = 4096
+# Folder of the persistent memory-mapped tier (None disables it)
+EMBEDDING_CACHE_DIR = "../../cache/embeddings"
+
+# --- Captioning ---
+# "blip" (generated captions) or "clip_labels" (zero-shot OpenCLIP labels from a vocabulary, much cheaper)
+CAPTIONING_BACKEND = "blip"
+# Vocabulary file for "clip_labels", one label per line (None uses the built-in list)
+CLIP_LABELS_FILE = None
+CLIP_LABEL_PROMPT = "a photo of {}"
+# Labels joined into each description
+CLIP_LABELS_TOP_K = 3
+# Folder caching the vocabulary's text embeddings across restarts (None: memory only)
+CLIP_LABEL_CACHE_DIR = "../../cache/labels"
+# Representative images captioned per cluster
+CAPTION_IMAGES_PER_CLUSTER = 3
+# Images per batched BLIP generate call (across clusters)
+CAPTION_BATCH_SIZE = 16
+# Decoding limits for BLIP generate
+CAPTION_MAX_NEW_TOKENS = 20
+CAPTION_NUM_BEAMS = 1
+# Clusters captioned per step of a streamed response (about one full generate batch)
+STREAM_CAPTION_CHUNK = max(1, CAPTION_BATCH_SIZE // CAPTION_IMAGES_PER_CLUSTER)
+
+# --- Request admission ---
+# Pipelines running at the same time (size of the pipeline executor)
+PIPELINE_MAX_CONCURRENCY = 2
+# Estimated memory all admitted requests may use together
+ADMISSION_MEMORY_BUDGET_MB = 2048
+# Bytes per decoded pixel (RGB bitmap plus conversion and tensor copies)
+ADMISSION_BYTES_PER_PIXEL = 8
+# Fixed per-image cost (model input tensors, embeddings)
+ADMISSION_IMAGE_OVERHEAD_MB = 2
+# Requests allowed to wait for capacity before new ones are rejected
+ADMISSION_MAX_QUEUE = 16
+# Seconds a queued request waits before it is rejected with 429
+ADMISSION_QUEUE_TIMEOUT_S = 30
+# Retry-After value (seconds) sent with 429 responses
+ADMISSION_RETRY_AFTER_S = 10
+
+# --- Background jobs ---
+# "sqlite" keeps finished results across restarts, "memory" does not
+JOB_STORE = "sqlite"
+JOB_STORE_PATH = "../../data/jobs.sqlite3"
+# Jobs processed at the same time
+JOB_WORKERS = 1
+# Maximum number of images accepted by POST /jobs
+MAX_JOB_IMAGES = 5000
+# Jobs waiting for a worker before POST /jobs answers 429
+JOB_MAX_QUEUED = 8
+# Estimated memory (uploaded bytes plus decoded images) all queued and running jobs may use together
+JOB_MEMORY_BUDGET_MB = 2048
+# Seconds a finished job and its result are kept
+JOB_RESULT_TTL_S = 3600
+
+# --- Result cache (POST /cluster-images) ---
+# Serve re-posted identical image sets from memory; identical concurrent requests share one run
+RESULT_CACHE_ENABLED = True
+# Rendered responses kept (least recently used are evicted first)
+RESULT_CACHE_MAX_ITEMS = 256
+# Seconds a response is served from the cache
+RESULT_CACHE_TTL_S = 600
+
+# --- Embedding micro-batching ---
+# Images merged across concurrent requests into one model call
+MICRO_BATCH_MAX_SIZE = 16
+# Longest time a request waits for others to fill the batch
+MICRO_BATCH_MAX_WAIT_MS = 5
+
+# --- Image ingestion ---
+# Shorter side each model resizes its input to
+MODEL_INPUT_SIDES = {"dinov2": 224, "openclip": 224, "blip": 384}
+# Images are decoded no smaller than this (JPEG draft mode / integer reduce)
+DECODE_MIN_SIDE = max(MODEL_INPUT_SIDES.values())
+# Threads hashing uploaded files
+INGEST_WORKERS = 4
+
+# --- Folder batch CLI (app.tools.cluster_folder) ---
+# Embedding store and checkpoint of a run; reuse it to resume an interrupted run
+BATCH_WORK_DIR = "../../data/batch"
+# Images embedded and checkpointed together
+BATCH_CHUNK_SIZE = 512
+# Files read ahead of the embedding model
+BATCH_READ_AHEAD = 64
+
+# --- Result storage (DiskStorageAdapter) ---
+# Threads writing image files
+STORAGE_WORKERS = 8
+# Images read from a file: "link" (hardlink, then reflink, then copy), "reflink" (then copy) or "copy"
+STORAGE_LINK_MODE = "link"
+# Write manifest.json (image id, file, cluster label, description, embedding row) next to the clusters
+STORAGE_MANIFEST = True
+
+# --- Near-duplicate collapse ---
+# Embed and cluster one representative per group of near-identical images (dHash prepass).
+# Opt-in: grouping is lossy and changes cluster membership and captions
+DEDUP_ENABLED = False
+# Largest Hamming distance between the 64-bit hashes of one group (0: identical hashes only;
+# about 4 also groups re-saved or resized copies)
+DEDUP_MAX_HAMMING = 0
+
+# --- Clustering ---
+# "precomputed" (dense cosine matrix), "scalable" (tree-based, no N x N matrix) or "auto"
+HDBSCAN_MODE = "auto"
+# In "auto" mode, image count from which the scalable mode is used
+HDBSCAN_SCALABLE_THRESHOLD = 5000
+# PCA components for the scalable mode (0 disables the reduction)
+HDBSCAN_PCA_COMPONENTS = 50
+
+# --- Collections (incremental clustering) ---
+COLLECTIONS_DIR = "../../data/collections"
+# Share of noise/outlier images added since the last fit that triggers a full refit
+COLLECTION_REFIT_OUTLIER_SHARE = 0.3
+# Membership strength below which an assigned image counts as an outlier
+COLLECTION_MIN_STRENGTH = 0.1
+
+# --- Tuning sessions (re-cutting a clustering without refitting) ---
+# Sessions kept in memory at the same time (least recently used are evicted first)
+TUNING_MAX_SESSIONS = 8
+# Seconds an unused session is kept
+TUNING_SESSION_TTL_S = 1800
+
+# --- Vector similarity index ---
+# "ivf" (approximate, inverted file) or "brute_force" (exact)
+VECTOR_INDEX_BACKEND = "ivf"
+VECTOR_INDEX_DIR = "../../data/vector_index"
+# Storage dtype of indexed vectors: "float16" or "float32"
+VECTOR_INDEX_DTYPE = "float16"
+# IVF partitions, partitions scanned per query, and vectors needed before training
+IVF_NLIST = 1024
+IVF_NPROBE = 16
+IVF_TRAIN_SIZE = 20000
+# Add embeddings of every processed upload to the index
+INDEX_UPLOADS = True
+
+# --- Model loading ---
+# Local snapshot written by `python -m app.tools.materialize_models`; None downloads from the hubs
+MODEL_SNAPSHOT_DIR = None
+# "background" (load at startup in a thread) or "lazy" (load on first request)
+MODEL_LOADING = "background"
+# Wait before retrying a failed model load, doubled per consecutive failure up to the maximum
+MODEL_RETRY_BACKOFF_S = 5
+MODEL_RETRY_MAX_BACKOFF_S = 300
+# Run one forward pass on dummy input before a model is reported ready
+MODEL_WARMUP = True
+# "torch" (DINOv2 adapter) or "onnx" (ONNX Runtime on CPU, graph from app.tools.export_onnx)
+EMBEDDING_BACKEND = "torch"
+ONNX_MODEL_PATH = "../../models/onnx/dinov2.onnx"
+
+# --- Instrumentation ---
+# Time every port call and serve latency histograms on GET /metrics (Prometheus text format)
+METRICS_ENABLED = True
+# Add a Server-Timing header with the per-stage breakdown of each request
+SERVER_TIMING_HEADERS = False
+# tqdm progress bars in the embedding adapters (useful for CLI runs, noise in a server log)
+PROGRESS_BARS = False
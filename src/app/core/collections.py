@@ -0,0 +1,192 @@
+import logging
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.domain.labels import assign_noise_labels, group_by_label
+from app.domain.models import Cluster, Collection, EmbeddingBatch, Embeddings, ImageItem, embedding_matrix, retain_decoded
+from app.ports.captioning_port import CaptioningPort
+from app.ports.clustering_port import ClusteringPort
+from app.ports.collection_store_port import CollectionStorePort
+from app.ports.embedding_port import EmbeddingPort
+
+logger = logging.getLogger(__name__)
+
+class CollectionService:
+    """
+    Incremental clustering over persistent named collections.
+    Fitting a collection stores the clusterer, embeddings and captions.
+    New images are then assigned with the stored model (no refit); only
+    clusters formed by the new noise images are captioned. A full refit runs
+    only when the share of noise/outlier images added since the last fit
+    passes `refit_outlier_share`.
+    """
+
+    def __init__(self, store: CollectionStorePort, embedding_service: EmbeddingPort,
+                 clustering_service: ClusteringPort, captioning_service: CaptioningPort,
+                 refit_outlier_share: float = 0.3, min_strength: float = 0.1):
+        """
+        refit_outlier_share: Share of noise/outlier images since the last fit that triggers a refit.
+        min_strength: Membership strength below which an assigned image counts as an outlier.
+        """
+        self.store = store
+        self.embedding_service = embedding_service
+        self.clustering_service = clustering_service
+        self.captioning_service = captioning_service
+        self.refit_outlier_share = refit_outlier_share
+        self.min_strength = min_strength
+
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def fit(self, name: str, images: List[ImageItem]) -> List[Cluster]:
+        """
+        Create (or replace) a collection from images and return its clusters.
+        """
+        with self._lock(name), retain_decoded(images):
+            embeddings = self.embedding_service.extract_embeddings(images)
+            collection = self._fit_collection(name, images, [], embeddings, previous=None)
+            # The previous version is replaced only now that embedding, fit and captions succeeded
+            self.store.replace(collection, images)
+            return self._clusters(collection)
+
+    def assign(self, name: str, images: List[ImageItem]) -> Tuple[List[Cluster], Dict[str, object]]:
+        """
+        Add images to an existing collection without refitting it (unless the outlier
+        share passes the threshold). Returns all clusters and a summary of the update.
+        Raises KeyError if the collection does not exist.
+        """
+        with self._lock(name), retain_decoded(images):
+            collection = self.store.load(name)
+            if collection is None:
+                raise KeyError(name)
+
+            embeddings = self.embedding_service.extract_embeddings(images)
+            raw_labels, strengths = self.clustering_service.predict(collection.model, embeddings)
+            outliers = (raw_labels == -1) | (strengths < self.min_strength)
+            paths = self.store.store_images(name, images, start=len(collection.image_ids))
+
+            collection.pending_total += len(images)
+            collection.pending_outliers += int(outliers.sum())
+            outlier_share = collection.pending_outliers / max(1, collection.pending_total)
+
+            if outlier_share > self.refit_outlier_share:
+                logger.info(f"Collection {name}: outlier share {outlier_share:.2f}, refitting")
+                stored = self._stored_images(collection)
+                stored_embeddings = EmbeddingBatch(images=stored, matrix=collection.embeddings)
+                collection = self._refit(
+                    name, stored + images, collection.image_paths + paths,
+                    EmbeddingBatch.concat([stored_embeddings, EmbeddingBatch.of(embeddings)]), previous=collection
+                )
+                summary = {"refit": True, "assigned": len(images), "new_clusters": None}
+            else:
+                new_clusters = self._extend(collection, images, paths, embeddings, raw_labels)
+                summary = {
+                    "refit": False,
+                    "assigned": int((raw_labels != -1).sum()),
+                    "new_clusters": new_clusters
+                }
+
+            summary["outlier_share"] = round(outlier_share, 3)
+            return self._clusters(collection), summary
+
+    def get(self, name: str) -> List[Cluster]:
+        """
+        Return the clusters of a collection. Raises KeyError if it does not exist.
+        """
+        collection = self.store.load(name)
+        if collection is None:
+            raise KeyError(name)
+        return self._clusters(collection)
+
+    def _refit(self, name: str, images: List[ImageItem], paths: List[str],
+               embeddings: Embeddings, previous) -> Collection:
+        collection = self._fit_collection(name, images, paths, embeddings, previous)
+        self.store.save(collection)
+        return collection
+
+    def _fit_collection(self, name: str, images: List[ImageItem], paths: List[str],
+                        embeddings: Embeddings, previous) -> Collection:
+        # Fit and caption without touching the store
+        model, raw_labels = self.clustering_service.fit(embeddings)
+        labels = assign_noise_labels(raw_labels)
+        clusters = group_by_label(images, labels)
+
+        # Reuse captions of clusters whose membership did not change
+        positions = {id(img): i for i, img in enumerate(images)}
+        previous_descriptions = {}
+        if previous is not None:
+            for label in np.unique(previous.labels):
+                members = frozenset(np.flatnonzero(previous.labels == label).tolist())
+                previous_descriptions[members] = previous.descriptions.get(int(label))
+
+        to_caption = []
+        for cluster in clusters:
+            members = frozenset(positions[id(img)] for img in cluster.images)
+            cluster.description = previous_descriptions.get(members)
+            if cluster.description is None:
+                to_caption.append(cluster)
+        self.captioning_service.generate_descriptions(to_caption)
+        logger.info(f"Collection {name}: fitted {len(images)} images, captioned {len(to_caption)} clusters")
+
+        return Collection(
+            name=name,
+            image_ids=[img.id for img in images],
+            embeddings=embedding_matrix(embeddings),
+            labels=labels,
+            descriptions={c.label: c.description for c in clusters},
+            model=model,
+            image_paths=paths
+        )
+
+    def _extend(self, collection: Collection, images: List[ImageItem], paths: List[str],
+                embeddings: Embeddings, raw_labels: np.ndarray) -> int:
+        labels = np.array(raw_labels, dtype=int, copy=True)
+        next_label = int(collection.labels.max()) + 1 if len(collection.labels) else 0
+
+        # New noise images are clustered among themselves; only those clusters get captions
+        noise = np.flatnonzero(labels == -1)
+        new_clusters: List[Cluster] = []
+        if len(noise) == 1:
+            new_clusters = [Cluster(label=0, images=[images[noise[0]]])]
+        elif len(noise) > 1:
+            noise_batch = EmbeddingBatch.of(embeddings)
+            new_clusters = self.clustering_service.cluster_embeddings(
+                EmbeddingBatch(images=[images[i] for i in noise], matrix=noise_batch.vectors()[noise])
+            )
+        self.captioning_service.generate_descriptions(new_clusters)
+
+        positions = {id(img): i for i, img in enumerate(images)}
+        for offset, cluster in enumerate(new_clusters):
+            cluster.label = next_label + offset
+            for img in cluster.images:
+                labels[positions[id(img)]] = cluster.label
+            collection.descriptions[cluster.label] = cluster.description
+
+        collection.image_ids.extend(img.id for img in images)
+        collection.image_paths.extend(paths)
+        collection.embeddings = np.concatenate([collection.embeddings, embedding_matrix(embeddings)])
+        collection.labels = np.concatenate([collection.labels, labels])
+        self.store.save(collection)
+        logger.info(
+            f"Collection {collection.name}: assigned {len(images) - len(noise)} images, "
+            f"{len(new_clusters)} new clusters"
+        )
+        return len(new_clusters)
+
+    def _clusters(self, collection: Collection) -> List[Cluster]:
+        clusters = group_by_label(self._stored_images(collection), collection.labels)
+        for cluster in clusters:
+            cluster.description = collection.descriptions.get(cluster.label)
+        return clusters
+
+    def _stored_images(self, collection: Collection) -> List[ImageItem]:
+        return [
+            ImageItem(id=image_id, path=path)
+            for image_id, path in zip(collection.image_ids, collection.image_paths)
+        ]
+
+    def _lock(self, name: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(name, threading.Lock())
@@ -0,0 +1,114 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+
+from app.domain.imaging import decode_image, dhash_thumbnail, dhashes
+from app.domain.models import Cluster, EmbeddingBatch, ImageItem
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class DuplicateGroups:
+    """
+    Images split into one representative per group of near-duplicates.
+    `duplicates[i]` holds the other members of the group of `representatives[i]`.
+    """
+    representatives: List[ImageItem]
+    duplicates: List[List[ImageItem]]
+
+    @property
+    def collapsed(self) -> int:
+        """Images that are not embedded (forward passes saved)."""
+        return sum(len(members) for members in self.duplicates)
+
+    def expand_embeddings(self, embeddings: EmbeddingBatch) -> EmbeddingBatch:
+        """Embeddings of the representatives plus their duplicates, which repeat the representative's row."""
+        rows = list(range(len(embeddings)))
+        images = list(embeddings.images)
+        for row, members in enumerate(self.duplicates):
+            rows.extend([row] * len(members))
+            images.extend(members)
+        return EmbeddingBatch(images=images, matrix=embeddings.vectors()[rows])
+
+    def expand_clusters(self, clusters: List[Cluster]) -> List[Cluster]:
+        """
+        Re-attach duplicates to the cluster of their representative, after its own images,
+        so captioning still picks distinct images first. Updates the clusters in place.
+        """
+        # Items are matched by identity: uploaded file names need not be unique
+        members = {id(rep): dups for rep, dups in zip(self.representatives, self.duplicates) if dups}
+        for cluster in clusters:
+            extra = [img for rep in cluster.images for img in members.get(id(rep), ())]
+            cluster.images.extend(extra)
+        return clusters
+
+class NearDuplicateDetector:
+    """
+    Perceptual-hash prepass run before embedding.
+    Every image gets a 64-bit dHash (decoded at thumbnail resolution on a thread
+    pool); images within `max_distance` bits of a representative are grouped with
+    it, so only one image per group goes through the embedding model and the
+    clusterer. Representatives are chosen greedily in input order.
+    """
+
+    # Shorter side images are decoded at for hashing (JPEG draft mode keeps this cheap)
+    DECODE_SIDE = 32
+
+    def __init__(self, max_distance: int = 4, workers: int = 4):
+        """
+        max_distance: Largest Hamming distance between hashes of one group (0: identical hashes).
+        workers: Threads decoding images for hashing.
+        """
+        self.max_distance = max_distance
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dedup")
+        self._lock = threading.Lock()
+        self.images = 0
+        self.saved = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Images seen and embedding forward passes saved since startup."""
+        with self._lock:
+            return {"images": self.images, "saved_forward_passes": self.saved}
+
+    def collapse(self, images: List[ImageItem]) -> DuplicateGroups:
+        if not images:
+            return DuplicateGroups(representatives=[], duplicates=[])
+
+        hashes = dhashes(np.stack(list(self.executor.map(self._thumbnail, images))))
+        assigned = np.zeros(len(images), dtype=bool)
+        representatives: List[ImageItem] = []
+        duplicates: List[List[ImageItem]] = []
+
+        for i in range(len(images)):
+            if assigned[i]:
+                continue
+            # Hamming distance from image i to every image, vectorized
+            distances = np.bitwise_count(hashes ^ hashes[i])
+            group = np.flatnonzero(~assigned & (distances <= self.max_distance))
+            assigned[group] = True
+            representatives.append(images[i])
+            duplicates.append([images[j] for j in group if j != i])
+
+        groups = DuplicateGroups(representatives=representatives, duplicates=duplicates)
+        with self._lock:
+            self.images += len(images)
+            self.saved += groups.collapsed
+        logger.info(
+            f"Near-duplicate prepass: {len(images)} images, {len(representatives)} to embed, "
+            f"{groups.collapsed} forward passes saved."
+        )
+        return groups
+
+    def _thumbnail(self, image: ImageItem) -> np.ndarray:
+        if image.image is not None or image.retained:
+            # The full decode is needed (or kept) for embedding anyway: hash that one
+            return dhash_thumbnail(image.data)
+        contents = image.source
+        if contents is None:
+            with open(image.path, "rb") as f:
+                contents = f.read()
+        return dhash_thumbnail(decode_image(contents, self.DECODE_SIDE))
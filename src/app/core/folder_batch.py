@@ -0,0 +1,164 @@
+import json
+import logging
+import os
+from itertools import islice
+from typing import Iterator, List, Optional, Set
+
+from app.adapters.storage.mmap_matrix import MmapMatrix
+from app.core.ingestion import ImageIngestor, iter_image_files
+from app.domain.models import Cluster, EmbeddingBatch, ImageItem
+from app.ports.captioning_port import CaptioningPort
+from app.ports.clustering_port import ClusteringPort
+from app.ports.embedding_port import EmbeddingPort
+
+logger = logging.getLogger(__name__)
+
+class FolderClusteringRun:
+    """
+    Clusters an image folder of any size with bounded memory.
+    Files are streamed through a generator pipeline (list, read on the ingest
+    threads, batch-embed) one chunk at a time; each chunk of embeddings is
+    appended to a memory-mapped store in `work_dir` and flushed, which is the
+    checkpoint. A run that is interrupted resumes with the files that are not in
+    the store yet. Clustering then reads the stored vectors through the memory map.
+    Files whose header parses but whose pixel data does not decode are logged,
+    left out of their chunk and listed in `work_dir`, so a resume skips them too.
+    """
+
+    STORE_DIR = "embeddings"
+    RUN_FILE = "run.json"
+    # Names of files that could not be decoded, one per line
+    SKIPPED_FILE = "skipped.txt"
+
+    def __init__(self, folder: str, work_dir: str, ingestor: ImageIngestor,
+                 embedding_service: EmbeddingPort, clustering_service: ClusteringPort,
+                 captioning_service: Optional[CaptioningPort] = None,
+                 chunk_size: int = 512, read_ahead: int = 64):
+        """
+        folder: Image folder (top-level files only).
+        work_dir: Folder of the embedding store and run metadata; reuse it to resume.
+        captioning_service: Describes the clusters; None leaves them undescribed.
+        chunk_size: Images embedded and checkpointed together.
+        read_ahead: Files read ahead of the embedding model.
+        """
+        self.folder = folder
+        self.work_dir = work_dir
+        self.ingestor = ingestor
+        self.embedding_service = embedding_service
+        self.clustering_service = clustering_service
+        self.captioning_service = captioning_service
+        self.chunk_size = chunk_size
+        self.read_ahead = read_ahead
+
+        os.makedirs(work_dir, exist_ok=True)
+        self._check_run()
+        self.store = MmapMatrix(os.path.join(work_dir, self.STORE_DIR))
+        self.skipped = self._load_skipped()
+
+    def embed(self) -> int:
+        """
+        Embed every image of the folder that is not in the store yet.
+        Returns the number of images embedded by this call.
+        """
+        if len(self.store):
+            logger.info(f"Resuming: {len(self.store)} images already embedded.")
+
+        pending = (path for path in iter_image_files(self.folder)
+                   if os.path.basename(path) not in self.store and os.path.basename(path) not in self.skipped)
+        items = self.ingestor.iter_files(pending, max_in_flight=self.read_ahead)
+
+        embedded = 0
+        for chunk in self._chunks(items):
+            embeddings = self._embed_chunk(chunk)
+            if len(embeddings):
+                self.store.append([img.id for img in embeddings.images], embeddings.vectors())
+                self.store.flush()
+            embedded += len(embeddings)
+            logger.info(f"Checkpoint: {len(self.store)} images embedded ({embedded} in this run).")
+        return embedded
+
+    def cluster(self) -> List[Cluster]:
+        """
+        Cluster (and describe) every stored image that is still in the folder.
+        Items read their file on demand, so no image is held in memory.
+        """
+        images: List[ImageItem] = []
+        rows: List[int] = []
+        for row, image_id in enumerate(self.store.keys):
+            path = os.path.join(self.folder, image_id)
+            if os.path.exists(path):
+                images.append(ImageItem(id=image_id, path=path, decode_min_side=self.ingestor.min_side))
+                rows.append(row)
+        # The memory-mapped matrix itself when no file was removed, else the remaining rows
+        matrix = self.store.matrix
+        embeddings = EmbeddingBatch(images=images, matrix=matrix if len(rows) == len(matrix) else matrix[rows])
+
+        logger.info(f"Clustering {len(embeddings)} stored embeddings...")
+        clusters = self.clustering_service.cluster_embeddings(embeddings)
+        logger.info(f"Generated {len(clusters)} clusters.")
+
+        if self.captioning_service is not None:
+            logger.info("Generating descriptions for clusters...")
+            clusters = self.captioning_service.generate_descriptions(clusters)
+        return clusters
+
+    def _embed_chunk(self, chunk: List[ImageItem]) -> EmbeddingBatch:
+        try:
+            return EmbeddingBatch.of(self.embedding_service.extract_embeddings(chunk))
+        except Exception:
+            # Look for files that do not decode; if every file does, the failure is not theirs
+            readable = [img for img in chunk if self._decodes(img)]
+            if len(readable) == len(chunk):
+                raise
+        readable_ids = {id(img) for img in readable}
+        self._skip([img.id for img in chunk if id(img) not in readable_ids])
+        if not readable:
+            return EmbeddingBatch.empty([], 0)
+        return EmbeddingBatch.of(self.embedding_service.extract_embeddings(readable))
+
+    @staticmethod
+    def _decodes(image: ImageItem) -> bool:
+        try:
+            image.data
+            return True
+        except Exception as e:
+            logger.warning(f"Skipping {image.path or image.id}: cannot decode ({e})")
+            return False
+
+    def _skip(self, names: List[str]) -> None:
+        # Appended and synced before the chunk's checkpoint, so a resume never retries them
+        with open(os.path.join(self.work_dir, self.SKIPPED_FILE), "a", encoding="utf-8") as f:
+            f.writelines(f"{name}\n" for name in names)
+            f.flush()
+            os.fsync(f.fileno())
+        self.skipped.update(names)
+
+    def _load_skipped(self) -> Set[str]:
+        path = os.path.join(self.work_dir, self.SKIPPED_FILE)
+        if not os.path.exists(path):
+            return set()
+        with open(path, "r", encoding="utf-8") as f:
+            return {line.rstrip("\n") for line in f if line.strip()}
+
+    def _chunks(self, items: Iterator[ImageItem]) -> Iterator[List[ImageItem]]:
+        while True:
+            chunk = list(islice(items, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _check_run(self) -> None:
+        # Vectors of another folder or model must never be mixed into the store
+        run = {
+            "folder": os.path.abspath(self.folder),
+            "model_id": getattr(self.embedding_service, "model_id", type(self.embedding_service).__name__)
+        }
+        path = os.path.join(self.work_dir, self.RUN_FILE)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                previous = json.load(f)
+            if previous != run:
+                raise ValueError(f"{self.work_dir} belongs to another run ({previous}); use a new work dir")
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(run, f)
@@ -0,0 +1,94 @@
+import hashlib
+import logging
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+from app.domain.imaging import probe_size
+from app.domain.models import ImageItem
+
+logger = logging.getLogger(__name__)
+
+def iter_image_files(folder: str) -> Iterator[str]:
+    """
+    Yield the paths of the image files directly inside `folder` (by extension),
+    in directory order. The listing is streamed, never held in memory.
+    """
+    extensions = Image.registered_extensions()
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in extensions:
+                yield entry.path
+
+class ImageIngestor:
+    """
+    Turns uploaded files into lazy ImageItems.
+    Items keep the original encoded bytes and decode on demand, at the smallest
+    resolution the configured models need (JPEG draft mode / integer reduce),
+    so decoding happens inside the adapters' preprocessing threads.
+    """
+
+    def __init__(self, min_side: int, workers: int = 4):
+        """
+        min_side: Smallest shorter side the models need.
+        workers: Threads hashing uploads in parallel.
+        """
+        self.min_side = min_side
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+
+    def probe_size(self, contents: bytes) -> Tuple[int, int]:
+        """
+        Return the (width, height) the image will have once decoded.
+        Only the header is parsed.
+        """
+        return probe_size(contents, self.min_side)
+
+    def ingest(self, uploads: List[Tuple[str, bytes]]) -> List[ImageItem]:
+        """
+        Build ImageItems for (filename, contents) pairs, preserving order.
+        """
+        return list(self.executor.map(lambda upload: self.to_item(*upload), uploads))
+
+    def to_item(self, filename: str, contents: bytes) -> ImageItem:
+        return ImageItem(
+            id=filename,
+            digest=hashlib.sha256(contents).hexdigest(),
+            source=contents,
+            decode_min_side=self.min_side
+        )
+
+    def iter_files(self, paths: Iterable[str], max_in_flight: int = 64) -> Iterator[ImageItem]:
+        """
+        Read and hash image files on the ingest threads, yielding ImageItems in input order.
+        At most `max_in_flight` files are read ahead, so memory stays bounded for any
+        number of paths. Files whose header cannot be parsed are logged and skipped;
+        pixel data is not decoded here, so a truncated file still yields an item.
+        """
+        pending = deque()
+        for path in paths:
+            pending.append(self.executor.submit(self.read_file, path))
+            if len(pending) >= max_in_flight:
+                item = pending.popleft().result()
+                if item is not None:
+                    yield item
+        while pending:
+            item = pending.popleft().result()
+            if item is not None:
+                yield item
+
+    def read_file(self, path: str) -> Optional[ImageItem]:
+        """ImageItem for a file on disk, named after the file, or None if it is not a readable image."""
+        try:
+            with open(path, "rb") as f:
+                contents = f.read()
+            # Parses the header only (UnidentifiedImageError is an OSError)
+            self.probe_size(contents)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping {path}: {e}")
+            return None
+        item = self.to_item(os.path.basename(path), contents)
+        item.path = path
+        return item
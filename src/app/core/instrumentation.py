@@ -0,0 +1,175 @@
+import contextvars
+import logging
+import os
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the stage latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Per-request stage timings (stage -> seconds), set by `start_request`
+_request_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+GaugeValue = Union[float, Dict[str, float], None]
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus semantics)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, cumulative count) pairs, ending with +Inf."""
+        total, rows = 0, []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            rows.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return rows
+
+class Instrumentation:
+    """
+    Collects per-stage timings of port calls (see app.adapters.metrics) and
+    renders them, with registered gauges and counters, in the Prometheus text format.
+    Stage latencies go to a histogram; image counts give images/second.
+    While a request is being timed (`start_request`), each observation is also
+    added to that request's breakdown, used for the Server-Timing header.
+    When disabled, `observe` returns immediately.
+    """
+
+    def __init__(self, enabled: bool = True, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._images: Dict[str, int] = {}
+        self._images_per_second: Dict[str, float] = {}
+        # (type, name, help, label, callback) of metrics read at scrape time
+        self._scraped: List[Tuple[str, str, str, str, Callable[[], GaugeValue]]] = []
+
+    def observe(self, stage: str, seconds: float, images: int = 0) -> None:
+        """Record one port call of `stage` that took `seconds` for `images` images."""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            if images:
+                self._images[stage] = self._images.get(stage, 0) + images
+                if seconds > 0:
+                    self._images_per_second[stage] = images / seconds
+
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + seconds
+
+    def register_gauge(self, name: str, help_text: str, callback: Callable[[], GaugeValue],
+                       label: str = "name") -> None:
+        """
+        Add a gauge read at scrape time. `callback` returns a number, None (skipped),
+        or a dict of label value -> number, exported with the label `label`.
+        """
+        self._scraped.append(("gauge", name, help_text, label, callback))
+
+    def register_counter(self, name: str, help_text: str, callback: Callable[[], GaugeValue],
+                         label: str = "name") -> None:
+        """
+        Add a monotonic count read at scrape time, exported as a counter named
+        `name` + "_total". `callback` returns values as for `register_gauge`.
+        """
+        self._scraped.append(("counter", f"{name}_total", help_text, label, callback))
+
+    def summary(self) -> Dict[str, Tuple[float, int]]:
+        """Total seconds and images of each stage so far, for logging at the end of a run."""
+        with self._lock:
+            return {
+                stage: (histogram.sum, self._images.get(stage, 0))
+                for stage, histogram in self._histograms.items()
+            }
+
+    @staticmethod
+    def start_request() -> Dict[str, float]:
+        """
+        Start collecting stage timings for the current context (e.g. an HTTP request).
+        Work run through `contextvars.copy_context().run` in other threads adds to it too.
+        """
+        timings: Dict[str, float] = {}
+        _request_timings.set(timings)
+        return timings
+
+    @staticmethod
+    def server_timing(timings: Dict[str, float]) -> str:
+        """Server-Timing header value, durations in milliseconds."""
+        return ", ".join(f"{stage};dur={1000 * seconds:.1f}" for stage, seconds in timings.items())
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            lines.append("# HELP pipeline_stage_duration_seconds Latency of port calls by pipeline stage")
+            lines.append("# TYPE pipeline_stage_duration_seconds histogram")
+            for stage, histogram in sorted(self._histograms.items()):
+                for le, count in histogram.cumulative():
+                    lines.append(f'pipeline_stage_duration_seconds_bucket{{stage="{stage}",le="{le}"}} {count}')
+                lines.append(f'pipeline_stage_duration_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'pipeline_stage_duration_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+            lines.append("# HELP pipeline_stage_images_total Images processed by pipeline stage")
+            lines.append("# TYPE pipeline_stage_images_total counter")
+            for stage, images in sorted(self._images.items()):
+                lines.append(f'pipeline_stage_images_total{{stage="{stage}"}} {images}')
+
+            lines.append("# HELP pipeline_stage_images_per_second Throughput of the last call by pipeline stage")
+            lines.append("# TYPE pipeline_stage_images_per_second gauge")
+            for stage, rate in sorted(self._images_per_second.items()):
+                lines.append(f'pipeline_stage_images_per_second{{stage="{stage}"}} {rate}')
+
+        for kind, name, help_text, label, callback in self._scraped:
+            try:
+                value = callback()
+            except Exception:
+                logger.exception(f"Metric {name} failed")
+                continue
+            if value is None:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if isinstance(value, dict):
+                for key, item in sorted(value.items()):
+                    lines.append(f'{name}{{{label}="{key}"}} {item}')
+            else:
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+def model_memory_bytes(adapter: object) -> Optional[int]:
+    """
+    Bytes held by the parameters and buffers of `adapter.model`, when it is a torch
+    module; None for other adapters (e.g. ONNX Runtime sessions).
+    """
+    model = getattr(adapter, "model", None)
+    if model is None or not hasattr(model, "parameters"):
+        return None
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+def resident_memory_bytes() -> Optional[int]:
+    """Current resident set size of the process (Linux /proc), or None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from app.domain.models import Job
+from app.ports.job_store_port import JobStorePort
+
+logger = logging.getLogger(__name__)
+
+# progress(stage, done, total)
+ProgressCallback = Callable[[str, int, int], None]
+
+class JobRejected(Exception):
+    """Raised when a job cannot be queued; carries the Retry-After hint."""
+
+    def __init__(self, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.retry_after = retry_after
+        self.reason = reason
+
+class JobRunner:
+    """
+    Runs pipeline work as background jobs on an in-process worker pool.
+    Status, per-stage progress and the rendered result are written to a JobStorePort.
+    Admission is bounded: at most `max_workers + max_queued` jobs are pending at
+    once, and their estimated memory (uploads held while queued plus decoding
+    while running) must fit `memory_budget_bytes`; other submissions are rejected.
+    Finished jobs are deleted from the store `ttl_s` after they end.
+    """
+
+    STAGES = ("embeddings", "clustering", "captions")
+
+    def __init__(self, store: JobStorePort, max_workers: int = 1, max_queued: int = 8,
+                 memory_budget_bytes: int = 2 * 1024 ** 3, ttl_s: float = 3600, retry_after_s: int = 10):
+        """
+        max_queued: Jobs waiting for a worker before new ones are rejected.
+        memory_budget_bytes: Estimated memory all pending jobs may use together.
+        ttl_s: Seconds a finished job (and its result) is kept.
+        retry_after_s: Retry-After hint of rejections.
+        """
+        self.store = store
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.max_pending = max_workers + max_queued
+        self.memory_budget_bytes = memory_budget_bytes
+        self.ttl_s = ttl_s
+        self.retry_after_s = retry_after_s
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._reserved = 0
+
+    def submit(self, work: Callable[[ProgressCallback], str], cost: int = 0) -> Job:
+        """
+        Queue `work` and return the new job at once.
+        `work` receives a progress callback and returns the rendered result.
+        `cost` is the job's estimated memory in bytes.
+        Raises JobRejected when the queue or the memory budget is full.
+        """
+        self.store.delete_finished_before(time.time() - self.ttl_s)
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobRejected(self.retry_after_s, "Server busy: job queue is full")
+            # A job larger than the whole budget is still accepted when nothing else is pending
+            if self._pending and self._reserved + cost > self.memory_budget_bytes:
+                raise JobRejected(self.retry_after_s, "Server busy: job memory budget is exhausted")
+            self._pending += 1
+            self._reserved += cost
+
+        now = time.time()
+        job = Job(
+            id=uuid.uuid4().hex,
+            progress={stage: {"done": 0, "total": 0} for stage in self.STAGES},
+            created_at=now,
+            updated_at=now
+        )
+        self.store.save(job)
+        self.executor.submit(self._run, job, work, cost)
+        logger.info(f"Job {job.id} queued")
+        return job
+
+    def _run(self, job: Job, work: Callable[[ProgressCallback], str], cost: int) -> None:
+        try:
+            self._execute(job, work)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._reserved -= cost
+
+    def _execute(self, job: Job, work: Callable[[ProgressCallback], str]) -> None:
+        def progress(stage: str, done: int, total: int) -> None:
+            with self._lock:
+                job.progress[stage] = {"done": done, "total": total}
+                self._save(job)
+
+        job.status = Job.RUNNING
+        self._save(job)
+        try:
+            job.result = work(progress)
+            job.status = Job.SUCCEEDED
+            logger.info(f"Job {job.id} succeeded")
+        except Exception as e:
+            logger.exception(f"Job {job.id} failed")
+            job.status = Job.FAILED
+            job.error = str(e)
+        self._save(job)
+
+    def _save(self, job: Job) -> None:
+        job.updated_at = time.time()
+        self.store.save(job)
@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class _Entry:
+    name: str
+    factory: Callable[[], object]
+    warmup: bool
+    state: str = "pending"
+    adapter: Optional[object] = None
+    load_seconds: Optional[float] = None
+    error: Optional[str] = None
+    # Consecutive failed loads, and when the next load may be attempted (monotonic clock)
+    failures: int = 0
+    retry_at: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+class ModelRegistry:
+    """
+    Loads model adapters lazily or in a background thread, and reports their state.
+    Each adapter is built once by its factory, then warmed up (a forward pass on
+    dummy input, via the adapter's `warmup()` method) before it is marked ready.
+    Callers of `get` block until the adapter is ready. A failed load stays FAILED
+    and `get` raises at once until its backoff (doubling per consecutive failure,
+    up to `max_retry_backoff_s`) has passed; the next `get` then retries it.
+    In lazy mode, models that have not failed count as ready: they are loaded by
+    the first request that needs them, which a readiness-gated load balancer
+    would otherwise never send.
+    """
+
+    PENDING = "pending"
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self, lazy: bool = False, retry_backoff_s: float = 5.0, max_retry_backoff_s: float = 300.0):
+        """
+        lazy: Models load on first use; pending models are reported ready.
+        retry_backoff_s: Wait before retrying a failed load (doubled per consecutive failure).
+        """
+        self.lazy = lazy
+        self.retry_backoff_s = retry_backoff_s
+        self.max_retry_backoff_s = max_retry_backoff_s
+        self._entries: Dict[str, _Entry] = {}
+
+    def register(self, name: str, factory: Callable[[], object], warmup: bool = True) -> None:
+        """
+        Register an adapter factory under a name. Nothing is loaded yet.
+        """
+        self._entries[name] = _Entry(name=name, factory=factory, warmup=warmup)
+
+    def start(self) -> threading.Thread:
+        """
+        Load every registered adapter in a background thread, in registration order.
+        Failed loads are retried after their backoff until they succeed.
+        """
+        def load_all():
+            for name, entry in self._entries.items():
+                while True:
+                    try:
+                        self.get(name)
+                        break
+                    except Exception:
+                        time.sleep(max(0.0, entry.retry_at - time.monotonic()))
+
+        thread = threading.Thread(target=load_all, name="model-loader", daemon=True)
+        thread.start()
+        return thread
+
+    def get(self, name: str) -> object:
+        """
+        Return the adapter, loading it first if needed (blocking).
+        """
+        entry = self._entries[name]
+        if entry.state == self.READY:
+            return entry.adapter
+
+        with entry.lock:
+            if entry.state == self.READY:
+                return entry.adapter
+            if entry.state == self.FAILED and time.monotonic() < entry.retry_at:
+                raise RuntimeError(f"Model '{name}' failed to load: {entry.error}")
+
+            entry.state = self.LOADING
+            started = time.perf_counter()
+            logger.info(f"Loading model '{name}'...")
+            try:
+                adapter = entry.factory()
+                if entry.warmup and hasattr(adapter, "warmup"):
+                    adapter.warmup()
+            except Exception as e:
+                entry.state = self.FAILED
+                entry.error = str(e)
+                entry.failures += 1
+                backoff = min(self.max_retry_backoff_s, self.retry_backoff_s * 2 ** (entry.failures - 1))
+                entry.retry_at = time.monotonic() + backoff
+                logger.exception(f"Model '{name}' failed to load (retry in {backoff:.0f}s)")
+                raise
+
+            entry.adapter = adapter
+            entry.load_seconds = round(time.perf_counter() - started, 3)
+            entry.error = None
+            entry.failures = 0
+            entry.state = self.READY
+            logger.info(f"Model '{name}' ready in {entry.load_seconds}s")
+            return adapter
+
+    def loaded(self) -> Dict[str, object]:
+        """Adapters that are ready, by name."""
+        return {name: entry.adapter for name, entry in self._entries.items() if entry.state == self.READY}
+
+    @property
+    def ready(self) -> bool:
+        if self.lazy:
+            return all(entry.state != self.FAILED for entry in self._entries.values())
+        return all(entry.state == self.READY for entry in self._entries.values())
+
+    def status(self) -> Dict[str, Dict[str, object]]:
+        """
+        Per-model load state, load time (seconds, including warmup), last error and
+        consecutive failures.
+        """
+        return {
+            name: {
+                "state": entry.state, "load_seconds": entry.load_seconds,
+                "error": entry.error, "failures": entry.failures
+            }
+            for name, entry in self._entries.items()
+        }
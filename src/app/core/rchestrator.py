@@ -1,10 +1,12 @@
-from typing import List
+from typing import Callable, Iterator, List, Optional, Tuple
 import logging
 
-from app.domain.models import ImageItem, EmbeddingVector, Cluster
+from app.core.dedup import DuplicateGroups, NearDuplicateDetector
+from app.domain.models import ImageItem, EmbeddingBatch, Cluster, retain_decoded
 from app.ports.captioning_port import CaptioningPort
 from app.ports.clustering_port import ClusteringPort
 from app.ports.embedding_port import EmbeddingPort
+from app.ports.vector_index_port import VectorIndexPort
 
 # --- Logging setup ---
 logging.basicConfig(
@@ -15,30 +17,144 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Chunk sizes used to report progress while a stage is running
+PROGRESS_CHUNK_IMAGES = 256
+PROGRESS_CHUNK_CLUSTERS = 32
+
 def run_pipeline(
         images: List[ImageItem],
         embedding_service: EmbeddingPort,
         clustering_service: ClusteringPort,
-        captioning_service: CaptioningPort
+        captioning_service: CaptioningPort,
+        progress: Optional[Callable[[str, int, int], None]] = None,
+        vector_index: Optional[VectorIndexPort] = None,
+        deduplicator: Optional[NearDuplicateDetector] = None
 ) -> List[Cluster]:
     """
     Run the full pipeline: extract embeddings, cluster images, and generate descriptions.
+    If `progress` is given, it is called as progress(stage, done, total) for the
+    "embeddings", "clustering" and "captions" stages; embeddings and captions are
+    then processed in chunks so progress moves while a stage runs.
+    If `vector_index` is given, the embeddings are added to it for similarity search.
+    If `deduplicator` is given, only one image per group of near-duplicates is embedded
+    and clustered; the others are added to their representative's cluster.
     """
     logger.info(f"Starting pipeline with {len(images)} images.")
 
-    # Step 1: Extract embeddings
-    logger.info("Extracting embeddings...")
-    embeddings: List[EmbeddingVector] = embedding_service.extract_embeddings(images)
-    logger.info(f"Extracted {len(embeddings)} embeddings.")
+    # Each image is decoded once and shared by every stage of this run
+    with retain_decoded(images):
+        # Step 1: Extract embeddings
+        embeddings, groups = extract_embeddings(images, embedding_service, progress, vector_index, deduplicator)
 
-    # Step 2: Cluster embeddings
-    logger.info("Clustering embeddings...")
-    clusters: List[Cluster] = clustering_service.cluster_embeddings(embeddings)
-    logger.info(f"Generated {len(clusters)} clusters.")
+        # Step 2: Cluster embeddings
+        logger.info("Clustering embeddings...")
+        if progress is not None:
+            progress("clustering", 0, len(embeddings))
+        clusters = cluster_embeddings(embeddings, clustering_service)
+        if groups is not None:
+            clusters = groups.expand_clusters(clusters)
+        if progress is not None:
+            progress("clustering", len(embeddings), len(embeddings))
+        logger.info(f"Generated {len(clusters)} clusters.")
 
-    # Step 3: Generate descriptions
-    logger.info("Generating descriptions for clusters...")
-    clusters = captioning_service.generate_descriptions(clusters)
+        # Step 3: Generate descriptions
+        logger.info("Generating descriptions for clusters...")
+        if progress is None:
+            clusters = captioning_service.generate_descriptions(clusters)
+        else:
+            described: List[Cluster] = []
+            progress("captions", 0, len(clusters))
+            for i in range(0, len(clusters), PROGRESS_CHUNK_CLUSTERS):
+                described.extend(captioning_service.generate_descriptions(clusters[i:i + PROGRESS_CHUNK_CLUSTERS]))
+                progress("captions", len(described), len(clusters))
+            clusters = described
     logger.info("Pipeline completed successfully.")
 
     return clusters
+
+def stream_pipeline(
+        images: List[ImageItem],
+        embedding_service: EmbeddingPort,
+        clustering_service: ClusteringPort,
+        captioning_service: CaptioningPort,
+        caption_chunk: int = PROGRESS_CHUNK_CLUSTERS,
+        vector_index: Optional[VectorIndexPort] = None,
+        deduplicator: Optional[NearDuplicateDetector] = None
+) -> Iterator[Tuple[str, List[Cluster]]]:
+    """
+    Run the same pipeline as run_pipeline, yielding results as soon as they exist:
+    ("clusters", all clusters) right after clustering, without descriptions, then
+    ("descriptions", clusters) for every `caption_chunk` clusters once they are captioned.
+    """
+    logger.info(f"Starting streamed pipeline with {len(images)} images.")
+    with retain_decoded(images):
+        embeddings, groups = extract_embeddings(
+            images, embedding_service, vector_index=vector_index, deduplicator=deduplicator
+        )
+
+        logger.info("Clustering embeddings...")
+        clusters = cluster_embeddings(embeddings, clustering_service)
+        if groups is not None:
+            clusters = groups.expand_clusters(clusters)
+        logger.info(f"Generated {len(clusters)} clusters.")
+        yield "clusters", clusters
+
+        logger.info("Generating descriptions for clusters...")
+        for i in range(0, len(clusters), caption_chunk):
+            yield "descriptions", captioning_service.generate_descriptions(clusters[i:i + caption_chunk])
+    logger.info("Streamed pipeline completed successfully.")
+
+def extract_embeddings(
+        images: List[ImageItem],
+        embedding_service: EmbeddingPort,
+        progress: Optional[Callable[[str, int, int], None]] = None,
+        vector_index: Optional[VectorIndexPort] = None,
+        deduplicator: Optional[NearDuplicateDetector] = None
+) -> Tuple[EmbeddingBatch, Optional[DuplicateGroups]]:
+    """
+    Pipeline step 1: embeddings of all images, reported in chunks if `progress` is given,
+    and added to `vector_index` if given.
+    With a `deduplicator`, only the representatives of near-duplicate groups are
+    embedded and returned, along with the groups; duplicates are indexed with the
+    vector of their representative.
+    """
+    groups = None
+    if deduplicator is not None:
+        groups = deduplicator.collapse(images)
+        images = groups.representatives
+
+    logger.info("Extracting embeddings...")
+    if progress is None:
+        embeddings = EmbeddingBatch.of(embedding_service.extract_embeddings(images))
+    else:
+        chunks: List[EmbeddingBatch] = []
+        done = 0
+        progress("embeddings", 0, len(images))
+        for i in range(0, len(images), PROGRESS_CHUNK_IMAGES):
+            chunk = EmbeddingBatch.of(embedding_service.extract_embeddings(images[i:i + PROGRESS_CHUNK_IMAGES]))
+            chunks.append(chunk)
+            done += len(chunk)
+            progress("embeddings", done, len(images))
+        embeddings = EmbeddingBatch.concat(chunks)
+    logger.info(f"Extracted {len(embeddings)} embeddings.")
+
+    if vector_index is not None and len(embeddings):
+        indexed = groups.expand_embeddings(embeddings) if groups is not None else embeddings
+        # Keyed by content digest; the file name is only metadata
+        rows = [i for i, img in enumerate(indexed.images) if img.digest is not None]
+        vector_index.add(
+            [indexed.images[i].digest for i in rows], indexed.vectors()[rows],
+            names=[indexed.images[i].id for i in rows]
+        )
+        logger.info(f"Indexed {len(rows)} embeddings ({len(vector_index)} in index).")
+    return embeddings, groups
+
+def cluster_embeddings(embeddings: EmbeddingBatch, clustering_service: ClusteringPort) -> List[Cluster]:
+    """
+    Pipeline step 2: cluster the embeddings. HDBSCAN needs at least two points, so a
+    single embedding (e.g. every upload collapsed into one near-duplicate group)
+    becomes one cluster of its own.
+    """
+    if len(embeddings) < 2:
+        return [Cluster(label=0, images=list(embeddings.images))] if len(embeddings) else []
+    return clustering_service.cluster_embeddings(embeddings)
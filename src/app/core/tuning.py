@@ -0,0 +1,176 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.dedup import DuplicateGroups, NearDuplicateDetector
+from app.core.rchestrator import extract_embeddings
+from app.domain.labels import assign_noise_labels, group_by_label
+from app.domain.models import Cluster, ImageItem, retain_decoded
+from app.ports.captioning_port import CaptioningPort
+from app.ports.clustering_port import ClusteringPort
+from app.ports.embedding_port import EmbeddingPort
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class TuningSession:
+    """
+    Clustered image set kept in memory for re-tuning.
+    `images` are the clustered items (near-duplicate representatives when a
+    deduplicator is used), in the order of the hierarchy's leaves.
+    """
+    id: str
+    images: List[ImageItem]
+    groups: Optional[DuplicateGroups]
+    # Cluster hierarchy returned by ClusteringPort.build_hierarchy (opaque here)
+    hierarchy: object
+    min_cluster_size: int
+    selection_method: str
+    # Final labels of the current cut (noise images in singleton clusters)
+    labels: np.ndarray
+    # Member positions of every cluster captioned so far -> description
+    descriptions: Dict[FrozenSet[int], Optional[str]] = field(default_factory=dict)
+    last_used: float = field(default_factory=time.monotonic)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+class ClusterTuningService:
+    """
+    Interactive re-tuning of one image set's clustering.
+    Creating a session runs the pipeline once and keeps the images and the cluster
+    hierarchy in memory; re-cutting it at a new `min_cluster_size` or selection
+    method only re-extracts flat clusters from the hierarchy (no embedding, no
+    distance computation, no refit). Captions are keyed by cluster membership, so
+    only clusters that were never seen in the session are captioned.
+    Sessions are evicted least recently used first, and after `ttl_s` without use.
+    """
+
+    def __init__(self, embedding_service: EmbeddingPort, clustering_service: ClusteringPort,
+                 captioning_service: CaptioningPort, deduplicator: Optional[NearDuplicateDetector] = None,
+                 min_cluster_size: int = 2, max_sessions: int = 8, ttl_s: float = 1800):
+        """
+        deduplicator: Near-duplicate prepass applied when a session is created.
+        min_cluster_size: Cut used when a session is created (the clustering service's own setting).
+        max_sessions: Sessions kept at the same time.
+        ttl_s: Seconds an unused session is kept.
+        """
+        self.embedding_service = embedding_service
+        self.clustering_service = clustering_service
+        self.captioning_service = captioning_service
+        self.deduplicator = deduplicator
+        self.min_cluster_size = min_cluster_size
+        self.max_sessions = max_sessions
+        self.ttl_s = ttl_s
+
+        self._sessions: "OrderedDict[str, TuningSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, images: List[ImageItem]) -> Tuple[TuningSession, List[Cluster]]:
+        """
+        Cluster and describe images, keeping the hierarchy for later re-cuts.
+        Returns the new session and its clusters.
+        """
+        # Decodes are shared during creation only; the session keeps the encoded bytes
+        with retain_decoded(images):
+            embeddings, groups = extract_embeddings(images, self.embedding_service, deduplicator=self.deduplicator)
+            hierarchy, raw_labels = self.clustering_service.build_hierarchy(embeddings)
+
+            session = TuningSession(
+                id=uuid.uuid4().hex,
+                images=list(embeddings.images),
+                groups=groups,
+                hierarchy=hierarchy,
+                min_cluster_size=self.min_cluster_size,
+                selection_method="leaf",
+                labels=assign_noise_labels(raw_labels)
+            )
+            clusters, _ = self._describe(session, session.labels)
+        logger.info(f"Tuning session {session.id}: {len(session.images)} images, {len(clusters)} clusters")
+
+        with self._lock:
+            self._evict()
+            self._sessions[session.id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session, clusters
+
+    def recut(self, session_id: str, min_cluster_size: int,
+              selection_method: str = "leaf") -> Tuple[List[Cluster], List[int]]:
+        """
+        Re-extract the session's clusters for new parameters.
+        Returns all clusters and the labels of the clusters whose membership is not
+        in the previous cut. Raises KeyError if the session does not exist (or expired).
+        """
+        session = self._get(session_id)
+        with session.lock:
+            started = time.perf_counter()
+            raw_labels = self.clustering_service.recut(session.hierarchy, min_cluster_size, selection_method)
+            labels = assign_noise_labels(raw_labels)
+            previous = set(self._memberships(session.labels).values())
+
+            clusters, captioned = self._describe(session, labels)
+            changed = [label for label, members in self._memberships(labels).items() if members not in previous]
+
+            session.labels = labels
+            session.min_cluster_size = min_cluster_size
+            session.selection_method = selection_method
+            logger.info(
+                f"Tuning session {session.id}: re-cut at min_cluster_size={min_cluster_size} ({selection_method}), "
+                f"{len(changed)} of {len(clusters)} clusters changed, {captioned} captioned "
+                f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+            )
+            return clusters, changed
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _describe(self, session: TuningSession, labels: np.ndarray) -> Tuple[List[Cluster], int]:
+        # Group the clustered items, reuse captions of known memberships, caption the rest
+        clusters = group_by_label(session.images, labels)
+        positions = {id(img): i for i, img in enumerate(session.images)}
+        memberships = [frozenset(positions[id(img)] for img in cluster.images) for cluster in clusters]
+
+        to_caption: List[Cluster] = []
+        for cluster, members in zip(clusters, memberships):
+            if members in session.descriptions:
+                cluster.description = session.descriptions[members]
+            else:
+                to_caption.append(cluster)
+
+        # Duplicates are attached before captioning, as in the pipeline
+        if session.groups is not None:
+            clusters = session.groups.expand_clusters(clusters)
+        if to_caption:
+            self.captioning_service.generate_descriptions(to_caption)
+        for cluster, members in zip(clusters, memberships):
+            session.descriptions[members] = cluster.description
+        return clusters, len(to_caption)
+
+    @staticmethod
+    def _memberships(labels: np.ndarray) -> Dict[int, FrozenSet[int]]:
+        members: Dict[int, List[int]] = {}
+        for position, label in enumerate(labels):
+            members.setdefault(int(label), []).append(position)
+        return {label: frozenset(positions) for label, positions in members.items()}
+
+    def _get(self, session_id: str) -> TuningSession:
+        with self._lock:
+            self._evict()
+            session = self._sessions.get(session_id)
+            if session is None:
+                raise KeyError(session_id)
+            session.last_used = time.monotonic()
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def _evict(self) -> None:
+        # Caller holds self._lock
+        deadline = time.monotonic() - self.ttl_s
+        for session_id in [s.id for s in self._sessions.values() if s.last_used < deadline]:
+            del self._sessions[session_id]
@@ -0,0 +1,60 @@
+from io import BytesIO
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# -------------------------------
+# Reduced-resolution decoding
+# -------------------------------
+# JPEGs use PIL draft mode, so the decoder scales by 1/2, 1/4 or 1/8 in the DCT
+# domain and never materialises the full-resolution bitmap. Other formats are
+# decoded fully and then box-reduced by an integer factor. In both cases the
+# shorter side stays >= min_side.
+
+def decode_image(contents: bytes, min_side: Optional[int] = None) -> Image.Image:
+    """Decode encoded image bytes to RGB, reduced towards `min_side` if given."""
+    img = Image.open(BytesIO(contents))
+    if min_side is None:
+        return img.convert("RGB")
+
+    _draft(img, min_side)
+    img = img.convert("RGB")
+    factor = _reduce_factor(img.size, min_side)
+    return img.reduce(factor) if factor > 1 else img
+
+def probe_size(contents: bytes, min_side: Optional[int] = None) -> Tuple[int, int]:
+    """(width, height) that `decode_image` will produce. Only the header is parsed."""
+    with Image.open(BytesIO(contents)) as img:
+        if min_side is None:
+            return img.size
+        _draft(img, min_side)
+        factor = _reduce_factor(img.size, min_side)
+        return -(-img.size[0] // factor), -(-img.size[1] // factor)
+
+def _draft(img: Image.Image, min_side: int) -> None:
+    # No-op for formats without draft support
+    if img.format == "JPEG":
+        img.draft("RGB", (min_side, min_side))
+
+def _reduce_factor(size: Tuple[int, int], min_side: int) -> int:
+    return max(1, min(size) // min_side)
+
+# -------------------------------
+# Perceptual hashing
+# -------------------------------
+# dHash: the image is shrunk to 9x8 grayscale and each bit says whether a pixel is
+# brighter than its right neighbour. Re-encoding and resizing barely change it, so
+# near-identical images have 64-bit hashes within a small Hamming distance.
+
+DHASH_SIZE = 8
+
+def dhash_thumbnail(img: Image.Image) -> np.ndarray:
+    """(8, 9) grayscale thumbnail that `dhashes` turns into a hash."""
+    small = img.convert("L").resize((DHASH_SIZE + 1, DHASH_SIZE), Image.BOX)
+    return np.asarray(small, dtype=np.int16)
+
+def dhashes(thumbnails: np.ndarray) -> np.ndarray:
+    """64-bit dHashes (uint64) of a stack of (N, 8, 9) thumbnails, in one vectorized step."""
+    bits = thumbnails[:, :, 1:] > thumbnails[:, :, :-1]
+    return np.packbits(bits.reshape(len(thumbnails), -1), axis=1).view(">u8").ravel().astype(np.uint64)
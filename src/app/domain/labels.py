@@ -0,0 +1,33 @@
+from typing import List, Optional
+
+import numpy as np
+
+from app.domain.models import Cluster, ImageItem
+
+# -------------------------------
+# Cluster label helpers
+# -------------------------------
+
+def assign_noise_labels(labels: np.ndarray, next_label: Optional[int] = None) -> np.ndarray:
+    """
+    Give each noise point (-1) its own new label, starting at `next_label`
+    (default: one past the largest label).
+    """
+    labels = np.array(labels, dtype=int, copy=True)
+    if next_label is None:
+        next_label = int(labels.max()) + 1 if len(labels) > 0 else 0
+    noise = labels == -1
+    labels[noise] = np.arange(next_label, next_label + int(noise.sum()))
+    return labels
+
+def group_by_label(images: List[ImageItem], labels: np.ndarray) -> List[Cluster]:
+    """
+    Group images into Cluster objects, in order of first appearance of each label.
+    """
+    clusters_dict = {}
+    for img, label in zip(images, labels):
+        clusters_dict.setdefault(int(label), []).append(img)
+    return [
+        Cluster(label=label, images=imgs, description=None)
+        for label, imgs in clusters_dict.items()
+    ]
@@ -1,16 +1,89 @@
-from dataclasses import dataclass
-from typing import List
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
 import numpy as np
 from PIL import Image
 
+from app.domain.imaging import decode_image
+
 # -------------------------------
-# Image item in memory
+# Image item
 # -------------------------------
 @dataclass
 class ImageItem:
-    """Represents an image in memory with an ID."""
+    """Represents an image with an ID.
+    The image is kept as its original encoded bytes (`source`) and decoded on
+    demand by `data`, so a request holds compressed bytes instead of RGB bitmaps.
+    A decoded image can also be given directly through `image`, or read from
+    a file on disk through `path`.
+    `digest` is the SHA-256 of the uploaded bytes, when known.
+    `decode_min_side` lets `data` decode at reduced resolution (see app.domain.imaging).
+    Inside `retain_decoded`, the first decode is kept and shared by every later
+    stage (near-duplicate hashing, embedding, captioning) until the block exits."""
     id: str
-    data: Image.Image
+    image: Optional[Image.Image] = field(default=None, repr=False)
+    digest: Optional[str] = None
+    source: Optional[bytes] = field(default=None, repr=False)
+    decode_min_side: Optional[int] = None
+    path: Optional[str] = None
+    # Per-model resized views, cached by key
+    views: Dict[str, Image.Image] = field(default_factory=dict, repr=False, compare=False)
+    # Decode kept while the item is retained (see retain_decoded)
+    retained: bool = field(default=False, init=False, repr=False, compare=False)
+    _decoded: Optional[Image.Image] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def data(self) -> Image.Image:
+        """
+        Decoded RGB image. Decoded from `source` (or `path`) on every access unless
+        `image` is set or the item is retained, in which case it is decoded once.
+        """
+        if self.image is not None:
+            return self.image
+        decoded = self._decoded
+        if decoded is None:
+            if self.source is None and self.path is not None:
+                with open(self.path, "rb") as f:
+                    decoded = decode_image(f.read(), self.decode_min_side)
+            else:
+                decoded = decode_image(self.source, self.decode_min_side)
+            # Two threads may both decode a retained item the first time; either result is kept
+            if self.retained:
+                self._decoded = decoded
+        return decoded
+
+    def release(self) -> None:
+        """Stop retaining the decoded image and drop it (and the cached views)."""
+        self.retained = False
+        self._decoded = None
+        self.views.clear()
+
+    def view(self, key: str, transform: Callable[[Image.Image], Image.Image]) -> Image.Image:
+        """
+        Return `transform(data)`, computed once and cached under `key`.
+        Meant for small model-specific views (e.g. a 384x384 resize).
+        """
+        view = self.views.get(key)
+        if view is None:
+            view = transform(self.data)
+            self.views[key] = view
+        return view
+
+@contextmanager
+def retain_decoded(images: Iterable[ImageItem]) -> Iterator[None]:
+    """
+    Decode each image at most once for the duration of the block (one request),
+    instead of once per stage. Decoded images are dropped when the block exits,
+    so only the compressed bytes outlive the request.
+    """
+    images = list(images)
+    for img in images:
+        img.retained = True
+    try:
+        yield
+    finally:
+        for img in images:
+            img.release()
 
 # -------------------------------
 # Embeddings
@@ -21,6 +94,99 @@ class EmbeddingVector:
     image: ImageItem
     value: np.ndarray
 
+@dataclass
+class EmbeddingBatch:
+    """Embeddings of several images as one contiguous (N, d) matrix.
+    Row i of `matrix` belongs to `images[i]`. The matrix is float32, float16, or
+    int8 with a per-row `scale` (see `quantize`). Adapters write their output into
+    it directly and consumers read `vectors()`, which is zero-copy for float32.
+    It is also a read-only sequence of EmbeddingVector (row views), so code
+    written against the list API keeps working."""
+    images: List[ImageItem]
+    matrix: np.ndarray
+    # Per-row dequantization factors, only for int8 matrices
+    scale: Optional[np.ndarray] = field(default=None, repr=False)
+
+    @classmethod
+    def empty(cls, images: List[ImageItem], dim: int) -> "EmbeddingBatch":
+        """Uninitialized float32 batch for `images`, for adapters to fill in place."""
+        return cls(images=list(images), matrix=np.empty((len(images), dim), dtype=np.float32))
+
+    @classmethod
+    def of(cls, embeddings: "Embeddings") -> "EmbeddingBatch":
+        """The batch itself, or a new batch stacked from a list of EmbeddingVector."""
+        if isinstance(embeddings, EmbeddingBatch):
+            return embeddings
+        if not embeddings:
+            return cls.empty([], 0)
+        return cls(
+            images=[e.image for e in embeddings],
+            matrix=np.stack([np.asarray(e.value, dtype=np.float32) for e in embeddings])
+        )
+
+    @classmethod
+    def concat(cls, batches: Sequence["EmbeddingBatch"]) -> "EmbeddingBatch":
+        """One float32 batch with the rows of all batches, in order."""
+        batches = [b for b in batches if len(b)]
+        if not batches:
+            return cls.empty([], 0)
+        if len(batches) == 1:
+            return batches[0]
+        return cls(
+            images=[img for b in batches for img in b.images],
+            matrix=np.concatenate([b.vectors() for b in batches])
+        )
+
+    @property
+    def ids(self) -> np.ndarray:
+        return np.array([img.id for img in self.images], dtype=object)
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1]
+
+    def vectors(self) -> np.ndarray:
+        """(N, d) float32 matrix; no copy unless the batch is float16 or int8."""
+        if self.scale is not None:
+            return self.matrix.astype(np.float32) * self.scale[:, None]
+        return np.asarray(self.matrix, dtype=np.float32)
+
+    def quantize(self, dtype: str) -> "EmbeddingBatch":
+        """Copy stored as "float32", "float16" or "int8" (symmetric, one scale per row)."""
+        vectors = self.vectors()
+        if dtype == "int8":
+            scale = np.abs(vectors).max(axis=1) / 127.0
+            scale[scale == 0] = 1.0
+            matrix = np.round(vectors / scale[:, None]).astype(np.int8)
+            return EmbeddingBatch(images=list(self.images), matrix=matrix, scale=scale.astype(np.float32))
+        return EmbeddingBatch(images=list(self.images), matrix=vectors.astype(dtype))
+
+    def __len__(self) -> int:
+        return len(self.images)
+
+    def __iter__(self) -> Iterator[EmbeddingVector]:
+        return (self[i] for i in range(len(self)))
+
+    def __getitem__(self, index: Union[int, slice]):
+        """EmbeddingVector for an int (a view of its row); a batch viewing the same matrix for a slice."""
+        if isinstance(index, slice):
+            return EmbeddingBatch(
+                images=self.images[index],
+                matrix=self.matrix[index],
+                scale=self.scale[index] if self.scale is not None else None
+            )
+        value = self.matrix[index]
+        if self.scale is not None:
+            value = value.astype(np.float32) * self.scale[index]
+        return EmbeddingVector(image=self.images[index], value=value)
+
+# Anything the pipeline accepts as embeddings: a batch or a list of vectors
+Embeddings = Union[EmbeddingBatch, Sequence[EmbeddingVector]]
+
+def embedding_matrix(embeddings: Embeddings) -> np.ndarray:
+    """(N, d) float32 matrix of embeddings; zero-copy for a float32 EmbeddingBatch."""
+    return EmbeddingBatch.of(embeddings).vectors()
+
 # -------------------------------
 # Clusters
 # -------------------------------
@@ -30,3 +196,46 @@ class Cluster:
     label: int
     images: List[ImageItem]
     description: str = None
+
+# -------------------------------
+# Background jobs
+# -------------------------------
+@dataclass
+class Job:
+    """Represents a background pipeline run and its per-stage progress."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    id: str
+    status: str = QUEUED
+    # stage name -> {"done": int, "total": int}
+    progress: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    # Rendered JSON result, once succeeded
+    result: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+# -------------------------------
+# Collections
+# -------------------------------
+@dataclass
+class Collection:
+    """Persistent named clustering that new images can be assigned to without refitting.
+    Per-image arrays (`image_ids`, `embeddings`, `labels`) share the same order;
+    `labels` are final cluster labels, with noise images in singleton clusters."""
+    name: str
+    image_ids: List[str]
+    embeddings: np.ndarray
+    labels: np.ndarray
+    # cluster label -> description
+    descriptions: Dict[int, str]
+    # Fitted clustering model (opaque to the domain)
+    model: object = field(default=None, repr=False)
+    # Images added since the last fit, and how many of them were noise or outliers
+    pending_total: int = 0
+    pending_outliers: int = 0
+    # Stored image files, in the same order as image_ids
+    image_paths: List[str] = field(default_factory=list, repr=False)
@@ -1,17 +1,51 @@
 from abc import ABC
-from typing import List
+from typing import List, Tuple
 
-from app.domain.models import EmbeddingVector, Cluster
+import numpy as np
+
+from app.domain.models import Embeddings, Cluster
 
 class ClusteringPort(ABC):
     """
     Abstract interface for clustering embeddings.
     Implementations should group ImageItems into Cluster objects based on similarity.
+    Embeddings are an EmbeddingBatch or a list of EmbeddingVector; read them with
+    `embedding_matrix` to get the batch's matrix without copying.
+    Implementations supporting incremental clustering also provide `fit` and `predict`;
+    those supporting re-tuning without refitting provide `build_hierarchy` and `recut`.
     """
 
-    def cluster_embeddings(self, embeddings: List[EmbeddingVector]) -> List[Cluster]:
+    def cluster_embeddings(self, embeddings: Embeddings) -> List[Cluster]:
         """
         Receive a list of embeddings and return a list of Cluster objects
         with ImageItems grouped according to similarity.
         """
         pass
+
+    def fit(self, embeddings: Embeddings) -> Tuple[object, np.ndarray]:
+        """
+        Fit a reusable clustering model.
+        Returns the model and the raw label of each embedding (-1 for noise).
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support incremental clustering")
+
+    def predict(self, model: object, embeddings: Embeddings) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Assign new embeddings to the clusters of a fitted model without refitting.
+        Returns the raw labels (-1 for noise) and the membership strength of each embedding.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support incremental clustering")
+
+    def build_hierarchy(self, embeddings: Embeddings) -> Tuple[object, np.ndarray]:
+        """
+        Cluster embeddings and keep the cluster hierarchy for later re-cuts.
+        Returns the hierarchy and the raw label of each embedding (-1 for noise).
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support re-cutting clusterings")
+
+    def recut(self, hierarchy: object, min_cluster_size: int, selection_method: str = "leaf") -> np.ndarray:
+        """
+        Extract the flat clustering of a stored hierarchy for new parameters without refitting.
+        Returns the raw label of each embedding (-1 for noise).
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support re-cutting clusterings")
@@ -0,0 +1,48 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from app.domain.models import Collection, ImageItem
+
+class CollectionStorePort(ABC):
+    """
+    Abstract interface for persisting named collections.
+    Implementations store the fitted clustering model, embeddings, labels,
+    descriptions and the image files of each collection.
+    """
+
+    @abstractmethod
+    def load(self, name: str) -> Optional[Collection]:
+        """
+        Return the collection with the given name, or None if it does not exist.
+        """
+        pass
+
+    @abstractmethod
+    def save(self, collection: Collection) -> None:
+        """
+        Persist a collection (replacing any previous version).
+        """
+        pass
+
+    @abstractmethod
+    def store_images(self, name: str, images: List[ImageItem], start: int) -> List[str]:
+        """
+        Store image files of a collection, numbered from `start`.
+        Returns the path of each stored file.
+        """
+        pass
+
+    @abstractmethod
+    def replace(self, collection: Collection, images: List[ImageItem]) -> None:
+        """
+        Persist `collection` with `images` as its only image files, replacing any
+        previous version only once everything is written (a failure leaves it intact).
+        Sets `collection.image_paths` to the stored files.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, name: str) -> None:
+        """
+        Remove a collection and its files, if present.
+        """
+        pass
@@ -1,18 +1,18 @@
 from abc import ABC, abstractmethod
 from typing import List
-from app.domain.models import ImageItem, EmbeddingVector
+from app.domain.models import ImageItem, EmbeddingBatch
 
 class EmbeddingPort(ABC):
     """
     Abstract interface for extracting embeddings from images.
-    Implementations should return a list of EmbeddingVector objects
-    corresponding to the input ImageItem objects.
+    Implementations should return an EmbeddingBatch whose rows correspond
+    to the input ImageItem objects.
     """
 
     @abstractmethod
-    def extract_embeddings(self, images: List[ImageItem]) -> List[EmbeddingVector]:
+    def extract_embeddings(self, images: List[ImageItem]) -> EmbeddingBatch:
         """
         Extract embeddings for a list of images.
-        Each EmbeddingVector contains the associated ImageItem and its embedding vector.
+        The batch holds one row per image; iterating it yields EmbeddingVector objects.
         """
         pass
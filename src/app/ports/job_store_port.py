@@ -0,0 +1,31 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from app.domain.models import Job
+
+class JobStorePort(ABC):
+    """
+    Abstract interface for persisting background jobs.
+    Implementations store the job status, progress and rendered result.
+    """
+
+    @abstractmethod
+    def save(self, job: Job) -> None:
+        """
+        Insert or replace a job.
+        """
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Return the job with the given id, or None if it does not exist.
+        """
+        pass
+
+    @abstractmethod
+    def delete_finished_before(self, cutoff: float) -> int:
+        """
+        Delete succeeded and failed jobs last updated before `cutoff` (epoch seconds).
+        Returns how many were deleted.
+        """
+        pass
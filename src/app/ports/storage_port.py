@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Dict, List, Optional
 from app.domain.models import Cluster
 
 class StoragePort(ABC):
@@ -9,8 +9,9 @@ class StoragePort(ABC):
     """
 
     @abstractmethod
-    def save(self, clusters: List[Cluster]):
+    def save(self, clusters: List[Cluster], embedding_rows: Optional[Dict[str, int]] = None):
         """
         Save a list of Cluster objects to storage.
+        embedding_rows optionally maps image ids to the row of their embedding in an external store.
         """
         pass
@@ -0,0 +1,48 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+class VectorIndexPort(ABC):
+    """
+    Abstract interface for a persistent vector similarity index.
+    Vectors are L2-normalized embeddings addressed by image id (the content digest,
+    so unrelated uploads sharing a file name stay apart); similarity is the inner
+    product (cosine similarity).
+    """
+
+    @abstractmethod
+    def add(self, ids: List[str], vectors: np.ndarray, names: Optional[List[str]] = None) -> None:
+        """
+        Add vectors under the given ids; ids already present are kept (and revived if deleted).
+        `names` (e.g. upload file names) are stored as metadata of new ids.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, ids: List[str]) -> int:
+        """
+        Remove ids from the index. Returns how many were present.
+        """
+        pass
+
+    @abstractmethod
+    def name(self, image_id: str) -> Optional[str]:
+        """
+        Name stored with an id, or None if the id is unknown.
+        """
+        pass
+
+    @abstractmethod
+    def search(self, queries: np.ndarray, k: int) -> List[List[Tuple[str, float]]]:
+        """
+        Return, for each query row, up to k (id, similarity) pairs, best first.
+        """
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """
+        Number of live (not deleted) vectors.
+        """
+        pass
@@ -0,0 +1,94 @@
+"""
+Clusters a folder of images from disk and writes the clusters with DiskStorageAdapter.
+
+Meant for folder-scale batch runs (hundreds of thousands of files). Files are
+streamed through a bounded pipeline (list, read, batch-embed), so memory during
+embedding does not grow with the folder size. Embeddings are appended to a
+memory-mapped store in --work-dir and checkpointed after every chunk; running
+the same command again after an interruption skips the images already embedded.
+
+Usage (from the repository root):
+    PYTHONPATH=src python -m app.tools.cluster_folder --input input --output output --work-dir data/batch
+"""
+import argparse
+import logging
+import os
+
+from app.adapters.clustering.hdbscan_adapter import HDBSCANClusteringAdapter
+from app.adapters.factories import build_captioning_model, build_embedding_model
+from app.adapters.metrics.instrumented_adapters import (
+    InstrumentedCaptioningAdapter,
+    InstrumentedClusteringAdapter,
+    InstrumentedEmbeddingAdapter,
+    InstrumentedStorage
+)
+from app.adapters.storage.disk_storage_adapter import DiskStorageAdapter
+from app.config.settings import (
+    IMAGE_FOLDER,
+    OUTPUT_FOLDER,
+    BATCH_WORK_DIR,
+    BATCH_CHUNK_SIZE,
+    BATCH_READ_AHEAD,
+    DECODE_MIN_SIDE,
+    INGEST_WORKERS,
+    METRICS_ENABLED
+)
+from app.core.folder_batch import FolderClusteringRun
+from app.core.ingestion import ImageIngestor
+from app.core.instrumentation import Instrumentation
+
+logger = logging.getLogger(__name__)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default=IMAGE_FOLDER, help="Image folder (IMAGE_FOLDER)")
+    parser.add_argument("--output", default=OUTPUT_FOLDER, help="Output folder for the clusters (OUTPUT_FOLDER)")
+    parser.add_argument("--work-dir", default=BATCH_WORK_DIR, help="Embedding store and checkpoint (BATCH_WORK_DIR)")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE, help="Images per checkpoint")
+    parser.add_argument("--read-ahead", type=int, default=BATCH_READ_AHEAD, help="Files read ahead of the model")
+    parser.add_argument("--no-captions", action="store_true", help="Skip cluster descriptions")
+    parser.add_argument("--metrics-file", help="Write the stage timings here in the Prometheus text format")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    embedding_service = build_embedding_model()
+    clustering_service = HDBSCANClusteringAdapter()
+    captioning_service = None if args.no_captions else build_captioning_model()
+    storage = DiskStorageAdapter(args.output)
+
+    # Per-stage timings of every port call, as on the API; with metrics disabled nothing is wrapped
+    instrumentation = Instrumentation(enabled=METRICS_ENABLED)
+    if METRICS_ENABLED:
+        embedding_service = InstrumentedEmbeddingAdapter(embedding_service, instrumentation)
+        clustering_service = InstrumentedClusteringAdapter(clustering_service, instrumentation)
+        if captioning_service is not None:
+            captioning_service = InstrumentedCaptioningAdapter(captioning_service, instrumentation)
+        storage = InstrumentedStorage(storage, instrumentation)
+
+    run = FolderClusteringRun(
+        args.input,
+        args.work_dir,
+        ImageIngestor(min_side=DECODE_MIN_SIDE, workers=INGEST_WORKERS),
+        embedding_service,
+        clustering_service,
+        captioning_service=captioning_service,
+        chunk_size=args.chunk_size,
+        read_ahead=args.read_ahead
+    )
+    run.embed()
+    clusters = run.cluster()
+
+    logger.info(f"Writing {len(clusters)} clusters to {args.output}...")
+    storage.save(clusters, embedding_rows=run.store.rows)
+
+    if METRICS_ENABLED:
+        for stage, (seconds, images) in sorted(instrumentation.summary().items()):
+            logger.info(f"Stage {stage}: {seconds:.1f} s, {images} images")
+        if args.metrics_file:
+            with open(args.metrics_file + ".tmp", "w", encoding="utf-8") as f:
+                f.write(instrumentation.render())
+            os.replace(args.metrics_file + ".tmp", args.metrics_file)
+    logger.info("Done.")
+
+if __name__ == "__main__":
+    main()
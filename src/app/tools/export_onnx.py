@@ -0,0 +1,146 @@
+"""
+Exports the DINOv2 / OpenCLIP image encoders to ONNX and checks them against torch.
+
+Each graph takes a float32 (batch, 3, H, W) input with a dynamic batch axis and
+returns the unnormalized embedding. A JSON file with the model id and the
+preprocessing parameters (read from the torch adapter's transform) is written next
+to it, for ONNXEmbeddingAdapter.
+
+After exporting, the ONNX adapter is compared with the torch adapter on the same
+images (a folder given with --check-images, else random synthetic images of mixed
+sizes). The tool exits with status 1 if any normalized embedding has a cosine
+similarity below 1 - --tolerance to its torch counterpart.
+
+Usage (from the repository root):
+    PYTHONPATH=src python -m app.tools.export_onnx --output models/onnx --models dinov2 openclip
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import Dict, List
+
+import numpy as np
+import torch
+from PIL import Image
+
+from app.adapters.embeddings.onnx_adapter import ONNXEmbeddingAdapter, config_path
+from app.domain.models import ImageItem, embedding_matrix
+
+logger = logging.getLogger(__name__)
+
+class ImageEncoder(torch.nn.Module):
+    """Exposes OpenCLIP's encode_image as forward, so only the vision tower is exported."""
+
+    def __init__(self, model: torch.nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        return self.model.encode_image(pixel_values)
+
+def build_torch_adapter(name: str, snapshot_dir: str):
+    if name == "openclip":
+        from app.adapters.embeddings.openclip_adapter import OpenCLIPEmbeddingAdapter
+        return OpenCLIPEmbeddingAdapter(snapshot_dir=snapshot_dir, inference_mode="fp32")
+    from app.adapters.embeddings.dinov2_adapter import DINOv2EmbeddingAdapter
+    return DINOv2EmbeddingAdapter(snapshot_dir=snapshot_dir, inference_mode="fp32")
+
+def preprocess_config(transform) -> Dict:
+    """Resize / center crop / normalization parameters of a torchvision Compose."""
+    import torchvision.transforms as T
+
+    config = {}
+    for step in transform.transforms:
+        if isinstance(step, T.Resize):
+            size = step.size
+            if not isinstance(size, int):
+                if len(size) != 1:
+                    raise ValueError(f"Only shorter-side resizes are supported, got {step}")
+                size = size[0]
+            config["resize"] = int(size)
+            config["interpolation"] = step.interpolation.value
+        elif isinstance(step, T.CenterCrop):
+            config["crop"] = int(step.size[0])
+        elif isinstance(step, T.Normalize):
+            config["mean"] = [float(v) for v in step.mean]
+            config["std"] = [float(v) for v in step.std]
+    missing = {"resize", "interpolation", "crop", "mean", "std"} - config.keys()
+    if missing:
+        raise ValueError(f"Could not read {sorted(missing)} from {transform}")
+    return config
+
+def export(name: str, adapter, output: str, opset: int) -> str:
+    module = ImageEncoder(adapter.model) if name == "openclip" else adapter.model
+    module.eval()
+    config = preprocess_config(adapter.preprocess)
+    dummy = torch.zeros(2, 3, config["crop"], config["crop"])
+
+    os.makedirs(output, exist_ok=True)
+    model_path = os.path.join(output, f"{name}.onnx")
+    logger.info(f"Exporting {name} to {model_path}...")
+    torch.onnx.export(
+        module,
+        (dummy,),
+        model_path,
+        input_names=["pixel_values"],
+        output_names=["embedding"],
+        dynamic_axes={"pixel_values": {0: "batch"}, "embedding": {0: "batch"}},
+        opset_version=opset,
+        dynamo=False
+    )
+    with open(config_path(model_path), "w") as f:
+        json.dump({"model_id": adapter.model_id, "opset": opset, "preprocess": config}, f, indent=2)
+    return model_path
+
+def check_images(folder: str, count: int) -> List[ImageItem]:
+    if folder:
+        names = sorted(os.listdir(folder))[:count]
+        return [ImageItem(id=name, path=os.path.join(folder, name)) for name in names]
+    rng = np.random.default_rng(0)
+    images = []
+    for i in range(count):
+        width, height = (int(v) for v in rng.integers(64, 640, size=2))
+        pixels = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        images.append(ImageItem(id=f"synthetic-{i}", image=Image.fromarray(pixels)))
+    return images
+
+def compare(torch_adapter, onnx_adapter, images: List[ImageItem]) -> Dict[str, float]:
+    expected = embedding_matrix(torch_adapter.extract_embeddings(images))
+    actual = embedding_matrix(onnx_adapter.extract_embeddings(images))
+    cosine = np.sum(expected * actual, axis=1)
+    return {
+        "cos_min": float(cosine.min()),
+        "cos_mean": float(cosine.mean()),
+        "max_abs_diff": float(np.abs(expected - actual).max())
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", required=True, help="Folder for the .onnx graphs and their .json configs")
+    parser.add_argument("--models", nargs="+", choices=("dinov2", "openclip"), default=["dinov2", "openclip"])
+    parser.add_argument("--snapshot-dir", help="Local model snapshot (MODEL_SNAPSHOT_DIR)")
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--check-images", help="Folder of images for the equivalence check")
+    parser.add_argument("--check-count", type=int, default=16)
+    parser.add_argument("--tolerance", type=float, default=1e-4, help="Allowed 1 - cosine per embedding")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    images = check_images(args.check_images, args.check_count)
+    failed = False
+
+    for name in args.models:
+        torch_adapter = build_torch_adapter(name, args.snapshot_dir)
+        model_path = export(name, torch_adapter, args.output, args.opset)
+        result = compare(torch_adapter, ONNXEmbeddingAdapter(model_path), images)
+        ok = result["cos_min"] >= 1.0 - args.tolerance
+        failed = failed or not ok
+        print(f"{name:<10} cos min {result['cos_min']:.6f}  cos mean {result['cos_mean']:.6f}  "
+              f"max |diff| {result['max_abs_diff']:.2e}  {'OK' if ok else 'MISMATCH'}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
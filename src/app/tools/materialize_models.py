@@ -0,0 +1,75 @@
+"""
+Writes a local model snapshot that the adapters load with no hub or network calls.
+
+Run once where the hubs are reachable (e.g. while building an image), then point
+MODEL_SNAPSHOT_DIR at the output folder:
+
+    PYTHONPATH=src python -m app.tools.materialize_models --output models
+
+Layout:
+    dinov2/hub/               torch.hub code of facebookresearch/dinov2
+    dinov2/model.safetensors  DINOv2 ViT-B/14 weights
+    openclip/model.safetensors  OpenCLIP ViT-B-32 weights
+    blip/                     BLIP processor and model (save_pretrained, safetensors)
+"""
+import argparse
+import logging
+import os
+import shutil
+
+import torch
+from safetensors.torch import save_file
+
+logger = logging.getLogger(__name__)
+
+MODELS = ("dinov2", "openclip", "blip")
+
+def save_state_dict(model: torch.nn.Module, path: str) -> None:
+    # safetensors needs contiguous tensors that do not share storage
+    state = {name: tensor.detach().cpu().contiguous().clone() for name, tensor in model.state_dict().items()}
+    save_file(state, path)
+
+def materialize_dinov2(output: str) -> None:
+    folder = os.path.join(output, "dinov2")
+    os.makedirs(folder, exist_ok=True)
+    model = torch.hub.load("facebookresearch/dinov2", "dinov2_vitb14")
+
+    # torch.hub keeps the downloaded repository in its cache; copy it next to the weights
+    hub_repo = os.path.join(torch.hub.get_dir(), "facebookresearch_dinov2_main")
+    target = os.path.join(folder, "hub")
+    if os.path.exists(target):
+        shutil.rmtree(target)
+    shutil.copytree(hub_repo, target, ignore=shutil.ignore_patterns(".git", "__pycache__"))
+    save_state_dict(model, os.path.join(folder, "model.safetensors"))
+
+def materialize_openclip(output: str) -> None:
+    import open_clip
+
+    folder = os.path.join(output, "openclip")
+    os.makedirs(folder, exist_ok=True)
+    model, _, _ = open_clip.create_model_and_transforms("ViT-B-32", pretrained="laion2b_s34b_b79k")
+    save_state_dict(model, os.path.join(folder, "model.safetensors"))
+
+def materialize_blip(output: str) -> None:
+    from transformers import BlipProcessor, BlipForConditionalGeneration
+
+    folder = os.path.join(output, "blip")
+    name = "Salesforce/blip-image-captioning-base"
+    BlipProcessor.from_pretrained(name, use_fast=True).save_pretrained(folder)
+    BlipForConditionalGeneration.from_pretrained(name).save_pretrained(folder, safe_serialization=True)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", required=True, help="Snapshot folder (MODEL_SNAPSHOT_DIR)")
+    parser.add_argument("--models", nargs="+", choices=MODELS, default=list(MODELS))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    steps = {"dinov2": materialize_dinov2, "openclip": materialize_openclip, "blip": materialize_blip}
+    for name in args.models:
+        logger.info(f"Materializing {name} into {args.output}...")
+        steps[name](args.output)
+    logger.info("Snapshot complete.")
+
+if __name__ == "__main__":
+    main()
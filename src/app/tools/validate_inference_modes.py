@@ -0,0 +1,132 @@
+"""
+Compares inference modes (see app.adapters.inference.inference_modes) against fp32.
+
+For each mode, the embedding model is run on a folder of images and compared with
+its fp32 output: cosine similarity per image (mean / min drift) and agreement of
+the HDBSCAN clustering (adjusted Rand index, 1.0 = identical assignments).
+With --captions, BLIP captions of the fp32 clusters are compared too (share of
+identical cluster descriptions). Timings exclude model loading and warmup.
+
+Usage (from the repository root):
+    PYTHONPATH=src python -m app.tools.validate_inference_modes --images input --modes bf16 int8 compiled
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+from sklearn.metrics import adjusted_rand_score
+
+from app.adapters.clustering.hdbscan_adapter import HDBSCANClusteringAdapter
+from app.adapters.inference.inference_modes import INFERENCE_MODES
+from app.config.settings import DECODE_MIN_SIDE, IMAGE_FOLDER
+from app.domain.labels import group_by_label
+from app.domain.models import ImageItem, embedding_matrix
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+def load_images(folder: str, limit: int) -> List[ImageItem]:
+    names = sorted(name for name in os.listdir(folder) if name.lower().endswith(IMAGE_EXTENSIONS))[:limit]
+    return [
+        ImageItem(id=name, path=os.path.join(folder, name), decode_min_side=DECODE_MIN_SIDE)
+        for name in names
+    ]
+
+def build_embedding_adapter(model: str, mode: str, snapshot_dir: str):
+    if model == "openclip":
+        from app.adapters.embeddings.openclip_adapter import OpenCLIPEmbeddingAdapter
+        return OpenCLIPEmbeddingAdapter(snapshot_dir=snapshot_dir, inference_mode=mode)
+    from app.adapters.embeddings.dinov2_adapter import DINOv2EmbeddingAdapter
+    return DINOv2EmbeddingAdapter(snapshot_dir=snapshot_dir, inference_mode=mode)
+
+def embed(adapter, images: List[ImageItem]):
+    adapter.warmup()
+    started = time.perf_counter()
+    embeddings = adapter.extract_embeddings(images)
+    seconds = time.perf_counter() - started
+    return embeddings, embedding_matrix(embeddings), seconds
+
+def caption(mode: str, snapshot_dir: str, images: List[ImageItem], labels: np.ndarray):
+    from app.adapters.descriptions.blip_adapter import BLIPCaptioningAdapter
+
+    adapter = BLIPCaptioningAdapter(snapshot_dir=snapshot_dir, inference_mode=mode)
+    adapter.warmup()
+    clusters = group_by_label(images, labels)
+    started = time.perf_counter()
+    adapter.generate_descriptions(clusters)
+    seconds = time.perf_counter() - started
+    return {c.label: c.description for c in clusters if c.label != -1}, seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", default=IMAGE_FOLDER, help="Folder of images to embed")
+    parser.add_argument("--limit", type=int, default=500, help="Maximum number of images")
+    parser.add_argument("--model", choices=("dinov2", "openclip"), default="dinov2")
+    parser.add_argument("--modes", nargs="+", choices=[m for m in INFERENCE_MODES if m != "fp32"],
+                        default=[m for m in INFERENCE_MODES if m != "fp32"])
+    parser.add_argument("--captions", action="store_true", help="Also compare BLIP captions")
+    parser.add_argument("--snapshot-dir", help="Local model snapshot (MODEL_SNAPSHOT_DIR)")
+    parser.add_argument("--output", help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    images = load_images(args.images, args.limit)
+    if not images:
+        parser.error(f"No images found in {args.images}")
+    clustering = HDBSCANClusteringAdapter()
+
+    reference, reference_matrix, reference_seconds = embed(
+        build_embedding_adapter(args.model, "fp32", args.snapshot_dir), images
+    )
+    _, reference_labels = clustering.fit(reference)
+    reference_captions, reference_caption_seconds = (
+        caption("fp32", args.snapshot_dir, images, reference_labels) if args.captions else (None, None)
+    )
+
+    rows: List[Dict] = [{
+        "mode": "fp32", "embed_s": round(reference_seconds, 3), "cos_mean": 1.0, "cos_min": 1.0, "ari": 1.0,
+        "clusters": int(len(set(reference_labels.tolist()) - {-1})),
+        "caption_s": round(reference_caption_seconds, 3) if args.captions else None,
+        "captions_equal": 1.0 if args.captions else None
+    }]
+
+    for mode in args.modes:
+        embeddings, matrix, seconds = embed(build_embedding_adapter(args.model, mode, args.snapshot_dir), images)
+        # Vectors are L2-normalized, so the row-wise dot product is the cosine similarity
+        cosine = np.sum(reference_matrix * matrix, axis=1)
+        _, labels = clustering.fit(embeddings)
+        row = {
+            "mode": mode,
+            "embed_s": round(seconds, 3),
+            "cos_mean": round(float(cosine.mean()), 5),
+            "cos_min": round(float(cosine.min()), 5),
+            "ari": round(float(adjusted_rand_score(reference_labels, labels)), 4),
+            "clusters": int(len(set(labels.tolist()) - {-1})),
+            "caption_s": None,
+            "captions_equal": None
+        }
+        if args.captions:
+            # Same (fp32) clusters for every mode, so only the captioning model differs
+            captions, caption_seconds = caption(mode, args.snapshot_dir, images, reference_labels)
+            equal = sum(captions[label] == text for label, text in reference_captions.items())
+            row["caption_s"] = round(caption_seconds, 3)
+            row["captions_equal"] = round(equal / max(1, len(reference_captions)), 3)
+        rows.append(row)
+
+    print(f"{len(images)} images, model {args.model}")
+    print(f"{'mode':<10} {'embed s':>8} {'cos mean':>9} {'cos min':>9} {'ARI':>7} {'clusters':>9} {'caption s':>10} {'captions=':>10}")
+    for row in rows:
+        print(f"{row['mode']:<10} {row['embed_s']:>8} {row['cos_mean']:>9} {row['cos_min']:>9} {row['ari']:>7} "
+              f"{row['clusters']:>9} {str(row['caption_s']):>10} {str(row['captions_equal']):>10}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"images": len(images), "model": args.model, "results": rows}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import io
+from typing import List
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.adapters.clustering.hdbscan_adapter import HDBSCANClusteringAdapter
+from app.adapters.collections.disk_collection_store import DiskCollectionStore
+from app.core.collections import CollectionService
+from app.domain.models import Cluster, EmbeddingBatch, ImageItem
+from app.ports.captioning_port import CaptioningPort
+from app.ports.embedding_port import EmbeddingPort
+
+class MeanColorEmbedding(EmbeddingPort):
+    """Normalized mean RGB of each image (no model needed)."""
+
+    def __init__(self):
+        self.fail = False
+
+    def extract_embeddings(self, images: List[ImageItem]) -> EmbeddingBatch:
+        if self.fail:
+            raise RuntimeError("Model embedding is not loaded yet")
+        batch = EmbeddingBatch.empty(images, 3)
+        for row, img in enumerate(images):
+            vector = np.asarray(img.data, dtype=np.float32).reshape(-1, 3).mean(axis=0) + 1
+            batch.matrix[row] = vector / np.linalg.norm(vector)
+        return batch
+
+class CountingCaptioning(CaptioningPort):
+    def generate_descriptions(self, clusters: List[Cluster]) -> List[Cluster]:
+        for cluster in clusters:
+            cluster.description = f"{len(cluster.images)} images"
+        return clusters
+
+def uploads(prefix: str, colors) -> List[ImageItem]:
+    images = []
+    for i, color in enumerate(colors):
+        buffer = io.BytesIO()
+        Image.new("RGB", (16, 16), color).save(buffer, "PNG")
+        images.append(ImageItem(id=f"{prefix}_{i}.png", source=buffer.getvalue()))
+    return images
+
+COLORS = [(250, 10, 10), (245, 15, 12), (240, 12, 20), (10, 10, 250), (12, 20, 245), (15, 12, 240)]
+
+def test_failed_refit_keeps_the_previous_collection(tmp_path):
+    store = DiskCollectionStore(str(tmp_path))
+    embedding = MeanColorEmbedding()
+    service = CollectionService(store, embedding, HDBSCANClusteringAdapter(), CountingCaptioning())
+
+    first = service.fit("photos", uploads("old", COLORS))
+    assert sum(len(c.images) for c in first) == len(COLORS)
+
+    embedding.fail = True
+    with pytest.raises(RuntimeError):
+        service.fit("photos", uploads("new", COLORS))
+
+    kept = store.load("photos")
+    assert kept.image_ids == [f"old_{i}.png" for i in range(len(COLORS))]
+    assert all(open(path, "rb").read() for path in kept.image_paths)
+
+    embedding.fail = False
+    service.fit("photos", uploads("new", COLORS[:4]))
+    replaced = store.load("photos")
+    assert replaced.image_ids == [f"new_{i}.png" for i in range(4)]
+    assert len(list((tmp_path / "photos" / "images").iterdir())) == 4
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["photos"]
@@ -0,0 +1,59 @@
+import hashlib
+import io
+from typing import List
+
+import numpy as np
+from PIL import Image
+
+from app.adapters.clustering.hdbscan_adapter import HDBSCANClusteringAdapter
+from app.core.dedup import NearDuplicateDetector
+from app.core.rchestrator import run_pipeline
+from app.core.tuning import ClusterTuningService
+from app.domain.models import Cluster, EmbeddingBatch, ImageItem
+from app.ports.captioning_port import CaptioningPort
+from app.ports.embedding_port import EmbeddingPort
+
+class MeanColorEmbedding(EmbeddingPort):
+    """Normalized mean RGB of each image (no model needed)."""
+
+    def extract_embeddings(self, images: List[ImageItem]) -> EmbeddingBatch:
+        batch = EmbeddingBatch.empty(images, 3)
+        for row, img in enumerate(images):
+            vector = np.asarray(img.data, dtype=np.float32).reshape(-1, 3).mean(axis=0) + 1
+            batch.matrix[row] = vector / np.linalg.norm(vector)
+        return batch
+
+class CountingCaptioning(CaptioningPort):
+    def generate_descriptions(self, clusters: List[Cluster]) -> List[Cluster]:
+        for cluster in clusters:
+            cluster.description = f"{len(cluster.images)} images"
+        return clusters
+
+def identical_uploads(n: int) -> List[ImageItem]:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), (200, 120, 40)).save(buffer, "JPEG")
+    source = buffer.getvalue()
+    digest = hashlib.sha256(source).hexdigest()
+    return [ImageItem(id=f"copy_{i}.jpg", source=source, digest=digest) for i in range(n)]
+
+def test_identical_uploads_form_one_cluster():
+    images = identical_uploads(4)
+    clusters = run_pipeline(
+        images, MeanColorEmbedding(), HDBSCANClusteringAdapter(), CountingCaptioning(),
+        deduplicator=NearDuplicateDetector(max_distance=0, workers=1)
+    )
+    assert len(clusters) == 1
+    assert sorted(img.id for img in clusters[0].images) == [img.id for img in images]
+    assert clusters[0].description == "4 images"
+
+def test_identical_uploads_tuning_session():
+    images = identical_uploads(3)
+    service = ClusterTuningService(
+        MeanColorEmbedding(), HDBSCANClusteringAdapter(), CountingCaptioning(),
+        deduplicator=NearDuplicateDetector(max_distance=0, workers=1)
+    )
+    session, clusters = service.create(images)
+    assert [sorted(img.id for img in c.images) for c in clusters] == [[img.id for img in images]]
+
+    clusters, changed = service.recut(session.id, min_cluster_size=5, selection_method="eom")
+    assert len(clusters) == 1 and changed == []
@@ -0,0 +1,65 @@
+import io
+import os
+from typing import List
+
+import numpy as np
+from PIL import Image
+
+from app.adapters.clustering.hdbscan_adapter import HDBSCANClusteringAdapter
+from app.core.folder_batch import FolderClusteringRun
+from app.core.ingestion import ImageIngestor
+from app.domain.models import EmbeddingBatch, ImageItem
+from app.ports.embedding_port import EmbeddingPort
+
+class MeanColorEmbedding(EmbeddingPort):
+    """Normalized mean RGB of each image; decodes every image like a real model."""
+
+    model_id = "mean-color"
+
+    def __init__(self):
+        self.calls = 0
+
+    def extract_embeddings(self, images: List[ImageItem]) -> EmbeddingBatch:
+        self.calls += 1
+        batch = EmbeddingBatch.empty(images, 3)
+        for row, img in enumerate(images):
+            vector = np.asarray(img.data, dtype=np.float32).reshape(-1, 3).mean(axis=0) + 1
+            batch.matrix[row] = vector / np.linalg.norm(vector)
+        return batch
+
+def write_jpeg(path: str, color, truncate: bool = False) -> None:
+    buffer = io.BytesIO()
+    Image.fromarray(np.random.default_rng(0).integers(0, 255, (64, 64, 3), dtype=np.uint8) // 2 + color).save(
+        buffer, "JPEG"
+    )
+    contents = buffer.getvalue()
+    with open(path, "wb") as f:
+        # A valid header with most of the scan data missing
+        f.write(contents[:len(contents) // 3] if truncate else contents)
+
+def make_run(folder: str, work_dir: str, embedding: EmbeddingPort) -> FolderClusteringRun:
+    return FolderClusteringRun(
+        folder, work_dir, ImageIngestor(min_side=32, workers=1), embedding,
+        HDBSCANClusteringAdapter(), chunk_size=4, read_ahead=4
+    )
+
+def test_corrupt_file_is_skipped_and_remembered(tmp_path):
+    folder = tmp_path / "input"
+    folder.mkdir()
+    for i in range(6):
+        write_jpeg(str(folder / f"img_{i}.jpg"), np.uint8(20 * i))
+    write_jpeg(str(folder / "broken.jpg"), np.uint8(0), truncate=True)
+    work_dir = str(tmp_path / "work")
+
+    run = make_run(str(folder), work_dir, MeanColorEmbedding())
+    assert run.embed() == 6
+    assert "broken.jpg" not in run.store
+    with open(os.path.join(work_dir, FolderClusteringRun.SKIPPED_FILE), encoding="utf-8") as f:
+        assert f.read().split() == ["broken.jpg"]
+
+    # A resume neither embeds nor retries anything
+    embedding = MeanColorEmbedding()
+    resumed = make_run(str(folder), work_dir, embedding)
+    assert resumed.embed() == 0
+    assert embedding.calls == 0
+    assert len(resumed.store) == 6